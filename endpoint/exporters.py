@@ -0,0 +1,267 @@
+"""
+Streaming exports of analysis results.
+
+The result DataFrames are rendered a chunk of rows at a time (CSV in a zip
+archive, newline-delimited JSON or an Arrow IPC stream) and sent as they are
+produced, so a download never holds the full rendered body in memory.
+
+Path columns are encoded compactly in NDJSON and Arrow: each path is a list of
+indexes into a table of node hostnames sent once per response, read from the
+PathStore encoding of the column.
+"""
+import json
+import zipfile
+import numpy as np
+import pandas as pd
+from path_store import PATH_COLUMNS, PathStore
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow output is optional
+    pa = None
+
+ARROW_AVAILABLE = pa is not None
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows rendered per chunk
+CSV_CHUNK_ROWS = 5000
+
+
+class _ChunkedOutput:
+    """Non-seekable binary sink that hands the written bytes out in chunks"""
+
+    def __init__(self):
+        self._chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        """Bytes written since the last drain"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_csv_chunks(results_df, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Render a DataFrame as CSV text in chunks of rows.
+
+    The concatenated chunks are identical to results_df.to_csv(index=False).
+    """
+    yield results_df.iloc[:0].to_csv(index=False)
+    for start in range(0, len(results_df), chunk_rows):
+        yield results_df.iloc[start:start + chunk_rows].to_csv(index=False, header=False)
+
+
+def stream_csv_zip(members, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Stream a zip archive with one CSV file per DataFrame.
+
+    Args:
+        members (list): (file name, DataFrame) pairs, in archive order
+        chunk_rows (int): Rows rendered and compressed per step
+
+    Yields:
+        bytes: Consecutive parts of the zip archive
+    """
+    output = _ChunkedOutput()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for name, results_df in members:
+            # Size is unknown up front - force_zip64 keeps large members valid
+            with zip_file.open(name, 'w', force_zip64=True) as member:
+                for text in iter_csv_chunks(results_df, chunk_rows):
+                    member.write(text.encode('utf-8'))
+                    data = output.drain()
+                    if data:
+                        yield data
+            data = output.drain()
+            if data:
+                yield data
+
+    # Central directory
+    data = output.drain()
+    if data:
+        yield data
+
+
+def encode_paths(frames):
+    """
+    PathStore of each path column of the frames, over one node table.
+
+    Returns:
+        tuple: (node_names, [{column: PathStore} per frame]); node IDs are in
+        order of first appearance across the frames
+    """
+    node_names = np.empty(0, dtype=object)
+    node_ids = {}
+    stores = []
+    for results_df in frames:
+        frame_stores = {}
+        for column in PATH_COLUMNS:
+            if column in results_df.columns:
+                store = PathStore.from_values(results_df[column], node_names, node_ids)
+                node_names, node_ids = store.node_names, store.node_ids
+                frame_stores[column] = store
+        stores.append(frame_stores)
+    return node_names, stores
+
+
+def _error_messages(store):
+    """Path error message per row (None for paths and missing values)"""
+    messages = [None] * len(store)
+    for row, value in store.errors.items():
+        if store.status[row] != PathStore.MISSING:
+            messages[row] = str(value)
+    return messages
+
+
+def _json_paths(store, start, stop):
+    """Rows start..stop of a path column as node index lists, error messages or None"""
+    values = []
+    for row, code in enumerate(store.status[start:stop].tolist(), start):
+        if code == PathStore.PATH:
+            values.append(store.path_ids(row).tolist())
+        elif code == PathStore.MISSING:
+            values.append(None)
+        else:
+            values.append(str(store.errors[row]))
+    return values
+
+
+def _json_column(series):
+    """Column values as JSON-serializable Python objects (NaN becomes None)"""
+    values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
+
+
+def iter_ndjson(datasets, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Stream results as newline-delimited JSON.
+
+    The first line holds the node table ({"nodes": [...]}). Each dataset then
+    starts with a header line ({"dataset", "rows", "columns"}) followed by one
+    JSON array per row, in column order. Path values are lists of indexes into
+    the node table; path errors are sent as their message.
+
+    Args:
+        datasets (list): (dataset name, DataFrame) pairs
+        chunk_rows (int): Rows rendered per chunk
+    """
+    node_names, stores = encode_paths([results_df for _, results_df in datasets])
+    yield json.dumps({"nodes": node_names.tolist()}) + "\n"
+
+    for (name, results_df), path_stores in zip(datasets, stores):
+        columns = list(results_df.columns)
+        yield json.dumps({"dataset": name, "rows": len(results_df), "columns": columns}) + "\n"
+
+        for start in range(0, len(results_df), chunk_rows):
+            chunk = results_df.iloc[start:start + chunk_rows]
+            values = [
+                _json_paths(path_stores[column], start, start + len(chunk))
+                if column in path_stores else _json_column(chunk[column])
+                for column in columns
+            ]
+            yield "".join(json.dumps(row, default=str) + "\n" for row in zip(*values))
+
+
+def _arrow_path_columns(store, dictionary):
+    """
+    Arrow columns for a path column: list<dictionary<int32, string>> of the
+    path hostnames (null when not a path) and a string column with the path
+    error message (null when a path or missing).
+    """
+    node_values = pa.DictionaryArray.from_arrays(pa.array(store.nodes, type=pa.int32()), dictionary)
+    paths = pa.ListArray.from_arrays(
+        pa.array(store.offsets, type=pa.int32()), node_values,
+        mask=pa.array(store.status != PathStore.PATH, type=pa.bool_())
+    )
+    return paths, pa.array(_error_messages(store), type=pa.string())
+
+
+def _arrow_table(name, results_df, path_arrays):
+    """Arrow table of rows of one dataset, with a leading dataset column"""
+    arrays = {"dataset": pa.array([name] * len(results_df), type=pa.string()).dictionary_encode()}
+    for column in results_df.columns:
+        series = results_df[column]
+        if column in path_arrays:
+            arrays[column], arrays[f"{column}_error"] = path_arrays[column]
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.cat.remove_unused_categories()
+            arrays[column] = pa.DictionaryArray.from_arrays(
+                pa.array(series.cat.codes.to_numpy(), mask=series.isna().to_numpy(), type=pa.int32()),
+                pa.array(series.cat.categories.astype(str).tolist(), type=pa.string())
+            )
+        elif series.dtype == object:
+            text = series.astype(str).where(series.notna(), None)
+            arrays[column] = pa.array(text.tolist(), type=pa.string())
+        else:
+            arrays[column] = pa.array(series.to_numpy(), from_pandas=True)
+    return pa.table(arrays)
+
+
+def _slice_paths(path_arrays, start, stop):
+    """Rows start..stop of the Arrow path columns of a dataset (zero-copy)"""
+    return {
+        column: (paths.slice(start, stop - start), errors.slice(start, stop - start))
+        for column, (paths, errors) in path_arrays.items()
+    }
+
+
+def _conform(table, schema):
+    """Table with the columns of the stream schema, null where the dataset lacks them"""
+    return pa.table([
+        table.column(field.name).cast(field.type) if field.name in table.column_names
+        else pa.nulls(len(table), type=field.type)
+        for field in schema
+    ], schema=schema)
+
+
+def iter_arrow_stream(datasets, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Stream results as one Arrow IPC stream.
+
+    The datasets are stacked with a leading "dataset" column; columns missing
+    from a dataset are null. Path columns are dictionary-encoded hostname
+    lists with a "<column>_error" string column for path errors. Rows are
+    converted and written one record batch at a time. Requires pyarrow (see
+    ARROW_AVAILABLE).
+
+    Args:
+        datasets (list): (dataset name, DataFrame) pairs
+        chunk_rows (int): Rows per record batch
+
+    Yields:
+        bytes: Consecutive parts of the IPC stream
+    """
+    node_names, stores = encode_paths([results_df for _, results_df in datasets])
+    dictionary = pa.array(node_names.tolist(), type=pa.string())
+
+    # Path columns are built once from their encoding and sliced per batch
+    path_arrays = [
+        {column: _arrow_path_columns(store, dictionary) for column, store in path_stores.items()}
+        for path_stores in stores
+    ]
+    schema = pa.unify_schemas([
+        _arrow_table(name, results_df.iloc[:0], _slice_paths(arrays, 0, 0)).schema
+        for (name, results_df), arrays in zip(datasets, path_arrays)
+    ])
+
+    output = _ChunkedOutput()
+    with pa.ipc.new_stream(output, schema) as writer:
+        for (name, results_df), arrays in zip(datasets, path_arrays):
+            for start in range(0, len(results_df), chunk_rows):
+                stop = min(start + chunk_rows, len(results_df))
+                table = _arrow_table(name, results_df.iloc[start:stop], _slice_paths(arrays, start, stop))
+                writer.write_table(_conform(table, schema))
+                yield output.drain()
+    yield output.drain()
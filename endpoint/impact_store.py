@@ -0,0 +1,360 @@
+"""
+Precomputed impact matrix store.
+
+After a full sweep every identifier's impact is known, so it is persisted as an
+impact matrix (identifier -> affected base-result rows, Impact label and Path2)
+and /analyze answers from it without any live computation. Arrays are stored as
+.npy files and memory-mapped when the store is opened.
+
+Usage:
+    python impact_store.py --data-dir data --store-dir impact_store
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import networkx as nx
+from unified_network_analyzer import ImpactQuery
+
+
+class ImpactStore:
+    """
+    Impact matrix of one or more analyzers (e.g. 'we' and 'others'), tied to their data versions.
+
+    Per analyzer, identifier i owns rows[identifier_offsets[i]:identifier_offsets[i + 1]]
+    (positions into final_df) with one Impact code and one Path2 code per row.
+    Rerouted paths are stored as node IDs: path_nodes[path_offsets[j]:path_offsets[j + 1]]
+    for the j-th stored path; identifier i owns stored paths from identifier_path_offsets[i].
+    """
+
+    META_FILE = 'meta.json'
+    ARRAYS = [
+        'identifier_offsets', 'identifier_path_offsets', 'layouts',
+        'rows', 'impacts', 'path2_codes', 'path_offsets', 'path_nodes'
+    ]
+    IMPACT_LABELS = ['Isolated', 'Partially Impacted']
+
+    # Layout codes besides an index into the stored column layouts
+    LAYOUT_EMPTY = -1
+    LAYOUT_LIVE = -2  # Result could not be encoded, always analyzed live
+
+    # How Path2 of a row is rebuilt
+    PATH2_BASE = 0       # Same as the base results
+    PATH2_MISSING = 1    # NaN
+    PATH2_STORED = 2     # Path stored in path_nodes
+    PATH2_NO_PATH = 3    # NetworkXNoPath message
+    PATH2_NO_SOURCE = 4  # NodeNotFound for the EDGE
+    PATH2_NO_TARGET = 5  # NodeNotFound for the target host
+
+    def __init__(self, path, meta, arrays):
+        """Initialize from the store metadata and (memory-mapped) arrays per analyzer"""
+        self.path = path
+        self.meta = meta
+        self.arrays = arrays
+        self.positions = {
+            name: {(identifier, identifier_type): i for i, (identifier, identifier_type) in enumerate(info['identifiers'])}
+            for name, info in meta.items()
+        }
+        self.node_names = {name: np.asarray(info['node_names'], dtype=object) for name, info in meta.items()}
+
+    @classmethod
+    def open(cls, path):
+        """Open a store written by build, memory-mapping its arrays. Returns None if there is none."""
+        meta_path = os.path.join(path, cls.META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        arrays = {
+            name: {
+                array: np.load(os.path.join(path, name, f'{array}.npy'), mmap_mode='r')
+                for array in cls.ARRAYS
+            }
+            for name in meta
+        }
+        return cls(path, meta, arrays)
+
+    @classmethod
+    def build(cls, path, analyzers, identifier_type='all', max_workers=None):
+        """
+        Run a full sweep and write the impact matrix of every analyzer to path.
+
+        Args:
+            path (str): Store directory
+            analyzers (dict): Analyzer per name, e.g. {'we': ..., 'others': ...}
+            identifier_type (str): 'node', 'exchange' or 'all'
+            max_workers (int): Worker processes, defaults to the number of cores
+
+        Returns:
+            ImpactStore: The opened store
+        """
+        identifiers = set()
+        for analyzer in analyzers.values():
+            identifiers.update(analyzer.sweep_identifiers(identifier_type))
+        identifiers = sorted(identifiers)
+
+        max_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(identifiers) // (max_workers * 4))
+        meta = {}
+
+        for name, analyzer in analyzers.items():
+            start_time = time.time()
+            network = analyzer.prepare()
+            # Spawned, not forked, as in run_sweep: safe from a multi-threaded caller
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_store_worker, initargs=(network,)) as executor:
+                encoded = list(executor.map(_encode_identifier, identifiers, chunksize=chunksize))
+
+            meta[name] = cls._write_arrays(os.path.join(path, name), network, identifiers, encoded)
+            print(f"Impact store for {name}: {len(identifiers)} identifiers encoded in {time.time() - start_time:.3f} seconds")
+
+        # Metadata last: a store without it is never opened
+        with open(os.path.join(path, cls.META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+        return cls.open(path)
+
+    @classmethod
+    def _write_arrays(cls, path, network, identifiers, encoded):
+        """Concatenate the encoded identifiers into the store arrays and return their metadata"""
+        os.makedirs(path, exist_ok=True)
+        layouts = []
+        layout_codes = []
+        parts = {'rows': [], 'impacts': [], 'path2_codes': []}
+        paths = []
+        row_counts = []
+        path_counts = []
+
+        for record in encoded:
+            if record is None or record['columns'] is None:
+                layout_codes.append(cls.LAYOUT_LIVE if record is None else cls.LAYOUT_EMPTY)
+                row_counts.append(0)
+                path_counts.append(0)
+                continue
+
+            if record['columns'] not in layouts:
+                layouts.append(record['columns'])
+            layout_codes.append(layouts.index(record['columns']))
+            for key in parts:
+                parts[key].append(record[key])
+            paths.extend(record['paths'])
+            row_counts.append(len(record['rows']))
+            path_counts.append(len(record['paths']))
+
+        arrays = {
+            'identifier_offsets': np.concatenate([[0], np.cumsum(row_counts)]).astype(np.int64),
+            'identifier_path_offsets': np.concatenate([[0], np.cumsum(path_counts)]).astype(np.int64),
+            'layouts': np.array(layout_codes, dtype=np.int16),
+            'rows': np.concatenate(parts['rows'] or [[]]).astype(np.int32),
+            'impacts': np.concatenate(parts['impacts'] or [[]]).astype(np.int8),
+            'path2_codes': np.concatenate(parts['path2_codes'] or [[]]).astype(np.int8),
+            'path_offsets': np.concatenate([[0], np.cumsum([len(p) for p in paths])]).astype(np.int64),
+            'path_nodes': np.concatenate(paths or [[]]).astype(np.int32),
+        }
+        for array, values in arrays.items():
+            np.save(os.path.join(path, f'{array}.npy'), values)
+
+        return {
+            'data_version': network.data_version,
+            'identifiers': [list(item) for item in identifiers],
+            'layouts': [list(columns) for columns in layouts],
+            'node_names': network.model.g.node_names.tolist(),
+        }
+
+    @classmethod
+    def encode_results(cls, network, results):
+        """
+        Encode one analysis result against the base results of its PreparedNetwork.
+
+        Returns:
+            dict or None: Encoded result, None when it cannot be rebuilt from the store
+        """
+        if results.empty:
+            return {'columns': None}
+
+        final_df = network.final_df
+        target_hostname_col = network._get_column_mappings()['target_hostname']
+        node_ids = network.model.g.node_ids
+        rows = results.index.to_numpy()
+
+        impacts = []
+        for impact in results['Impact'].tolist():
+            if impact not in cls.IMPACT_LABELS:
+                return None
+            impacts.append(cls.IMPACT_LABELS.index(impact))
+
+        path2_codes = []
+        paths = []
+        if 'Path2' in results.columns:
+            base_path2 = final_df['Path2'].to_numpy()[rows] if 'Path2' in final_df.columns else [np.nan] * len(rows)
+            for path2, base, source, target in zip(
+                results['Path2'].tolist(), base_path2,
+                final_df['EDGE'].to_numpy()[rows], final_df[target_hostname_col].to_numpy()[rows]
+            ):
+                if cls._same_path(path2, base):
+                    path2_codes.append(cls.PATH2_BASE)
+                elif isinstance(path2, (list, tuple)):
+                    if any(node not in node_ids for node in path2):
+                        return None
+                    path2_codes.append(cls.PATH2_STORED)
+                    paths.append([node_ids[node] for node in path2])
+                elif not isinstance(path2, (str, BaseException)) and pd.isna(path2):
+                    path2_codes.append(cls.PATH2_MISSING)
+                else:
+                    for code in (cls.PATH2_NO_PATH, cls.PATH2_NO_SOURCE, cls.PATH2_NO_TARGET):
+                        if cls._same_path(path2, cls._error_value(code, source, target)):
+                            path2_codes.append(code)
+                            break
+                    else:
+                        return None
+        else:
+            path2_codes = [cls.PATH2_MISSING] * len(rows)
+
+        return {
+            'columns': list(results.columns),
+            'rows': rows,
+            'impacts': impacts,
+            'path2_codes': path2_codes,
+            'paths': paths,
+        }
+
+    @staticmethod
+    def _same_path(value, other):
+        """Path equality across lists, tuples, error messages and NodeNotFound exceptions"""
+        if value is other:
+            return True
+        if isinstance(value, (list, tuple)) and isinstance(other, (list, tuple)):
+            return list(value) == list(other)
+        if isinstance(value, BaseException) and isinstance(other, BaseException):
+            return type(value) is type(other) and str(value) == str(other)
+        if isinstance(value, str) and isinstance(other, str):
+            return value == other
+        return False
+
+    @classmethod
+    def _error_value(cls, code, source, target):
+        """Path2 value of an unreachable row, as produced by PathEngine"""
+        if code == cls.PATH2_NO_SOURCE:
+            return nx.NodeNotFound(f"Source {source} is not in G")
+        if code == cls.PATH2_NO_TARGET:
+            return nx.NodeNotFound(f"Target {target} is not in G")
+        return f"NetworkXNoPath: No path between {source} and {target}."
+
+    def lookup(self, name, network, identifier, identifier_type):
+        """
+        Rebuild the analysis result of an identifier from the store.
+
+        Args:
+            name (str): Analyzer name the store was built with ('we' or 'others')
+            network (PreparedNetwork): Network the result is rebuilt from
+            identifier (str): Node or exchange identifier
+            identifier_type (str): Resolved type, 'node' or 'exchange'
+
+        Returns:
+            pd.DataFrame or None: None when the store does not cover the identifier
+            or was built for another data version
+        """
+        info = self.meta.get(name)
+        if info is None or info['data_version'] != network.data_version:
+            return None
+
+        position = self.positions[name].get((identifier, identifier_type))
+        if position is None:
+            return None
+
+        arrays = self.arrays[name]
+        layout = int(arrays['layouts'][position])
+        if layout == self.LAYOUT_LIVE:
+            return None
+        if layout == self.LAYOUT_EMPTY:
+            return pd.DataFrame()
+
+        start, end = arrays['identifier_offsets'][position], arrays['identifier_offsets'][position + 1]
+        rows = np.asarray(arrays['rows'][start:end])
+        columns = info['layouts'][layout]
+
+        results = network.final_df.iloc[rows].copy()
+        results['Impact'] = np.asarray(self.IMPACT_LABELS, dtype=object)[np.asarray(arrays['impacts'][start:end])]
+        if 'Path2' in columns:
+            results['Path2'] = self._decode_path2(name, network, results, arrays, position)
+
+        results = results[columns]
+        for col in ['Path', 'Path2']:
+            if col in results.columns:
+                results[col] = results[col].apply(lambda x: tuple(x) if isinstance(x, list) else x)
+        return results
+
+    def _decode_path2(self, name, network, results, arrays, position):
+        """Rebuild the Path2 column of a stored result"""
+        start, end = arrays['identifier_offsets'][position], arrays['identifier_offsets'][position + 1]
+        codes = np.asarray(arrays['path2_codes'][start:end])
+        target_hostname_col = network._get_column_mappings()['target_hostname']
+        base_path2 = results['Path2'].tolist() if 'Path2' in results.columns else [np.nan] * len(results)
+
+        path_index = int(arrays['identifier_path_offsets'][position])
+        path_offsets = arrays['path_offsets']
+        node_names = self.node_names[name]
+
+        path2 = []
+        for code, base, source, target in zip(
+            codes.tolist(), base_path2, results['EDGE'].tolist(), results[target_hostname_col].tolist()
+        ):
+            if code == self.PATH2_BASE:
+                path2.append(base)
+            elif code == self.PATH2_MISSING:
+                path2.append(np.nan)
+            elif code == self.PATH2_STORED:
+                nodes = arrays['path_nodes'][path_offsets[path_index]:path_offsets[path_index + 1]]
+                path2.append(node_names[np.asarray(nodes)].tolist())
+                path_index += 1
+            else:
+                path2.append(self._error_value(code, source, target))
+
+        return pd.Series(path2, index=results.index, dtype=object)
+
+
+# Network of the current store worker process (set by the pool initializer)
+_store_network = None
+
+def _init_store_worker(network):
+    """Process pool initializer: keep the prepared network for the worker's lifetime"""
+    global _store_network
+    _store_network = network
+
+def _encode_identifier(item):
+    """Process pool task: analyze and encode one (identifier, identifier_type) pair"""
+    identifier, identifier_type = item
+    try:
+        results = ImpactQuery(_store_network, identifier, identifier_type).analyze()
+    except Exception:
+        return None
+    return ImpactStore.encode_results(_store_network, results)
+
+
+def main():
+    from sweep import load_analyzers
+
+    parser = argparse.ArgumentParser(description="Precompute the impact matrix of every node/exchange")
+    parser.add_argument('--data-dir', default='data', help="Directory with the report, WAN, OSPF and AGG CSV files")
+    parser.add_argument('--store-dir', default='impact_store', help="Directory to write the store to")
+    parser.add_argument('--type', dest='identifier_type', choices=['node', 'exchange', 'all'], default='all')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    we_analyzer, others_analyzer = load_analyzers(args.data_dir)
+    analyzers = {'we': we_analyzer, 'others': others_analyzer}
+    for analyzer in analyzers.values():
+        analyzer.precompute_base_results()
+
+    ImpactStore.build(args.store_dir, analyzers, args.identifier_type, args.workers)
+    print(f"Impact store written to {args.store_dir}")
+
+
+if __name__ == "__main__":
+    main()
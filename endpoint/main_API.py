@@ -1,14 +1,27 @@
 # main.py (updated)
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Literal, Dict, Any
 import pandas as pd
-from unified_network_analyzer import UnifiedNetworkImpactAnalyzer
+from unified_network_analyzer import ImpactQuery
+from sweep import run_network_sweep, load_analyzers
+from snapshot import load_snapshot, write_snapshot, source_fingerprint
+from impact_store import ImpactStore
+from result_cache import ResultCache
+from single_flight import SingleFlight
+from result_query import query_results, column_values
+from topology import build_topology
+from exporters import (
+    stream_csv_zip, iter_csv_chunks, iter_ndjson, iter_arrow_stream,
+    ARROW_AVAILABLE, ARROW_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+)
 import logging
-import io
-import zipfile
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import json
+import uuid
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,36 +49,135 @@ class AnalysisResponse(BaseModel):
     results_preview: dict
     impact_summary: dict
 
-# Global analyzer instances (initialized on startup)
+class ResultsRequest(AnalysisRequest):
+    dataset: Literal['we', 'others'] = 'we'
+    offset: int = Field(0, ge=0)
+    limit: int = Field(50, ge=1, le=1000)
+    impact: Optional[str] = None
+    status: Optional[str] = None
+    cir_type: Optional[str] = None
+    msancode: Optional[str] = None
+    msancode_contains: Optional[str] = None
+    edge: Optional[str] = None
+    distribution: Optional[str] = None
+    bng: Optional[str] = None
+    bitstream: Optional[str] = None
+    min_cust: Optional[int] = None
+    max_cust: Optional[int] = None
+    sort_by: Optional[str] = None
+    descending: bool = False
+
+class ValuesRequest(AnalysisRequest):
+    dataset: Literal['we', 'others'] = 'we'
+    column: str
+
+class TopologyRequest(AnalysisRequest):
+    msancode: Optional[str] = None
+    collapse: Optional[Literal['exchange']] = None
+    max_links: int = Field(500, ge=1, le=20000)
+
+class SweepRequest(BaseModel):
+    identifier_type: Optional[Literal['node', 'exchange', 'all']] = 'all'
+    max_workers: Optional[int] = Field(None, ge=1)
+
+# Directory of the input CSV files and the snapshot built from them (see snapshot.py)
+DATA_DIR = os.environ.get(
+    "NETWORK_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+SNAPSHOT_PATH = os.environ.get("NETWORK_SNAPSHOT", os.path.join(DATA_DIR, "snapshot.pkl"))
+
+# Precomputed impact matrix (see impact_store.py), used when its data version matches
+IMPACT_STORE_DIR = os.environ.get(
+    "IMPACT_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "impact_store")
+)
+
+# Analyses run on this pool so they never block the event loop (WE and Others in parallel)
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+# Identical analyses requested while one is already running share its result
+analysis_flights = SingleFlight(analysis_executor)
+
+# LRU cache of analysis results shared by /analyze, /analyze/csv and /analyze/detailed
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", 256)),
+    max_bytes=int(os.environ.get("RESULT_CACHE_MAX_MB", 512)) * 1024 * 1024
+)
+
+# Global analyzer instances (initialized on startup, replaced as a pair by a reload)
 we_analyzer = None
 others_analyzer = None
+impact_store = None
+
+# Hot reload: new analyzers are built on their own thread, then swapped in on the
+# event loop so every request sees either the old or the new pair, never a mix
+DATA_WATCH_SECONDS = float(os.environ.get("DATA_WATCH_SECONDS", 0))
+reload_executor = ThreadPoolExecutor(max_workers=1)
+reload_state = {"status": "idle", "reason": None, "started_at": None, "finished_at": None, "error": None}
+reload_task = None
+watch_task = None
+data_fingerprint = None
+
+# Criticality sweep jobs by job ID; finished jobs are evicted after a TTL and
+# beyond a maximum count (oldest first)
+sweep_jobs = {}
+SWEEP_JOB_TTL_SECONDS = float(os.environ.get("SWEEP_JOB_TTL_SECONDS", 3600))
+SWEEP_MAX_FINISHED_JOBS = int(os.environ.get("SWEEP_MAX_FINISHED_JOBS", 20))
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the analyzers with CSV files on startup"""
-    global we_analyzer, others_analyzer
+    """Initialize the analyzers from the snapshot or the CSV files on startup"""
+    global we_analyzer, others_analyzer, impact_store, data_fingerprint, watch_task
     
     try:
-        logger.info("Loading CSV files...")
+        # Taken before reading so a change during startup is still picked up by the watcher
+        data_fingerprint = source_fingerprint(DATA_DIR)
+        
+        # Prepared analyzers from the binary snapshot when it is current, else from the CSV files
+        try:
+            analyzers = load_snapshot(SNAPSHOT_PATH, DATA_DIR)
+        except Exception as e:
+            logger.warning(f"Snapshot {SNAPSHOT_PATH} not loaded: {str(e)}")
+            analyzers = None
+        if analyzers is not None:
+            we_analyzer, others_analyzer = analyzers
+            logger.info(f"Snapshot loaded from {SNAPSHOT_PATH}")
+        else:
+            logger.info(f"Loading CSV files from {DATA_DIR}...")
+            
+            # Initialize analyzers for both data types
+            we_analyzer, others_analyzer = load_analyzers(DATA_DIR)
+            
+            logger.info(f"Data loaded successfully. WE shape: {we_analyzer.df_report.shape}, Others shape: {others_analyzer.df_report.shape}")
+            
+            # Base results do not depend on the queried identifier - compute them once here
+            logger.info("Precomputing base results...")
+            we_analyzer.precompute_base_results()
+            others_analyzer.precompute_base_results()
         
-        data_path = r"C:\Users\secre\OneDrive\Desktop\network-impact-web\endpoint\data"
-        # Load your CSV files
-        df_report_we = pd.read_csv(f'{data_path}\\Report(11).csv')  # WE data
-        df_report_others = pd.read_csv(f'{data_path}\\Report(12).csv')  # Others data
-        df_res_ospf = pd.read_csv(f'{data_path}\\res_ospf.csv')
-        df_wan = pd.read_csv(f'{data_path}\\wan.csv')
-        df_agg = pd.read_csv(f'{data_path}\\agg.csv')
+        logger.info(f"Base results ready. WE data version: {we_analyzer.data_version}, Others data version: {others_analyzer.data_version}")
         
-        # Initialize analyzers for both data types
-        we_analyzer = UnifiedNetworkImpactAnalyzer(df_report_we, df_res_ospf, df_wan, df_agg)
-        others_analyzer = UnifiedNetworkImpactAnalyzer(df_report_others, df_res_ospf, df_wan, df_agg)
+        impact_store = ImpactStore.open(IMPACT_STORE_DIR)
+        if impact_store is not None:
+            store_versions = {name: info["data_version"] for name, info in impact_store.meta.items()}
+            logger.info(f"Impact store opened from {IMPACT_STORE_DIR} (data versions: {store_versions})")
         
-        logger.info(f"Data loaded successfully. WE shape: {df_report_we.shape}, Others shape: {df_report_others.shape}")
+        if DATA_WATCH_SECONDS > 0:
+            watch_task = asyncio.create_task(_watch_data_files())
+            logger.info(f"Watching {DATA_DIR} for new data every {DATA_WATCH_SECONDS} seconds")
         
     except Exception as e:
         logger.error(f"Failed to load data: {str(e)}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the data watcher and the analysis and reload worker threads"""
+    if watch_task is not None:
+        watch_task.cancel()
+    analysis_executor.shutdown(wait=False)
+    reload_executor.shutdown(wait=False)
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -74,6 +186,14 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/analyze": "POST - Analyze network impact for both WE and Others",
+            "/analyze/full": "POST - Summary, preview and detailed rows in one response (API clients; the web results page pages through /analyze/results)",
+            "/analyze/results": "POST - One filtered, sorted page of the WE or Others results",
+            "/analyze/results/values": "POST - Distinct values of a result column",
+            "/analyze/topology": "POST - Deduplicated subgraph of the affected paths for visualization",
+            "/sweep": "POST - Start a criticality sweep over every node/exchange",
+            "/sweep/{job_id}": "GET - Sweep job status and ranked results",
+            "/cache/stats": "GET - Result cache and request coalescing counters",
+            "/reload": "POST - Reload the data files in the background (GET - reload status)",
             "/health": "GET - Health check"
         }
     }
@@ -84,7 +204,21 @@ async def health_check():
     if we_analyzer is None or others_analyzer is None:
         raise HTTPException(status_code=503, detail="Service not ready - analyzers not initialized")
     
-    return {"status": "healthy", "we_analyzer_ready": we_analyzer is not None, "others_analyzer_ready": others_analyzer is not None}
+    return {
+        "status": "healthy",
+        "we_analyzer_ready": we_analyzer is not None,
+        "others_analyzer_ready": others_analyzer is not None,
+        "we_data_version": we_analyzer.data_version,
+        "others_data_version": others_analyzer.data_version,
+        "result_cache": result_cache.stats(),
+        "single_flight": analysis_flights.stats(),
+        "reload": reload_state
+    }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Result cache hit/miss counters and memory usage, plus request coalescing counters"""
+    return {**result_cache.stats(), "single_flight": analysis_flights.stats()}
 
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_network_impact(request: AnalysisRequest):
@@ -103,60 +237,133 @@ async def analyze_network_impact(request: AnalysisRequest):
         import time
         start_time = time.time()
         
-        # Run the analysis on both data types
-        we_results = we_analyzer.run_complete_analysis(
-            request.identifier, 
-            request.identifier_type
-        )
-        
-        others_results = others_analyzer.run_complete_analysis(
-            request.identifier, 
-            request.identifier_type
-        )
+        # Run the analysis on both data types (answered from the impact store when possible)
+        we_results, others_results = await _analyze_both(request.identifier, request.identifier_type)
         
         execution_time = time.time() - start_time
         
-        # Create impact summaries
-        we_impact_summary = _create_impact_summary(we_results)
-        others_impact_summary = _create_impact_summary(others_results)
+        return AnalysisResponse(**_analysis_summary(request, we_results, others_results, execution_time))
+        
+    except Exception as e:
+        logger.error(f"Analysis failed for {request.identifier}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Analysis failed: {str(e)}"
+        )
+
+@app.post("/analyze/full")
+async def analyze_network_impact_full(request: AnalysisRequest):
+    """
+    Summary, preview and detailed rows of one analysis in a single response
+    (everything a results page needs, computed once)
+    """
+    if we_analyzer is None or others_analyzer is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    try:
+        logger.info(f"Starting full analysis for {request.identifier} (type: {request.identifier_type})")
+        
+        import time
+        start_time = time.time()
         
-        # Get previews
-        we_preview = _get_results_preview(we_results)
-        others_preview = _get_results_preview(others_results)
+        we_results, others_results = await _analyze_both(request.identifier, request.identifier_type)
         
-        # Determine analysis type
-        analysis_type = "Exchange" if request.identifier_type == 'exchange' else "Node"
-        if request.identifier_type == 'auto':
-            analysis_type = "Exchange" if ('.' in request.identifier or len(request.identifier.split('-')) < 4) else "Node"
+        execution_time = time.time() - start_time
         
-        # Combine results
-        combined_impact_summary = {
-            "we": we_impact_summary,
-            "others": others_impact_summary,
-            "total_records": we_impact_summary.get("total_records", 0) + others_impact_summary.get("total_records", 0),
-            "total_unique_msans": we_impact_summary.get("unique_msans", 0) + others_impact_summary.get("unique_msans", 0)
+        # Same encoding as /analyze for the summary and /analyze/detailed for the rows
+        response = AnalysisResponse(**_analysis_summary(request, we_results, others_results, execution_time))
+        return {
+            **response.model_dump(mode="json"),
+            "we_results": _to_records(we_results),
+            "others_results": _to_records(others_results)
         }
         
-        return AnalysisResponse(
-            status="success",
-            message=f"Analysis completed successfully for {request.identifier}",
-            total_records=combined_impact_summary["total_records"],
-            unique_msans=combined_impact_summary["total_unique_msans"],
-            analysis_type=analysis_type,
-            execution_time_seconds=round(execution_time, 3),
-            results_preview={
-                "we": we_preview,
-                "others": others_preview
-            },
-            impact_summary=combined_impact_summary
+    except Exception as e:
+        logger.error(f"Full analysis failed for {request.identifier}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Full analysis failed: {str(e)}")
+
+@app.post("/analyze/results")
+async def analyze_results_page(request: ResultsRequest):
+    """
+    One page of the WE or Others results, filtered and sorted on the server
+    (the analysis itself is served from the result cache after the first page)
+    """
+    if we_analyzer is None or others_analyzer is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    try:
+        results = await _analyze_dataset(request.dataset, request.identifier, request.identifier_type)
+        total, page = query_results(
+            results,
+            offset=request.offset,
+            limit=request.limit,
+            sort_by=request.sort_by,
+            descending=request.descending,
+            impact=request.impact,
+            status=request.status,
+            cir_type=request.cir_type,
+            msancode=request.msancode,
+            msancode_contains=request.msancode_contains,
+            edge=request.edge,
+            distribution=request.distribution,
+            bng=request.bng,
+            bitstream=request.bitstream,
+            min_cust=request.min_cust,
+            max_cust=request.max_cust
         )
-        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Analysis failed for {request.identifier}: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Analysis failed: {str(e)}"
+        logger.error(f"Results query failed for {request.identifier}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Results query failed: {str(e)}")
+    
+    return {
+        "dataset": request.dataset,
+        "total": total,
+        "offset": request.offset,
+        "limit": request.limit,
+        "columns": list(page.columns),
+        "rows": _to_records(page)
+    }
+
+@app.post("/analyze/results/values")
+async def analyze_results_values(request: ValuesRequest):
+    """Distinct values of one column of the WE or Others results (e.g. for selectors)"""
+    if we_analyzer is None or others_analyzer is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    try:
+        results = await _analyze_dataset(request.dataset, request.identifier, request.identifier_type)
+        values = column_values(results, request.column)
+    except Exception as e:
+        logger.error(f"Values query failed for {request.identifier}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Values query failed: {str(e)}")
+    
+    return {"dataset": request.dataset, "column": request.column, "values": values}
+
+@app.post("/analyze/topology")
+async def analyze_topology(request: TopologyRequest):
+    """
+    Nodes and links traversed by the affected MSANs' paths (WE and Others),
+    with per-link MSAN counts and the failed nodes. Capped to the max_links
+    busiest links; collapse='exchange' merges hostnames per exchange.
+    """
+    if we_analyzer is None or others_analyzer is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    try:
+        # Same analyzer pair as the analysis, even if a reload swaps them meanwhile
+        analyzers = (we_analyzer, others_analyzer)
+        we_results, others_results = await _analyze_both(request.identifier, request.identifier_type)
+        
+        # Resolves the failed nodes and walks every distinct path - keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            analysis_executor, _build_topology, analyzers, [we_results, others_results], request
         )
+    except Exception as e:
+        logger.error(f"Topology failed for {request.identifier}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Topology failed: {str(e)}")
 
 @app.post("/analyze/csv", response_class=StreamingResponse)
 async def analyze_and_return_csv(request: AnalysisRequest):
@@ -173,29 +380,13 @@ async def analyze_and_return_csv(request: AnalysisRequest):
         logger.info(f"Starting Impact Analysis for {request.identifier} (type: {request.identifier_type})")
         
         # Run analysis on both data types
-        we_results = we_analyzer.run_complete_analysis(
-            request.identifier, 
-            request.identifier_type
-        )
-        
-        others_results = others_analyzer.run_complete_analysis(
-            request.identifier, 
-            request.identifier_type
-        )
-        
-        # Create zip file in memory
-        zip_buffer = io.BytesIO()
+        we_results, others_results = await _analyze_both(request.identifier, request.identifier_type)
         
-        with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zip_file:
-            # Add WE results
-            we_csv = we_results.to_csv(index=False)
-            zip_file.writestr(f"we_impact_{request.identifier}.csv", we_csv)
-            
-            # Add Others results
-            others_csv = others_results.to_csv(index=False)
-            zip_file.writestr(f"others_impact_{request.identifier}.csv", others_csv)
-        
-        zip_buffer.seek(0)
+        # Zip is compressed and sent in chunks of rows as it is produced
+        zip_stream = stream_csv_zip([
+            (f"we_impact_{request.identifier}.csv", we_results),
+            (f"others_impact_{request.identifier}.csv", others_results)
+        ])
         
         # Generate filename
         safe_identifier = request.identifier.replace('/', '_').replace('\\', '_').replace('.', '_')
@@ -203,7 +394,7 @@ async def analyze_and_return_csv(request: AnalysisRequest):
         
         # Return as downloadable zip
         return StreamingResponse(
-            iter([zip_buffer.getvalue()]),
+            zip_stream,
             media_type="application/zip",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}",
@@ -218,6 +409,202 @@ async def analyze_and_return_csv(request: AnalysisRequest):
             detail=f"CSV analysis failed: {str(e)}"
         )
 
+@app.post("/reload", status_code=202)
+async def reload_data():
+    """
+    Rebuild both analyzers from the data files in the background and swap them
+    in when ready. Requests keep being served by the current data meanwhile.
+    """
+    if we_analyzer is None or others_analyzer is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    started = _start_reload("api")
+    return {"started": started, **reload_state}
+
+@app.get("/reload")
+async def get_reload_status():
+    """Status of the last reload"""
+    return reload_state
+
+def _start_reload(reason):
+    """Start a background reload unless one is already running"""
+    global reload_task
+    if reload_task is not None and not reload_task.done():
+        return False
+    
+    reload_state.update(status="running", reason=reason, error=None, finished_at=None,
+                        started_at=pd.Timestamp.now().isoformat())
+    reload_task = asyncio.create_task(_reload_analyzers())
+    return True
+
+def _build_analyzers():
+    """Reload worker: prepared analyzers of the current data files and their fingerprint"""
+    fingerprint = source_fingerprint(DATA_DIR)
+    new_we, new_others = load_analyzers(DATA_DIR)
+    new_we.precompute_base_results()
+    new_others.precompute_base_results()
+    return fingerprint, new_we, new_others
+
+async def _reload_analyzers():
+    """Build new analyzers off the event loop, then swap them in atomically"""
+    global we_analyzer, others_analyzer, data_fingerprint
+    loop = asyncio.get_running_loop()
+    
+    try:
+        fingerprint, new_we, new_others = await loop.run_in_executor(reload_executor, _build_analyzers)
+        
+        # Single step on the event loop: in-flight requests finish on the analyzers they hold
+        we_analyzer, others_analyzer = new_we, new_others
+        data_fingerprint = fingerprint
+        
+        # Entries of the old data versions can no longer be hit; analyses still
+        # running on the old analyzers are not cached (new cache generation)
+        result_cache.clear()
+        
+        reload_state.update(status="completed", data_versions={
+            "we": new_we.data_version, "others": new_others.data_version
+        })
+        logger.info(f"Data reloaded. WE data version: {new_we.data_version}, Others data version: {new_others.data_version}")
+        
+        if impact_store is not None:
+            store_versions = {name: info["data_version"] for name, info in impact_store.meta.items()}
+            if store_versions != {"we": new_we.data_version, "others": new_others.data_version}:
+                logger.warning("Impact store does not match the reloaded data - rebuild it with impact_store.py")
+        
+        # Persist the new data so the next restart starts from it
+        try:
+            await loop.run_in_executor(
+                reload_executor, write_snapshot, new_we, new_others, fingerprint, SNAPSHOT_PATH
+            )
+        except Exception as e:
+            logger.warning(f"Snapshot not written to {SNAPSHOT_PATH}: {str(e)}")
+        
+    except Exception as e:
+        reload_state.update(status="failed", error=str(e))
+        logger.error(f"Data reload failed: {str(e)}")
+    finally:
+        reload_state["finished_at"] = pd.Timestamp.now().isoformat()
+
+async def _watch_data_files():
+    """Poll the data files and reload once a change has settled (same fingerprint twice)"""
+    pending = None
+    while True:
+        await asyncio.sleep(DATA_WATCH_SECONDS)
+        try:
+            fingerprint = source_fingerprint(DATA_DIR)
+        except OSError as e:
+            logger.warning(f"Data watcher could not read {DATA_DIR}: {str(e)}")
+            continue
+        
+        if fingerprint == data_fingerprint:
+            pending = None
+        elif fingerprint == pending:
+            # Unchanged since the last poll - the files are no longer being written
+            if _start_reload("watcher"):
+                logger.info(f"Data files in {DATA_DIR} changed, reloading")
+            pending = None
+        else:
+            pending = fingerprint
+
+def _run_analysis(analyzer, store_name, identifier, identifier_type, cache_generation):
+    """
+    Analysis result from the result cache, then the impact store, falling back
+    to live analysis. Cached results are shared and must not be modified.
+    
+    cache_generation is the result cache generation when the analyzer was
+    picked; if a reload has cleared the cache since, the result is not cached.
+    """
+    # One query context against the analyzer's current network snapshot
+    query = ImpactQuery(analyzer.prepare(), identifier, identifier_type)
+    cache_key = (store_name, query.identifier, query.identifier_type, query.network.data_version)
+    
+    results = result_cache.get(cache_key)
+    if results is not None:
+        return results
+    
+    if impact_store is not None:
+        results = impact_store.lookup(store_name, query.network, query.identifier, query.identifier_type)
+        if results is not None:
+            logger.info(f"Impact store hit for {identifier} ({store_name})")
+    
+    if results is None:
+        results = query.run()
+    
+    result_cache.put(cache_key, results, cache_generation)
+    return results
+
+async def _analyze_both(identifier, identifier_type):
+    """Run the WE and Others analyses in parallel on the analysis executor"""
+    return await asyncio.gather(
+        _coalesced_analysis(we_analyzer, "we", identifier, identifier_type),
+        _coalesced_analysis(others_analyzer, "others", identifier, identifier_type)
+    )
+
+async def _analyze_dataset(dataset, identifier, identifier_type):
+    """Result of one data type ('we' or 'others')"""
+    analyzer = we_analyzer if dataset == "we" else others_analyzer
+    return await _coalesced_analysis(analyzer, dataset, identifier, identifier_type)
+
+async def _coalesced_analysis(analyzer, store_name, identifier, identifier_type):
+    """_run_analysis on the executor, shared by concurrent requests for the same analysis"""
+    resolved_type = identifier_type
+    if resolved_type == 'auto':
+        resolved_type = ImpactQuery.detect_identifier_type(identifier)
+    resolved_type = 'exchange' if resolved_type == 'exchange' else 'node'
+    
+    # Read with the analyzer, in the same event loop step as a reload's swap and clear
+    cache_generation = result_cache.generation
+    key = (store_name, identifier, resolved_type, analyzer.data_version)
+    return await analysis_flights.run(
+        key, _run_analysis, analyzer, store_name, identifier, identifier_type, cache_generation
+    )
+
+def _build_topology(analyzers, datasets, request):
+    """Topology payload of a TopologyRequest, with the failed nodes of both analyzers (blocking)"""
+    failed_nodes = set()
+    for analyzer in analyzers:
+        query = ImpactQuery(analyzer.prepare(), request.identifier, request.identifier_type)
+        failed_nodes.update(query.failed_nodes())
+    
+    return build_topology(datasets, failed_nodes, request.msancode, request.collapse, request.max_links)
+
+def _analysis_summary(request, we_results, others_results, execution_time):
+    """Fields of an AnalysisResponse: impact summaries and previews of both data types"""
+    # Create impact summaries
+    we_impact_summary = _create_impact_summary(we_results)
+    others_impact_summary = _create_impact_summary(others_results)
+    
+    # Get previews
+    we_preview = _get_results_preview(we_results)
+    others_preview = _get_results_preview(others_results)
+    
+    # Determine analysis type
+    analysis_type = "Exchange" if request.identifier_type == 'exchange' else "Node"
+    if request.identifier_type == 'auto':
+        analysis_type = "Exchange" if ('.' in request.identifier or len(request.identifier.split('-')) < 4) else "Node"
+    
+    # Combine results
+    combined_impact_summary = {
+        "we": we_impact_summary,
+        "others": others_impact_summary,
+        "total_records": we_impact_summary.get("total_records", 0) + others_impact_summary.get("total_records", 0),
+        "total_unique_msans": we_impact_summary.get("unique_msans", 0) + others_impact_summary.get("unique_msans", 0)
+    }
+    
+    return {
+        "status": "success",
+        "message": f"Analysis completed successfully for {request.identifier}",
+        "total_records": combined_impact_summary["total_records"],
+        "unique_msans": combined_impact_summary["total_unique_msans"],
+        "analysis_type": analysis_type,
+        "execution_time_seconds": round(execution_time, 3),
+        "results_preview": {
+            "we": we_preview,
+            "others": others_preview
+        },
+        "impact_summary": combined_impact_summary
+    }
+
 def _get_results_preview(results_df, num_records=5):
     """Get preview of results with key columns"""
     if results_df.empty:
@@ -249,47 +636,159 @@ def _create_impact_summary(results_df):
     
     # Impact breakdown
     if 'Impact' in results_df.columns:
-        impact_counts = results_df['Impact'].value_counts().to_dict()
-        summary["impact_breakdown"] = impact_counts
+        summary["impact_breakdown"] = _value_counts(results_df['Impact'])
     
     # Status breakdown
     if 'STATUS' in results_df.columns:
-        status_counts = results_df['STATUS'].value_counts().to_dict()
-        summary["status_breakdown"] = status_counts
+        summary["status_breakdown"] = _value_counts(results_df['STATUS'])
     
     # Circuit type breakdown
     if 'cir_type' in results_df.columns:
-        cir_type_counts = results_df['cir_type'].value_counts().to_dict()
-        summary["circuit_type_breakdown"] = cir_type_counts
+        summary["circuit_type_breakdown"] = _value_counts(results_df['cir_type'])
     
     return summary
 
+def _value_counts(series):
+    """Value counts as a dict, skipping unused categories of categorical columns"""
+    counts = series.value_counts()
+    return counts[counts > 0].to_dict()
+
+def _to_records(results_df):
+    """Convert a results DataFrame to JSON-safe records (NaN becomes None)"""
+    results_df = results_df.astype(object)
+    return results_df.where(pd.notnull(results_df), None).to_dict(orient='records')
+
 
 # Added, detailed results in the response:
 @app.post("/analyze/detailed")
-async def analyze_network_impact_detailed(request: AnalysisRequest):
-    """Get detailed analysis results including full data"""
+async def analyze_network_impact_detailed(
+    request: AnalysisRequest,
+    http_request: Request,
+    response_format: Optional[Literal['json', 'ndjson', 'arrow']] = Query(None, alias="format")
+):
+    """
+    Get detailed analysis results including full data.
+
+    The format is chosen with ?format=json|ndjson|arrow or the Accept header
+    (application/x-ndjson, application/vnd.apache.arrow.stream); JSON by default.
+    NDJSON and Arrow are streamed in chunks, with paths encoded as node indexes.
+    """
     if we_analyzer is None or others_analyzer is None:
         raise HTTPException(status_code=503, detail="Service not ready")
     
+    if response_format is None:
+        accept = http_request.headers.get("accept", "")
+        if ARROW_MEDIA_TYPE in accept:
+            response_format = "arrow"
+        elif NDJSON_MEDIA_TYPE in accept:
+            response_format = "ndjson"
+        else:
+            response_format = "json"
+    
+    if response_format == "arrow" and not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Arrow format requires pyarrow, which is not installed")
+    
     try:
         # Run analysis
-        we_results = we_analyzer.run_complete_analysis(request.identifier, request.identifier_type)
-        others_results = others_analyzer.run_complete_analysis(request.identifier, request.identifier_type)
+        we_results, others_results = await _analyze_both(request.identifier, request.identifier_type)
+        datasets = [("we_results", we_results), ("others_results", others_results)]
+        
+        if response_format == "ndjson":
+            return StreamingResponse(iter_ndjson(datasets), media_type=NDJSON_MEDIA_TYPE)
+        if response_format == "arrow":
+            return StreamingResponse(iter_arrow_stream(datasets), media_type=ARROW_MEDIA_TYPE)
 
         # Convert NaN values to None (which becomes null in JSON)
-        we_results_clean = we_results.where(pd.notnull(we_results), None)
-        others_results_clean = others_results.where(pd.notnull(others_results), None)
-        
         return {
-            "we_results": we_results_clean.to_dict(orient='records'),
-            "others_results": others_results_clean.to_dict(orient='records')
+            "we_results": _to_records(we_results),
+            "others_results": _to_records(others_results)
         }
     except Exception as e:
         logger.error(f"Detailed analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Detailed analysis failed: {str(e)}")
     
 
+def _run_sweep_job(job_id, identifier_type, max_workers):
+    """Background task: run the sweep and store the ranked table on the job"""
+    job = sweep_jobs[job_id]
+    try:
+        job["results"] = run_network_sweep([we_analyzer, others_analyzer], identifier_type, max_workers)
+        job["status"] = "completed"
+        logger.info(f"Sweep {job_id} completed: {len(job['results'])} identifiers")
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        logger.error(f"Sweep {job_id} failed: {str(e)}")
+    finally:
+        job["finished_at"] = pd.Timestamp.now().isoformat()
+
+def _evict_sweep_jobs():
+    """Drop finished sweep jobs older than the TTL, then the oldest beyond the count limit"""
+    now = pd.Timestamp.now()
+    finished = sorted(
+        (pd.Timestamp(job["finished_at"]), job_id)
+        for job_id, job in sweep_jobs.items() if job["finished_at"] is not None
+    )
+    for position, (finished_at, job_id) in enumerate(finished):
+        expired = (now - finished_at).total_seconds() > SWEEP_JOB_TTL_SECONDS
+        if expired or len(finished) - position > SWEEP_MAX_FINISHED_JOBS:
+            del sweep_jobs[job_id]
+
+@app.post("/sweep")
+async def start_sweep(request: SweepRequest, background_tasks: BackgroundTasks):
+    """Start a criticality sweep job (every identifier failing, one at a time)"""
+    if we_analyzer is None or others_analyzer is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    
+    _evict_sweep_jobs()
+    job_id = uuid.uuid4().hex
+    sweep_jobs[job_id] = {
+        "status": "running",
+        "identifier_type": request.identifier_type,
+        "started_at": pd.Timestamp.now().isoformat(),
+        "finished_at": None,
+        "error": None,
+        "results": None
+    }
+    background_tasks.add_task(_run_sweep_job, job_id, request.identifier_type, request.max_workers)
+    
+    logger.info(f"Started sweep {job_id} (type: {request.identifier_type})")
+    return {"job_id": job_id, "status": "running"}
+
+@app.get("/sweep/{job_id}")
+async def get_sweep(job_id: str, top: int = 100):
+    """Status of a sweep job and, once completed, the top ranked identifiers"""
+    _evict_sweep_jobs()
+    job = sweep_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Sweep job {job_id} not found")
+    
+    response = {key: value for key, value in job.items() if key != "results"}
+    response["job_id"] = job_id
+    if job["results"] is not None:
+        response["total_identifiers"] = len(job["results"])
+        response["results"] = _to_records(job["results"].head(top))
+    return response
+
+@app.get("/sweep/{job_id}/csv", response_class=StreamingResponse)
+async def get_sweep_csv(job_id: str):
+    """Download the full ranked table of a completed sweep job"""
+    _evict_sweep_jobs()
+    job = sweep_jobs.get(job_id)
+    if job is None or job["results"] is None:
+        raise HTTPException(status_code=404, detail=f"No sweep results for job {job_id}")
+    
+    filename = f"criticality_sweep_{job_id}.csv"
+    return StreamingResponse(
+        iter_csv_chunks(job["results"]),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Access-Control-Expose-Headers": "Content-Disposition"
+        }
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     
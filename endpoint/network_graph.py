@@ -0,0 +1,402 @@
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+
+class NetworkGraph:
+    """
+    Compact, undirected WAN topology.
+
+    Hostnames are interned to integer IDs and the adjacency is stored as CSR
+    arrays: the neighbors of node i are indices[indptr[i]:indptr[i + 1]].
+    ordered holds the same neighbors in the order their links first appear in
+    the link table, which is the adjacency order of the equivalent nx.Graph.
+    Only nodes that take part in at least one link are part of the graph.
+    """
+
+    def __init__(self, node_names, indptr, indices, ordered=None):
+        """Initialize from interned node names and CSR adjacency arrays"""
+        self.node_names = node_names
+        self.node_ids = {name: node_id for node_id, name in enumerate(node_names.tolist())}
+        self.indptr = indptr
+        self.indices = indices
+        self.ordered = indices if ordered is None else ordered
+
+    @classmethod
+    def from_edges(cls, sources, targets):
+        """
+        Build the graph from two aligned sequences of hostnames (one link per pair).
+
+        Duplicate links are collapsed and every link is stored in both directions.
+        Pairs with a missing hostname are skipped.
+        """
+        sources = np.asarray(sources, dtype=object)
+        targets = np.asarray(targets, dtype=object)
+        valid = pd.notna(sources) & pd.notna(targets)
+
+        codes, node_names = pd.factorize(np.concatenate([sources[valid], targets[valid]]))
+        num_links = int(valid.sum())
+        num_nodes = len(node_names)
+
+        # Symmetric (row, col) pairs with the position of their link in the table
+        rows = np.concatenate([codes[:num_links], codes[num_links:]]).astype(np.int64)
+        cols = np.concatenate([codes[num_links:], codes[:num_links]]).astype(np.int64)
+        positions = np.tile(np.arange(num_links, dtype=np.int64), 2)
+        all_keys = rows * num_nodes + cols
+
+        # De-duplicated pairs sorted by row then col, with their first position
+        order = np.lexsort((positions, all_keys))
+        keys, first = np.unique(all_keys[order], return_index=True)
+        first_positions = positions[order][first]
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // max(num_nodes, 1), minlength=num_nodes), out=indptr[1:])
+        indices = (keys % max(num_nodes, 1)).astype(np.int32)
+
+        # Same pairs sorted by row then first position (networkx insertion order)
+        by_position = np.lexsort((first_positions, keys // max(num_nodes, 1)))
+        ordered = indices[by_position]
+
+        return cls(np.asarray(node_names, dtype=object), indptr, indices, ordered)
+
+    def __contains__(self, name):
+        return name in self.node_ids
+
+    def __len__(self):
+        return len(self.node_names)
+
+    @property
+    def number_of_edges(self):
+        return len(self.indices) // 2
+
+    def neighbors(self, node_id):
+        """Neighbor IDs of a node"""
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def edges(self):
+        """Every link once, as two aligned arrays of node IDs"""
+        rows = np.repeat(np.arange(len(self.node_names)), np.diff(self.indptr))
+        keep = rows <= self.indices
+        return rows[keep], self.indices[keep]
+
+    def without(self, excluded_nodes):
+        """View of this graph with the given hostnames removed (nothing is copied)"""
+        excluded_ids = [self.node_ids[name] for name in excluded_nodes if name in self.node_ids]
+        return NetworkGraphView(self, excluded_ids)
+
+    def bfs(self, root_id, excluded=None):
+        """
+        Level-synchronous BFS from root over the CSR arrays.
+
+        The predecessors give one shortest path per node (through its lowest-ID
+        neighbor one level closer to root). That is the path nx.shortest_path
+        returns only when it is the sole shortest path, so the number of
+        shortest paths is counted as well (capped at 2); see bidirectional_path
+        for the others.
+
+        Args:
+            root_id (int): Node ID to start from
+            excluded (np.ndarray): Optional boolean mask of node IDs the search may not enter
+
+        Returns:
+            tuple: (predecessors, path_counts) per node ID. Predecessor is the
+            next hop towards root, -1 when unreachable and root_id for the root
+            itself; path_counts is the number of shortest paths to root, 0 when
+            unreachable and 2 for two or more.
+        """
+        predecessors = np.full(len(self.node_names), -1, dtype=np.int32)
+        path_counts = np.zeros(len(self.node_names), dtype=np.int8)
+        if excluded is not None:
+            # Mark excluded nodes as already visited so the search never enters them
+            predecessors[excluded] = -2
+        predecessors[root_id] = root_id
+        path_counts[root_id] = 1
+        frontier = np.array([root_id], dtype=np.int64)
+
+        while frontier.size:
+            starts = self.indptr[frontier]
+            counts = self.indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+
+            # Gather all neighbor slots of the frontier in one shot
+            slot_offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            neighbors = self.indices[slot_offsets + np.arange(total)]
+            parents = np.repeat(frontier, counts)
+
+            unseen = predecessors[neighbors] == -1
+            parents = parents[unseen]
+            neighbors, first, slots = np.unique(neighbors[unseen], return_index=True, return_inverse=True)
+            predecessors[neighbors] = parents[first]
+            # Paths to a new node: the sum over all its parents on the previous level
+            path_counts[neighbors] = np.minimum(np.bincount(slots, weights=path_counts[parents]), 2)
+            frontier = neighbors.astype(np.int64)
+
+        if excluded is not None:
+            predecessors[predecessors == -2] = -1
+        return predecessors, path_counts
+
+    def bidirectional_path(self, source_id, target_id, excluded=None):
+        """
+        The source -> target path nx.shortest_path returns on the equivalent nx.Graph.
+
+        Same bidirectional BFS as networkx, walking neighbors in link-table
+        order, so ties between equal-length paths are broken the same way.
+        Only needed where the BFS found more than one shortest path.
+
+        Returns:
+            list: Hostnames on the path, or None when there is none
+        """
+        def neighbors(node_id):
+            ordered = self.ordered[self.indptr[node_id]:self.indptr[node_id + 1]]
+            if excluded is not None:
+                ordered = ordered[~excluded[ordered]]
+            return ordered.tolist()
+
+        if source_id == target_id:
+            return self.node_names[[source_id]].tolist()
+
+        pred = {source_id: None}
+        succ = {target_id: None}
+        forward_fringe = [source_id]
+        reverse_fringe = [target_id]
+        meeting = None
+
+        while forward_fringe and reverse_fringe and meeting is None:
+            if len(forward_fringe) <= len(reverse_fringe):
+                this_level, forward_fringe = forward_fringe, []
+                for v in this_level:
+                    for w in neighbors(v):
+                        if w not in pred:
+                            forward_fringe.append(w)
+                            pred[w] = v
+                        if w in succ:
+                            meeting = w
+                            break
+                    if meeting is not None:
+                        break
+            else:
+                this_level, reverse_fringe = reverse_fringe, []
+                for v in this_level:
+                    for w in neighbors(v):
+                        if w not in succ:
+                            succ[w] = v
+                            reverse_fringe.append(w)
+                        if w in pred:
+                            meeting = w
+                            break
+                    if meeting is not None:
+                        break
+
+        if meeting is None:
+            return None
+
+        path = []
+        node_id = meeting
+        while node_id is not None:
+            path.append(node_id)
+            node_id = pred[node_id]
+        path.reverse()
+        node_id = succ[meeting]
+        while node_id is not None:
+            path.append(node_id)
+            node_id = succ[node_id]
+        return self.node_names[path].tolist()
+
+    def path_to_root(self, predecessors, node_id):
+        """Hostnames on the path from node to the BFS root, or None when unreachable"""
+        if predecessors[node_id] < 0:
+            return None
+
+        path = [node_id]
+        while predecessors[node_id] != node_id:
+            node_id = predecessors[node_id]
+            path.append(node_id)
+        return self.node_names[path].tolist()
+
+
+class NetworkGraphView:
+    """
+    Read-only view of a NetworkGraph with a set of nodes removed.
+
+    Behaves like the graph rebuilt without those nodes: excluded nodes, and
+    nodes left without any remaining link, are not part of the view.
+    """
+
+    def __init__(self, graph, excluded_ids):
+        """Initialize with the base graph and the node IDs to hide"""
+        self.graph = graph
+        self.node_names = graph.node_names
+        self.node_ids = graph.node_ids
+        self.excluded = np.zeros(len(graph), dtype=bool)
+        self.excluded[excluded_ids] = True
+
+    def __contains__(self, name):
+        node_id = self.node_ids.get(name)
+        if node_id is None or self.excluded[node_id]:
+            return False
+        return not self.excluded[self.graph.neighbors(node_id)].all()
+
+    def __len__(self):
+        return len(self.graph)
+
+    def without(self, excluded_nodes):
+        """View with additional hostnames removed"""
+        excluded_ids = np.flatnonzero(self.excluded).tolist()
+        excluded_ids += [self.node_ids[name] for name in excluded_nodes if name in self.node_ids]
+        return NetworkGraphView(self.graph, excluded_ids)
+
+    def edges(self):
+        """Every link between nodes of the view once, as two aligned arrays of node IDs"""
+        rows, cols = self.graph.edges()
+        keep = ~self.excluded[rows] & ~self.excluded[cols]
+        return rows[keep], cols[keep]
+
+    def neighbors(self, node_id):
+        """Neighbor IDs of a node that are still part of the view"""
+        neighbors = self.graph.neighbors(node_id)
+        return neighbors[~self.excluded[neighbors]]
+
+    def bfs(self, root_id):
+        """BFS from root that never enters excluded nodes"""
+        return self.graph.bfs(root_id, excluded=self.excluded)
+
+    def bidirectional_path(self, source_id, target_id):
+        """networkx's source -> target path through the nodes of the view"""
+        return self.graph.bidirectional_path(source_id, target_id, excluded=self.excluded)
+
+    def path_to_root(self, predecessors, node_id):
+        """Hostnames on the path from node to the BFS root, or None when unreachable"""
+        return self.graph.path_to_root(predecessors, node_id)
+
+
+class BlockCutTree:
+    """
+    Block-cut tree of a graph: its biconnected components (blocks) and articulation points.
+
+    A single failed node separates two hosts only when it is an articulation
+    point lying on the tree path between their blocks, so reachability after
+    one node failure is answered without any search.
+    """
+
+    def __init__(self, graph, representative, articulation, tin, tout, tree_root, children):
+        """Initialize from the precomputed tree arrays (see build)"""
+        self.graph = graph
+        self.representative = representative
+        self.articulation = articulation
+        self.tin = tin
+        self.tout = tout
+        self.tree_root = tree_root
+        self.children = children
+        self.children_tin = [[tin[child] for child in node_children] for node_children in children]
+
+    @classmethod
+    def build(cls, graph):
+        """
+        Decompose a NetworkGraph (or view) into its block-cut forest.
+
+        Tree nodes 0..B-1 are the blocks, B.. are the articulation points. Each
+        graph node is represented by its articulation tree node if it is one,
+        otherwise by the only block containing it.
+        """
+        rows, cols = graph.edges()
+        links = nx.Graph()
+        links.add_edges_from((u, v) for u, v in zip(rows.tolist(), cols.tolist()) if u != v)
+
+        blocks = list(nx.biconnected_components(links))
+        articulation_ids = {node: len(blocks) + i for i, node in enumerate(sorted(nx.articulation_points(links)))}
+
+        num_tree_nodes = len(blocks) + len(articulation_ids)
+        adjacency = [[] for _ in range(num_tree_nodes)]
+        representative = np.full(len(graph), -1, dtype=np.int64)
+        articulation = np.zeros(len(graph), dtype=bool)
+
+        for block_id, block in enumerate(blocks):
+            for node in block:
+                if node in articulation_ids:
+                    adjacency[block_id].append(articulation_ids[node])
+                    adjacency[articulation_ids[node]].append(block_id)
+                else:
+                    representative[node] = block_id
+        for node, tree_id in articulation_ids.items():
+            representative[node] = tree_id
+            articulation[node] = True
+
+        # Iterative DFS: entry/exit times for ancestor tests, root per tree
+        tin = np.full(num_tree_nodes, -1, dtype=np.int64)
+        tout = np.zeros(num_tree_nodes, dtype=np.int64)
+        tree_root = np.zeros(num_tree_nodes, dtype=np.int64)
+        children = [[] for _ in range(num_tree_nodes)]
+        timer = 0
+
+        for start in range(num_tree_nodes):
+            if tin[start] >= 0:
+                continue
+            tin[start] = timer
+            tree_root[start] = start
+            timer += 1
+            stack = [(start, iter(adjacency[start]))]
+
+            while stack:
+                node, pending = stack[-1]
+                for child in pending:
+                    if tin[child] < 0:
+                        tin[child] = timer
+                        tree_root[child] = start
+                        timer += 1
+                        children[node].append(child)
+                        stack.append((child, iter(adjacency[child])))
+                        break
+                else:
+                    tout[node] = timer
+                    timer += 1
+                    stack.pop()
+
+        return cls(graph, representative, articulation, tin, tout, tree_root, children)
+
+    def _is_ancestor(self, ancestor, node):
+        return self.tin[ancestor] <= self.tin[node] and self.tout[node] <= self.tout[ancestor]
+
+    def _on_tree_path(self, node, a, b):
+        """Whether tree node lies on the tree path between tree nodes a and b"""
+        above_a = self._is_ancestor(node, a)
+        above_b = self._is_ancestor(node, b)
+        if above_a != above_b:
+            return True
+        if not above_a:
+            return False
+
+        # Both below node: it is on the path only if they hang off different children
+        child_index = bisect_right(self.children_tin[node], self.tin[a]) - 1
+        if child_index < 0:
+            return True
+        return not self._is_ancestor(self.children[node][child_index], b)
+
+    def is_connected_without(self, source, target, failed_node):
+        """
+        Whether source still reaches target once failed_node is removed from the graph.
+
+        Returns:
+            bool or None: None when the tree cannot answer for these hosts
+        """
+        if source == failed_node or target == failed_node:
+            return False
+        if source not in self.graph or target not in self.graph:
+            return False
+        if source == target:
+            return source in self.graph.without([failed_node])
+
+        source_rep = self.representative[self.graph.node_ids[source]]
+        target_rep = self.representative[self.graph.node_ids[target]]
+        if source_rep < 0 or target_rep < 0:
+            return None
+        if self.tree_root[source_rep] != self.tree_root[target_rep]:
+            return False
+
+        failed_id = self.graph.node_ids.get(failed_node)
+        if failed_id is None or not self.articulation[failed_id]:
+            return True
+        return not self._on_tree_path(self.representative[failed_id], source_rep, target_rep)
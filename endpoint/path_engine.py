@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+
+class PathEngine:
+    """
+    Shortest path engine for many (source, target) pairs over one NetworkGraph.
+
+    Thousands of report rows share the same target host, so instead of one
+    shortest path search per row the engine runs a single BFS per distinct
+    target and reads the path of every source from the predecessor map.
+    Sources with more than one shortest path are searched again the way
+    nx.shortest_path does, so ties are broken exactly as networkx breaks them.
+    """
+
+    def __init__(self, graph):
+        """Initialize with the graph to search"""
+        self.graph = graph
+
+    def shortest_path_tree(self, target):
+        """Run a BFS from target and return (predecessors, path_counts) per node ID (see NetworkGraph.bfs)"""
+        return self.graph.bfs(self.graph.node_ids[target])
+
+    def path_from_tree(self, tree, source, target):
+        """
+        Read the source -> target path from a shortest path tree.
+
+        Returns the same values as UnifiedCIRModel._calculate_path: a list of
+        hostnames, a NetworkXNoPath message or a NodeNotFound exception.
+        tree may be None when source is already known to be unreachable.
+        """
+        if source not in self.graph:
+            return nx.NodeNotFound(f"Source {source} is not in G")
+        if target not in self.graph:
+            return nx.NodeNotFound(f"Target {target} is not in G")
+
+        if tree is None:
+            return f"NetworkXNoPath: No path between {source} and {target}."
+
+        predecessors, path_counts = tree
+        source_id = self.graph.node_ids[source]
+        if path_counts[source_id] > 1:
+            # Several shortest paths: pick the one networkx picks
+            path = self.graph.bidirectional_path(source_id, self.graph.node_ids[target])
+        else:
+            path = self.graph.path_to_root(predecessors, source_id)
+        if path is None:
+            return f"NetworkXNoPath: No path between {source} and {target}."
+        return path
+
+    def calculate_path(self, source, target):
+        """Calculate the path for a single (source, target) pair"""
+        tree = self.shortest_path_tree(target) if target in self.graph else None
+        return self.path_from_tree(tree, source, target)
+
+    def calculate_paths(self, sources, targets):
+        """
+        Calculate the path for every (source, target) pair, one BFS per distinct target.
+
+        Args:
+            sources (pd.Series): Source hostname per row (e.g. EDGE)
+            targets (pd.Series): Target hostname per row, aligned with sources
+
+        Returns:
+            pd.Series: Path per row, indexed like sources
+        """
+        source_values = sources.tolist()
+        paths = [None] * len(source_values)
+
+        for target, positions in self._rows_by_target(targets).items():
+            tree = self.shortest_path_tree(target) if target in self.graph else None
+            # Rows of the same source share one path (and one tie search)
+            by_source = {}
+            for position in positions:
+                source = source_values[position]
+                if source not in by_source:
+                    by_source[source] = self.path_from_tree(tree, source, target)
+                path = by_source[source]
+                paths[position] = list(path) if isinstance(path, list) else path
+
+        return pd.Series(paths, index=sources.index, dtype=object)
+
+    def unique_paths(self, sources, targets):
+        """
+        Mask over the pairs, True where source has at most one shortest path to
+        target (its path does not depend on how ties are broken).
+        """
+        source_values = sources.tolist()
+        unique = np.ones(len(source_values), dtype=bool)
+
+        for target, positions in self._rows_by_target(targets).items():
+            if target not in self.graph:
+                continue
+            _, path_counts = self.shortest_path_tree(target)
+            for position in positions:
+                source_id = self.graph.node_ids.get(source_values[position])
+                if source_id is not None and path_counts[source_id] > 1:
+                    unique[position] = False
+
+        return unique
+
+    @staticmethod
+    def _rows_by_target(targets):
+        """Row positions grouped by target host"""
+        rows_by_target = {}
+        for position, target in enumerate(targets.tolist()):
+            rows_by_target.setdefault(target, []).append(position)
+        return rows_by_target
@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class PathIndex:
+    """
+    Inverted index from node to the base-result rows whose Path or Path2 transit it.
+
+    A node transits a path when it lies strictly inside it (not the EDGE or the
+    target end). Rows are stored as sorted positions into the indexed frame,
+    grouped per node ID in CSR layout: rows[indptr[i]:indptr[i + 1]].
+    """
+
+    def __init__(self, node_ids, indptr, rows, num_rows):
+        """Initialize from the node ID mapping and CSR arrays"""
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.rows = rows
+        self.num_rows = num_rows
+
+    @classmethod
+    def build(cls, path_stores, graph):
+        """
+        Build the index over the path columns of a base-results frame.
+
+        Args:
+            path_stores (list): PathStore of each path column to index (e.g. Path and Path2)
+            graph (NetworkGraph): Graph the paths were computed on (node ID source)
+        """
+        node_ids = graph.node_ids
+        num_indexed = len(path_stores[0]) if path_stores else 0
+        num_rows = max(num_indexed, 1)
+        pair_nodes = [np.empty(0, dtype=np.int64)]
+        pair_rows = [np.empty(0, dtype=np.int64)]
+
+        for store in path_stores:
+            nodes, rows = store.interior()
+            # IDs past the graph's are hostnames the graph does not have
+            in_graph = nodes < len(graph)
+            pair_nodes.append(nodes[in_graph].astype(np.int64))
+            pair_rows.append(rows[in_graph])
+
+        num_nodes = len(graph)
+
+        # De-duplicated (node, row) pairs sorted by node then row
+        keys = np.unique(np.concatenate(pair_nodes) * num_rows + np.concatenate(pair_rows))
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // num_rows, minlength=num_nodes), out=indptr[1:])
+        rows = (keys % num_rows).astype(np.int32)
+
+        return cls(node_ids, indptr, rows, num_indexed)
+
+    def rows_for(self, nodes):
+        """Sorted positions of the rows whose paths transit any of the given nodes"""
+        slices = [
+            self.rows[self.indptr[node_id]:self.indptr[node_id + 1]]
+            for node_id in (self.node_ids.get(node) for node in nodes)
+            if node_id is not None
+        ]
+        if not slices:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(slices))
+
+    def mask_for(self, nodes):
+        """Boolean mask over the indexed rows, True where a path transits any of the nodes"""
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[self.rows_for(nodes)] = True
+        return mask
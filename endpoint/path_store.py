@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+
+# Result columns holding a path (list of hostnames) or a path error
+PATH_COLUMNS = ('Path', 'Path2')
+
+
+class PathStore:
+    """
+    Integer-encoded path column.
+
+    The hostnames of every row's path are stored as node IDs in one flat int32
+    array: the path of row i is nodes[offsets[i]:offsets[i + 1]], read through
+    node_names. A status code per row tells paths from the values that are not
+    paths; those are kept as they are in errors (row -> value) so the column
+    can be rebuilt exactly.
+    """
+
+    # Status codes
+    PATH = 0
+    MISSING = 1    # NaN (no path computed)
+    NO_PATH = 2    # NetworkXNoPath (or other error) message
+    NOT_FOUND = 3  # NodeNotFound for the source or target host
+
+    def __init__(self, node_names, node_ids, offsets, nodes, status, errors):
+        """Initialize from the node table and encoded arrays (see from_values)"""
+        self.node_names = node_names
+        self.node_ids = node_ids
+        self.offsets = offsets
+        self.nodes = nodes
+        self.status = status
+        self.errors = errors
+
+    @classmethod
+    def from_values(cls, values, node_names, node_ids):
+        """
+        Encode a path column.
+
+        Args:
+            values (iterable): Path values (lists or tuples of hostnames, error
+                messages, exceptions or NaN)
+            node_names (np.ndarray): Hostname per node ID (e.g. NetworkGraph.node_names)
+            node_ids (dict): Hostname -> node ID, consistent with node_names. It is
+                never modified: hostnames it does not have get new IDs in this
+                store's own node table, so a shared graph mapping can be passed.
+
+        Returns:
+            PathStore: The encoded column
+        """
+        values = list(values)
+        status = np.full(len(values), cls.PATH, dtype=np.int8)
+        lengths = np.zeros(len(values), dtype=np.int64)
+        errors = {}
+        flat = []
+        extra = {}
+
+        for row, value in enumerate(values):
+            if isinstance(value, (list, tuple)):
+                for node in value:
+                    node_id = node_ids.get(node)
+                    if node_id is None:
+                        node_id = extra.setdefault(node, len(node_ids) + len(extra))
+                    flat.append(node_id)
+                lengths[row] = len(value)
+                continue
+
+            errors[row] = value
+            if isinstance(value, BaseException):
+                status[row] = cls.NOT_FOUND
+            elif isinstance(value, str):
+                status[row] = cls.NO_PATH
+            else:
+                status[row] = cls.MISSING
+
+        if extra:
+            node_names = np.concatenate([np.asarray(node_names, dtype=object), np.array(list(extra), dtype=object)])
+            node_ids = {**node_ids, **extra}
+
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        return cls(node_names, node_ids, offsets, np.array(flat, dtype=np.int32), status, errors)
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def nbytes(self):
+        """Size of the encoded arrays"""
+        return self.offsets.nbytes + self.nodes.nbytes + self.status.nbytes
+
+    def lengths(self):
+        """Number of hostnames in each row's path (0 for non-paths)"""
+        return np.diff(self.offsets)
+
+    def path_ids(self, row):
+        """Node IDs of a row's path (empty for non-paths)"""
+        return self.nodes[self.offsets[row]:self.offsets[row + 1]]
+
+    def value(self, row):
+        """A row's value as the analyzer produces it: a hostname list or the stored non-path value"""
+        if self.status[row] == self.PATH:
+            return self.node_names[self.path_ids(row)].tolist()
+        return self.errors[row]
+
+    def keys(self):
+        """
+        Path code per row: equal codes for equal paths. Non-path rows are
+        compared by status and message, like str() of their value.
+        """
+        offsets = self.offsets.tolist()
+        nodes = self.nodes
+        keys = [
+            nodes[offsets[row]:offsets[row + 1]].tobytes() if code == self.PATH
+            else (code, str(self.errors[row]))
+            for row, code in enumerate(self.status.tolist())
+        ]
+        return pd.factorize(pd.Series(keys, dtype=object))[0]
+
+    def to_series(self, index):
+        """
+        The decoded column. Rows with identical paths share one list, so the
+        column holds one list per distinct path rather than one per row.
+        """
+        codes = self.keys()
+        shared = {}
+        values = []
+        for row, code in enumerate(codes.tolist()):
+            if self.status[row] != self.PATH:
+                values.append(self.errors[row])
+                continue
+            path = shared.get(code)
+            if path is None:
+                path = shared[code] = self.value(row)
+            values.append(path)
+        return pd.Series(values, index=index, dtype=object)
+
+    def avoids(self, rows, nodes):
+        """
+        Mask over rows, True where the row's path has more than one hostname and
+        none of the given nodes.
+
+        Args:
+            rows (np.ndarray): Row positions in this store
+            nodes (iterable): Hostnames to avoid
+        """
+        node_ids = [self.node_ids[node] for node in nodes if node in self.node_ids]
+        hit = np.isin(self.nodes, node_ids)
+        hits_before = np.concatenate([[0], np.cumsum(hit)])
+
+        starts = self.offsets[rows]
+        ends = self.offsets[rows + 1]
+        return (self.status[rows] == self.PATH) & (ends - starts > 1) & (hits_before[ends] == hits_before[starts])
+
+    def interior(self):
+        """
+        Every (node ID, row) pair where the node lies strictly inside the row's
+        path (not its first or last hostname), as two aligned arrays.
+        """
+        lengths = self.lengths()
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), lengths)
+        positions = np.arange(len(self.nodes), dtype=np.int64) - self.offsets[rows]
+        inside = (positions >= 1) & (positions <= lengths[rows] - 2)
+        return self.nodes[inside], rows[inside]
@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of analysis results (DataFrames).
+
+    Bounded both by number of entries and by total memory size; the least
+    recently used entries are evicted first. Cached DataFrames are shared
+    between requests and must not be modified by callers.
+
+    Each clear starts a new generation: a result computed from data read
+    before the clear is dropped when it is put with its older generation.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=512 * 1024 * 1024):
+        """Initialize an empty cache with its entry and memory bounds"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    @staticmethod
+    def _size_of(results):
+        """Approximate memory size of a result DataFrame in bytes"""
+        return int(results.memory_usage(index=True, deep=True).sum())
+
+    def get(self, key):
+        """Cached result for key (marked as most recently used), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, results, generation=None):
+        """
+        Cache a result, evicting least recently used entries to stay within bounds.
+
+        generation is the cache generation read when the analysis started; the
+        result is dropped if the cache has been cleared since.
+        """
+        size = self._size_of(results)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self.stale += 1
+                return
+
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+
+            self._entries[key] = (results, size)
+            self.total_bytes += size
+
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and start a new generation (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.generation += 1
+
+    def stats(self):
+        """Hit/miss counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale": self.stale,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
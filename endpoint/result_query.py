@@ -0,0 +1,135 @@
+"""
+Filtering, sorting and paging of analysis results.
+
+Serves the results page one page at a time from a cached result DataFrame, so
+neither the page nor the response grows with the size of the impact.
+"""
+from path_store import PATH_COLUMNS
+
+# Columns the exact-match filters apply to (values picked from a list, or one MSAN)
+FILTER_COLUMNS = {
+    'msancode': 'MSANCODE',
+    'impact': 'Impact',
+    'status': 'STATUS',
+    'cir_type': 'cir_type'
+}
+
+# Columns the text filters apply to (case-insensitive substring, as typed)
+TEXT_FILTER_COLUMNS = {
+    'msancode_contains': 'MSANCODE',
+    'edge': 'EDGE',
+    'distribution': 'distribution_hostname',
+    'bng': 'BNG_HOSTNAME',
+    'bitstream': 'BITSTREAM_HOSTNAME'
+}
+
+
+def filter_results(results_df, impact=None, status=None, cir_type=None, msancode=None,
+                   msancode_contains=None, edge=None, distribution=None, bng=None, bitstream=None,
+                   min_cust=None, max_cust=None):
+    """
+    Rows matching every given filter (None or an empty text means no filter).
+
+    impact, status, cir_type and msancode match their column exactly (msancode
+    selects one MSAN, like the topology endpoint); msancode_contains, edge,
+    distribution, bng and bitstream match values containing the text, ignoring
+    case; min_cust and max_cust bound CUST inclusively. A filter on a column
+    the results do not have matches no rows.
+    """
+    exact = {'msancode': msancode, 'impact': impact, 'status': status, 'cir_type': cir_type}
+    text = {'msancode_contains': msancode_contains, 'edge': edge, 'distribution': distribution, 'bng': bng, 'bitstream': bitstream}
+    mask = None
+
+    def restrict(condition):
+        nonlocal mask
+        mask = condition if mask is None else mask & condition
+
+    for name, value in exact.items():
+        if value is None:
+            continue
+        column = FILTER_COLUMNS[name]
+        if column not in results_df.columns:
+            return results_df.iloc[:0]
+        restrict(results_df[column].astype(object) == value)
+
+    for name, value in text.items():
+        if not value:
+            continue
+        column = TEXT_FILTER_COLUMNS[name]
+        if column not in results_df.columns:
+            return results_df.iloc[:0]
+        matches = results_df[column].astype('string').str.contains(value, case=False, regex=False, na=False)
+        restrict(matches.to_numpy(dtype=bool))
+
+    if min_cust is not None or max_cust is not None:
+        if 'CUST' not in results_df.columns:
+            return results_df.iloc[:0]
+        if min_cust is not None:
+            restrict(results_df['CUST'] >= min_cust)
+        if max_cust is not None:
+            restrict(results_df['CUST'] <= max_cust)
+
+    return results_df if mask is None else results_df[mask]
+
+
+def sort_results(results_df, sort_by=None, descending=False):
+    """
+    Rows sorted by one column (stable, missing values last).
+
+    Path columns cannot be sorted. Sorting by a column the results do not
+    have leaves them in analysis order.
+    """
+    if sort_by is None or sort_by not in results_df.columns:
+        return results_df
+    if sort_by in PATH_COLUMNS:
+        raise ValueError(f"Cannot sort by {sort_by}")
+
+    column = results_df[sort_by].reset_index(drop=True)
+    if column.dtype == 'category':
+        # Categories are not guaranteed to be in lexical order
+        column = column.astype(object)
+    # Positions rather than labels - result row labels are not unique
+    positions = column.sort_values(ascending=not descending, kind='stable', na_position='last').index
+    return results_df.iloc[positions]
+
+
+def query_results(results_df, offset=0, limit=50, sort_by=None, descending=False, **filters):
+    """
+    One page of filtered and sorted results.
+
+    Args:
+        results_df (pd.DataFrame): Full analysis result (not modified)
+        offset (int): Rows to skip after filtering and sorting
+        limit (int): Maximum rows in the page
+        sort_by (str): Column to sort by, None keeps analysis order
+        descending (bool): Sort direction
+        **filters: Filters of filter_results
+
+    Returns:
+        tuple: (number of matching rows, page DataFrame)
+    """
+    matching = sort_results(filter_results(results_df, **filters), sort_by, descending)
+    page = matching.iloc[offset:offset + limit].copy()
+
+    # Path errors are exception objects or messages - send them as text
+    for column in PATH_COLUMNS:
+        if column in page.columns:
+            page[column] = page[column].map(_path_value)
+
+    return len(matching), page
+
+
+def _path_value(value):
+    if isinstance(value, (tuple, list, str)) or value is None:
+        return value
+    if isinstance(value, float):  # NaN
+        return value
+    return str(value)
+
+
+def column_values(results_df, column):
+    """Sorted distinct values of a column (empty when the results do not have it)"""
+    if column not in results_df.columns or column in PATH_COLUMNS:
+        return []
+    values = results_df[column].dropna().astype(object).unique().tolist()
+    return sorted(values, key=str)
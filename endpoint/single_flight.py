@@ -0,0 +1,45 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation (asyncio).
+
+    The first caller for a key starts the computation on an executor; callers
+    arriving while it is still running await the same future and get the same
+    result (or exception). The key is released as soon as the computation ends.
+    """
+
+    def __init__(self, executor=None):
+        """Initialize with the executor computations run on (None: the loop default)"""
+        self.executor = executor
+        self._in_flight = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key, func, *args):
+        """Result of func(*args), shared with every concurrent caller using the same key"""
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, func, *args)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done, key=key: self._release(key, done))
+            self.started += 1
+
+        # Shield: a cancelled caller must not cancel the computation the others wait on
+        return await asyncio.shield(future)
+
+    def _release(self, key, future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+    def stats(self):
+        """Computations started, calls coalesced onto them and computations running now"""
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
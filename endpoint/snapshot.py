@@ -0,0 +1,176 @@
+"""
+Binary dataset snapshot for fast API startup.
+
+A snapshot is one pickle (protocol 5) of the WE and Others analyzers with
+their prepared networks: the input frames with their exact dtypes, the
+preprocessed frames, the graph, path index, block-cut tree and base results.
+Loading it replaces five CSV parses, preprocessing and the base result
+computation. The NetworkTopology shared by both analyzers is stored once and
+is shared again after loading.
+
+A snapshot is only used when it was written by the same code: its format key
+hashes the source of the pickled classes' modules, and a snapshot that fails
+to unpickle or does not hold prepared analyzers is ignored.
+
+Only load snapshots you built yourself - unpickling runs arbitrary code.
+
+Usage:
+    python snapshot.py --data-dir data --output data/snapshot.pkl
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import os
+import pickle
+import time
+from sweep import DATA_FILES, load_analyzers
+from unified_network_analyzer import NetworkTopology, PreparedNetwork, UnifiedNetworkImpactAnalyzer
+
+# Bumped whenever the snapshot bundle itself changes
+SNAPSHOT_FORMAT = 3
+
+# Modules whose classes are pickled in a snapshot
+SNAPSHOT_MODULES = ['unified_network_analyzer', 'network_graph', 'path_engine', 'path_index', 'path_store']
+
+
+def snapshot_format():
+    """Format key of snapshots written by this code: SNAPSHOT_FORMAT and a hash of the pickled modules' source"""
+    digest = hashlib.sha1()
+    for name in SNAPSHOT_MODULES:
+        with open(importlib.import_module(name).__file__, 'rb') as f:
+            digest.update(f.read())
+    return f"{SNAPSHOT_FORMAT}-{digest.hexdigest()[:16]}"
+
+
+def source_fingerprint(data_path):
+    """Size and modification time of each input CSV present in data_path"""
+    fingerprint = {}
+    for name in DATA_FILES:
+        path = os.path.join(data_path, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            fingerprint[name] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+
+def build_snapshot(data_path, snapshot_path):
+    """
+    Load the CSVs, prepare both analyzers and write the snapshot.
+
+    Returns:
+        tuple: The prepared (we_analyzer, others_analyzer)
+    """
+    sources = source_fingerprint(data_path)
+    we_analyzer, others_analyzer = load_analyzers(data_path)
+    we_analyzer.precompute_base_results()
+    others_analyzer.precompute_base_results()
+
+    write_snapshot(we_analyzer, others_analyzer, sources, snapshot_path)
+    return we_analyzer, others_analyzer
+
+
+def write_snapshot(we_analyzer, others_analyzer, sources, snapshot_path):
+    """
+    Write prepared analyzers as a snapshot.
+
+    The file is written next to its destination and renamed into place, so a
+    running API never reads a partial snapshot.
+
+    Args:
+        sources (dict): source_fingerprint of the CSVs, taken before they were read
+    """
+    bundle = {
+        "format": snapshot_format(),
+        "created_at": time.time(),
+        "sources": sources,
+        "we": we_analyzer,
+        "others": others_analyzer
+    }
+
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(bundle, f, protocol=5)
+    os.replace(tmp_path, snapshot_path)
+
+
+def load_snapshot(snapshot_path, data_path=None):
+    """
+    Load the prepared analyzers from a snapshot.
+
+    Args:
+        snapshot_path (str): Snapshot file written by build_snapshot
+        data_path (str): Data directory the snapshot was built from; when its
+            CSVs are present and differ from the snapshot's, it is stale
+
+    Returns:
+        tuple: (we_analyzer, others_analyzer), or None if there is no usable
+        snapshot (missing, unreadable, other format, not prepared analyzers or stale)
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+
+    expected_format = snapshot_format()
+    try:
+        with open(snapshot_path, 'rb') as f:
+            bundle = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError,
+            IndexError, TypeError, ValueError) as e:
+        print(f"Snapshot {snapshot_path} could not be read: {type(e).__name__}: {e}")
+        return None
+
+    if not isinstance(bundle, dict) or bundle.get("format") != expected_format:
+        found = bundle.get("format") if isinstance(bundle, dict) else type(bundle).__name__
+        print(f"Snapshot {snapshot_path} has format {found}, expected {expected_format}")
+        return None
+
+    analyzers = (bundle.get("we"), bundle.get("others"))
+    if not all(_is_prepared(analyzer) for analyzer in analyzers):
+        print(f"Snapshot {snapshot_path} does not hold prepared analyzers")
+        return None
+
+    if data_path is not None:
+        current = source_fingerprint(data_path)
+        if current and current != bundle.get("sources"):
+            print(f"Snapshot {snapshot_path} is stale: the CSV files in {data_path} changed")
+            return None
+
+    return analyzers
+
+
+def _is_prepared(analyzer):
+    """True for an analyzer with a topology and a network prepared for its data version"""
+    if not isinstance(analyzer, UnifiedNetworkImpactAnalyzer):
+        return False
+    if not isinstance(getattr(analyzer, 'topology', None), NetworkTopology):
+        return False
+
+    network = getattr(analyzer, 'network', None)
+    if not isinstance(network, PreparedNetwork):
+        return False
+    # Every component PreparedNetwork is built from must be present
+    components = [name for name in inspect.signature(PreparedNetwork.__init__).parameters if name != 'self']
+    if any(not hasattr(network, name) for name in components):
+        return False
+    return network.data_version == getattr(analyzer, 'data_version', None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the binary dataset snapshot loaded by the API at startup")
+    parser.add_argument('--data-dir', default='data', help="Directory with the report, WAN, OSPF and AGG CSV files")
+    parser.add_argument('--output', default=None, help="Snapshot file (default: <data-dir>/snapshot.pkl)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.data_dir, 'snapshot.pkl')
+    start_time = time.time()
+    we_analyzer, others_analyzer = build_snapshot(args.data_dir, output)
+
+    size_mb = os.path.getsize(output) / (1024 * 1024)
+    print(f"Snapshot saved to {output} ({size_mb:.1f} MB) in {time.time() - start_time:.1f} seconds")
+    print(f"Data versions: WE {we_analyzer.data_version}, Others {others_analyzer.data_version}")
+
+
+if __name__ == "__main__":
+    main()
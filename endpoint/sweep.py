@@ -0,0 +1,94 @@
+"""
+Full-network criticality sweep.
+
+Runs the impact analysis of every node and/or exchange failing, one at a time,
+on both the WE and Others data and ranks the identifiers by customers affected.
+
+Usage:
+    python sweep.py --data-dir data --type all --workers 8 --output sweep.csv
+"""
+import argparse
+import os
+import pandas as pd
+from unified_network_analyzer import NetworkTopology, UnifiedNetworkImpactAnalyzer
+
+
+# Input CSV files of the data directory
+DATA_FILES = ['Report(11).csv', 'Report(12).csv', 'res_ospf.csv', 'wan.csv', 'agg.csv']
+
+
+def load_analyzers(data_path):
+    """Load the CSV files and create the WE and Others analyzers over one shared topology"""
+    df_report_we = pd.read_csv(os.path.join(data_path, 'Report(11).csv'))  # WE data
+    df_report_others = pd.read_csv(os.path.join(data_path, 'Report(12).csv'))  # Others data
+    df_res_ospf = pd.read_csv(os.path.join(data_path, 'res_ospf.csv'))
+    df_wan = pd.read_csv(os.path.join(data_path, 'wan.csv'))
+    df_agg = pd.read_csv(os.path.join(data_path, 'agg.csv'))
+
+    topology = NetworkTopology(df_res_ospf, df_wan, df_agg)
+    we_analyzer = UnifiedNetworkImpactAnalyzer(df_report_we, topology=topology)
+    others_analyzer = UnifiedNetworkImpactAnalyzer(df_report_others, topology=topology)
+    return we_analyzer, others_analyzer
+
+
+def run_network_sweep(analyzers, identifier_type='all', max_workers=None):
+    """
+    Sweep the same identifiers over every analyzer and combine the tables.
+
+    Args:
+        analyzers (list): UnifiedNetworkImpactAnalyzer instances (e.g. WE and Others)
+        identifier_type (str): 'node', 'exchange' or 'all'
+        max_workers (int): Worker processes per sweep, defaults to the number of cores
+
+    Returns:
+        pd.DataFrame: Ranked table with MSANs, records and customers summed over the analyzers
+    """
+    identifiers = set()
+    for analyzer in analyzers:
+        identifiers.update(analyzer.sweep_identifiers(identifier_type))
+    identifiers = sorted(identifiers)
+
+    tables = [
+        analyzer.run_sweep(identifiers=identifiers, max_workers=max_workers)
+        for analyzer in analyzers
+    ]
+    return combine_sweeps(tables)
+
+
+def combine_sweeps(tables):
+    """Sum sweep tables of several data types per identifier and rank the result"""
+    combined = pd.concat(tables, ignore_index=True)
+    errors = {
+        (identifier, identifier_type): error
+        for identifier, identifier_type, error in combined[['identifier', 'identifier_type', 'error']].itertuples(index=False)
+        if error is not None
+    }
+
+    combined = combined.groupby(['identifier', 'identifier_type'], as_index=False)[
+        ['affected_msans', 'records', 'customers']
+    ].sum()
+    combined['error'] = [
+        errors.get(key) for key in zip(combined['identifier'], combined['identifier_type'])
+    ]
+    return UnifiedNetworkImpactAnalyzer.rank_sweep(combined)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank every node/exchange by the impact of its failure")
+    parser.add_argument('--data-dir', default='data', help="Directory with the report, WAN, OSPF and AGG CSV files")
+    parser.add_argument('--type', dest='identifier_type', choices=['node', 'exchange', 'all'], default='all')
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--output', default='criticality_sweep.csv', help="CSV file for the ranked table")
+    parser.add_argument('--top', type=int, default=20, help="Rows of the ranking to print")
+    args = parser.parse_args()
+
+    analyzers = load_analyzers(args.data_dir)
+    table = run_network_sweep(analyzers, args.identifier_type, args.workers)
+
+    table.to_csv(args.output, index=False)
+    print(table.head(args.top).to_string(index=False))
+    print(f"Ranked {len(table)} identifiers, saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
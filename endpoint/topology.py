@@ -0,0 +1,118 @@
+"""
+Topology payload of an analysis for the D3 visualizations.
+
+Builds the deduplicated subgraph traversed by the impacted MSANs' paths:
+unique nodes and links with the number of distinct MSANs on each, and the
+failed nodes. Large impacts are bounded by keeping only the busiest links
+and/or collapsing hostnames into their exchanges.
+"""
+from path_store import PATH_COLUMNS
+
+# Result columns naming a node's role, in priority order
+NODE_ROLES = [
+    ('EDGE', 'edge'),
+    ('distribution_hostname', 'distribution'),
+    ('BNG_HOSTNAME', 'bng'),
+    ('BITSTREAM_HOSTNAME', 'bitstream')
+]
+
+# Path column -> kind of the links it contributes
+PATH_KINDS = dict(zip(PATH_COLUMNS, ('primary', 'alternative')))
+
+
+def exchange_of(hostname):
+    """Exchange code of a hostname (third '-' separated part, e.g. EDGE-R209-NSR-EG -> NSR)"""
+    parts = hostname.split('-')
+    return parts[2] if len(parts) > 2 else hostname
+
+
+def build_topology(datasets, failed_nodes, msancode=None, collapse=None, max_links=None):
+    """
+    Deduplicated subgraph of the analysis results.
+
+    Args:
+        datasets (list): Result DataFrames (e.g. WE and Others)
+        failed_nodes (list): Hostnames taken down by the failure
+        msancode (str): Only the paths of this MSAN
+        collapse (str): 'exchange' to merge hostnames into one node per exchange
+        max_links (int): Keep only the links carrying the most MSANs
+
+    Returns:
+        dict: nodes, links, failed_nodes and totals before the cap. A link's
+        type is 'alternative' when it is on an alternative path (Path2),
+        otherwise 'affected' (primary path only).
+    """
+    group = exchange_of if collapse == 'exchange' else (lambda node: node)
+
+    link_msans = {}
+    node_msans = {}
+    roles = {}
+
+    for results_df in datasets:
+        if results_df.empty or 'MSANCODE' not in results_df.columns:
+            continue
+        if msancode is not None:
+            results_df = results_df[results_df['MSANCODE'].astype(object) == msancode]
+
+        for column, kind in PATH_KINDS.items():
+            if column not in results_df.columns:
+                continue
+            # Each MSAN/path combination once - most rows share their paths
+            for msan, path in set(zip(results_df['MSANCODE'], results_df[column])):
+                if not isinstance(path, (tuple, list)):
+                    continue
+                nodes = [group(node) for node in path]
+                for node in nodes:
+                    node_msans.setdefault(node, set()).add(msan)
+                for source, target in zip(nodes, nodes[1:]):
+                    if source == target:
+                        continue
+                    key = (source, target) if source < target else (target, source)
+                    link_msans.setdefault(key, {'primary': set(), 'alternative': set()})[kind].add(msan)
+
+        if collapse != 'exchange':
+            for column, role in NODE_ROLES:
+                if column in results_df.columns:
+                    for node in results_df[column].dropna().unique():
+                        roles.setdefault(node, role)
+
+    failed = sorted({group(node) for node in failed_nodes})
+
+    links = [
+        {
+            "source": source,
+            "target": target,
+            "type": "alternative" if msans['alternative'] else "affected",
+            "primary_msans": len(msans['primary']),
+            "alternative_msans": len(msans['alternative']),
+            "msans": len(msans['primary'] | msans['alternative'])
+        }
+        for (source, target), msans in link_msans.items()
+    ]
+    total_links = len(links)
+    links.sort(key=lambda link: (-link["msans"], link["source"], link["target"]))
+    if max_links is not None:
+        links = links[:max_links]
+
+    # Nodes of the kept links (failed nodes off every path are only listed in failed_nodes)
+    kept_nodes = {link["source"] for link in links} | {link["target"] for link in links}
+    failed_set = set(failed)
+    nodes = [
+        {
+            "id": node,
+            "type": "exchange" if collapse == 'exchange' else roles.get(node, "other"),
+            "failed": node in failed_set,
+            "msans": len(node_msans.get(node, ()))
+        }
+        for node in sorted(kept_nodes)
+    ]
+
+    return {
+        "nodes": nodes,
+        "links": links,
+        "failed_nodes": failed,
+        "collapse": collapse,
+        "total_nodes": len(node_msans),
+        "total_links": total_links,
+        "truncated": len(links) < total_links
+    }
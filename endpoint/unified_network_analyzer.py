@@ -1,28 +1,105 @@
 import pandas as pd
 import numpy as np
-import networkx as nx
+import os
 import time
-import json
+import hashlib
+import threading
+import multiprocessing
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from network_graph import NetworkGraph, BlockCutTree
+from path_engine import PathEngine
+from path_index import PathIndex
+from path_store import PATH_COLUMNS, PathStore
 warnings.filterwarnings("ignore")
 
 class UnifiedNetworkImpactAnalyzer:
     """
     Unified module for analyzing network impact from node or exchange failures.
     Handles both WE (network topology) and Others (bitstream topology) scenarios.
+    
+    The analyzer owns the raw report and the current PreparedNetwork; every
+    query runs in its own ImpactQuery against that shared, read-only network, so
+    concurrent requests on one analyzer never touch each other's state. The
+    OSPF/WAN/AGG data lives in a NetworkTopology that analyzers of several data
+    types can share.
     """
     
-    def __init__(self, df_report, df_res_ospf, df_wan, df_agg):
-        """Initialize with network data"""
+    # Columns of the criticality sweep table (see run_sweep)
+    SWEEP_COLUMNS = ['identifier', 'identifier_type', 'affected_msans', 'records', 'customers', 'error']
+    
+    def __init__(self, df_report, df_res_ospf=None, df_wan=None, df_agg=None, topology=None):
+        """
+        Initialize with network data.
+        
+        Pass either the OSPF, WAN and AGG frames or a NetworkTopology built from
+        them; a topology is referenced, not copied (see load_analyzers).
+        """
         self.df_report = df_report.copy()
-        self.df_res_ospf = df_res_ospf.copy()
-        self.df_wan = df_wan.copy()
-        self.df_agg = df_agg.copy()
-        self.model = None
-        self.final_df = None
+        if topology is None:
+            topology = NetworkTopology(df_res_ospf, df_wan, df_agg)
+        self.topology = topology
+        self.network = None
         self.data_type = self._detect_data_type()
+        self.data_version = self._compute_data_version()
+        
+        # Serializes data updates and network builds; queries never take it
+        self._build_lock = threading.Lock()
         
         print(f"Detected data type: {self.data_type}")
+    
+    def __getstate__(self):
+        """Pickle everything but the lock (used by dataset snapshots)"""
+        state = self.__dict__.copy()
+        del state['_build_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._build_lock = threading.Lock()
+    
+    @property
+    def df_res_ospf(self):
+        return self.topology.df_res_ospf
+    
+    @property
+    def df_wan(self):
+        return self.topology.df_wan
+    
+    @property
+    def df_agg(self):
+        return self.topology.df_agg
+    
+    def _compute_data_version(self):
+        """Fingerprint the input data so cached base results can be tied to it"""
+        digest = hashlib.sha1()
+        _hash_frame(digest, self.df_report)
+        digest.update(self.topology.data_version.encode())
+        return digest.hexdigest()[:16]
+    
+    def update_data(self, df_report=None, df_res_ospf=None, df_wan=None, df_agg=None):
+        """
+        Replace some or all of the input data.
+        
+        Queries already running keep the network they started with; the next
+        prepare() builds a new network for the new data version. New OSPF, WAN
+        or AGG data gives this analyzer its own new topology; other analyzers
+        keep the one they share.
+        """
+        with self._build_lock:
+            if df_report is not None:
+                self.df_report = df_report.copy()
+            if df_res_ospf is not None or df_wan is not None or df_agg is not None:
+                self.topology = NetworkTopology(
+                    self.df_res_ospf if df_res_ospf is None else df_res_ospf,
+                    self.df_wan if df_wan is None else df_wan,
+                    self.df_agg if df_agg is None else df_agg
+                )
+            
+            self.data_type = self._detect_data_type()
+            self.data_version = self._compute_data_version()
+        
+        return self.data_version
         
     def _detect_data_type(self):
         """Auto-detect data type based on available columns"""
@@ -35,7 +112,320 @@ class UnifiedNetworkImpactAnalyzer:
     
     def _get_column_mappings(self):
         """Get column mappings based on data type"""
-        if self.data_type == 'network':
+        return PreparedNetwork.column_mappings(self.data_type)
+    
+    def prepare(self):
+        """
+        The PreparedNetwork of the current data version, built on first use.
+        
+        Returns:
+            PreparedNetwork: Shared, read-only network (base results and indexes)
+        """
+        network = self.network
+        if network is not None and network.data_version == self.data_version:
+            return network
+        
+        with self._build_lock:
+            if self.network is None or self.network.data_version != self.data_version:
+                self.network = PreparedNetwork.build(
+                    self.df_report, self.topology,
+                    self.data_type, self.data_version
+                )
+            return self.network
+    
+    def generate_base_results(self, dwn_identifier=None):
+        """Generate base results with path calculations (always rebuilds the network)"""
+        with self._build_lock:
+            self.network = PreparedNetwork.build(
+                self.df_report, self.topology,
+                self.data_type, self.data_version, dwn_identifier
+            )
+        return self.network.final_df
+    
+    def precompute_base_results(self):
+        """
+        Preprocess the data and generate the base results once per data version.
+        
+        Base results do not depend on the failed identifier, so they are computed
+        at startup (or after update_data) and reused by every impact query.
+        
+        Returns:
+            pd.DataFrame: Cached base results
+        """
+        return self.prepare().final_df
+    
+    @property
+    def final_df(self):
+        """Base results of the current network (None until prepared)"""
+        return self.network.final_df if self.network is not None else None
+    
+    @property
+    def model(self):
+        """CIR model of the current network (None until prepared)"""
+        return self.network.model if self.network is not None else None
+    
+    def _current_network(self):
+        """Current network, without building it"""
+        network = self.network
+        if network is None:
+            raise ValueError("Must call generate_base_results() first")
+        return network
+    
+    def analyze_exchange_impact(self, dwn_exchange):
+        """Analyze impact when an exchange fails"""
+        return ImpactQuery(self._current_network(), dwn_exchange, 'exchange').analyze()
+    
+    def analyze_node_impact(self, dwn_node):
+        """Analyze impact when a node fails"""
+        return ImpactQuery(self._current_network(), dwn_node, 'node').analyze()
+    
+    def run_complete_analysis(self, identifier, identifier_type='auto'):
+        """
+        Run complete analysis for a given identifier
+        
+        Args:
+            identifier (str): Node or exchange identifier
+            identifier_type (str): 'node', 'exchange', or 'auto' to detect
+        
+        Returns:
+            pd.DataFrame: Analysis results
+        """
+        # Reuse base results for the current data version (computed once)
+        return ImpactQuery(self.prepare(), identifier, identifier_type).run()
+    
+    def sweep_identifiers(self, identifier_type='all'):
+        """Every node and/or exchange that can fail, as (identifier, identifier_type) pairs"""
+        return self.prepare().sweep_identifiers(identifier_type)
+    
+    def summarize_impact(self, identifier, identifier_type):
+        """Affected MSANs, records and customers when a single identifier fails"""
+        return ImpactQuery(self.prepare(), identifier, identifier_type).summarize()
+    
+    def run_sweep(self, identifier_type='all', identifiers=None, max_workers=None):
+        """
+        Criticality sweep: the impact of every identifier failing, one at a time.
+        
+        Base results are computed once and shipped to a pool of worker processes
+        (one per core by default), which analyze the identifiers in parallel.
+        Workers are spawned rather than forked: the API runs sweeps from a thread
+        of a multi-threaded server, and a forked child could inherit locks held
+        by other threads.
+        
+        Args:
+            identifier_type (str): 'node', 'exchange' or 'all'
+            identifiers (list): Optional (identifier, identifier_type) pairs to sweep instead
+            max_workers (int): Worker processes, defaults to the number of cores
+        
+        Returns:
+            pd.DataFrame: One row per identifier, ranked by customers affected
+        """
+        network = self.prepare()
+        if identifiers is None:
+            identifiers = network.sweep_identifiers(identifier_type)
+        
+        start_time = time.time()
+        max_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(identifiers) // (max_workers * 4))
+        
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_sweep_worker, initargs=(network,)) as executor:
+            rows = list(executor.map(_sweep_identifier, identifiers, chunksize=chunksize))
+        
+        table = self.rank_sweep(pd.DataFrame(rows, columns=self.SWEEP_COLUMNS))
+        
+        elapsed_time = time.time() - start_time
+        print(f"Sweep of {len(identifiers)} identifiers completed in {elapsed_time:.3f} seconds using {max_workers} workers")
+        
+        return table
+    
+    @staticmethod
+    def rank_sweep(table):
+        """Sort a sweep table by customers, MSANs and records affected and number the ranks"""
+        table = table.sort_values(
+            ['customers', 'affected_msans', 'records', 'identifier'],
+            ascending=[False, False, False, True]
+        ).reset_index(drop=True)
+        table.insert(0, 'rank', np.arange(1, len(table) + 1))
+        return table
+    
+    def _detect_identifier_type(self, identifier):
+        """Auto-detect if identifier is a node or exchange"""
+        return ImpactQuery.detect_identifier_type(identifier)
+    
+    def export_results(self, results, filename):
+        """Export results to CSV"""
+        results.to_csv(filename, index=False)
+        print(f"Results exported to {filename}")
+
+
+def _hash_frame(digest, df):
+    """Feed the columns and values of a DataFrame into a hashlib digest"""
+    digest.update(','.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+
+
+class NetworkTopology:
+    """
+    Read-only WAN topology shared by the analyzers of every data type: the
+    OSPF, WAN and AGG tables, the WAN graph (with its hostname -> node ID
+    index) and its block-cut tree.
+    
+    The WE and Others reports run over the same topology, so it is built once
+    and referenced by both analyzers and all of their prepared networks instead
+    of being copied into each. Never modified after construction.
+    """
+    
+    def __init__(self, df_res_ospf, df_wan, df_agg):
+        """Copy the input tables once and build the graph and indexes"""
+        self.df_res_ospf = df_res_ospf.copy()
+        self.df_wan = df_wan.copy()
+        self.df_agg = df_agg.copy()
+        self.data_version = self._compute_data_version()
+        
+        self.df_res_ospf_clean = PreparedNetwork.preprocess_ospf(self.df_res_ospf)
+        self.graph = UnifiedCIRModel._draw_graph(self.df_wan)
+        
+        # Block-cut tree of the WAN (excluded nodes removed) for single-failure reachability
+        self.block_cut_tree = BlockCutTree.build(self.graph.without(UnifiedCIRModel.EXCLUDED_NODES))
+    
+    def _compute_data_version(self):
+        """Fingerprint of the OSPF, WAN and AGG tables"""
+        digest = hashlib.sha1()
+        for df in (self.df_res_ospf, self.df_wan, self.df_agg):
+            _hash_frame(digest, df)
+        return digest.hexdigest()[:16]
+
+
+class PreparedNetwork:
+    """
+    Immutable snapshot of one dataset ready for impact queries: the clean
+    report frame, the shared NetworkTopology, the CIR model, the base results
+    with their integer-encoded path columns and the indexes built over them.
+    
+    Built once per data version and never modified afterwards, so a single
+    instance can be shared by any number of concurrent queries (and shipped
+    to worker processes) without locks or copies.
+    """
+    
+    # Hostname, exchange and status columns stored as categoricals after preprocessing
+    CATEGORICAL_COLUMNS = [
+        'EDGE', 'distribution_hostname', 'BNG_HOSTNAME', 'BITSTREAM_HOSTNAME',
+        'NODENAME', 'NEIGHBOR_HOSTNAME',
+        'edge_exchange', 'distribution_Exchange', 'EDGE_exchange', 'Bitstream_exchange',
+        'STATUS'
+    ]
+    
+    def __init__(self, data_type, data_version, df_report_clean, topology,
+                 model, final_df, path_stores, path_index, path_unique):
+        """Initialize from fully built components (see build)"""
+        self.data_type = data_type
+        self.data_version = data_version
+        self.df_report_clean = df_report_clean
+        self.topology = topology
+        self.df_res_ospf_clean = topology.df_res_ospf_clean
+        self.model = model
+        self.final_df = final_df
+        self.path_stores = path_stores
+        self.path_index = path_index
+        self.path_unique = path_unique
+        self.block_cut_tree = topology.block_cut_tree
+    
+    @classmethod
+    def build(cls, df_report, topology, data_type, data_version, dwn_identifier=None):
+        """Preprocess the raw report and generate the base results and indexes"""
+        df_report_clean = cls.preprocess_data(df_report, data_type)
+        
+        start_time = time.time()
+        
+        # Create the unified CIR model
+        model = UnifiedCIRModel(df_report_clean, topology, dwn_identifier, data_type)
+        # Row labels double as row positions (results keep them, see ImpactStore)
+        final_df = model.generate_results().reset_index(drop=True)
+        
+        # Path/Path2 as node IDs; final_df keeps one list per distinct path
+        path_stores = {}
+        for column in PATH_COLUMNS:
+            if column in final_df.columns:
+                store = PathStore.from_values(final_df[column], model.g.node_names, model.g.node_ids)
+                final_df[column] = store.to_series(final_df.index)
+                path_stores[column] = store
+        
+        # Node -> row index over Path/Path2 for transit lookups
+        path_index = PathIndex.build(list(path_stores.values()), model.g)
+        
+        # Rows whose Path is the only shortest path (reusable when rerouting)
+        path_unique = PathEngine(model.g).unique_paths(
+            final_df['EDGE'], final_df[cls.column_mappings(data_type)['target_hostname']]
+        )
+        
+        elapsed_time = time.time() - start_time
+        print(f"Base results generated in {elapsed_time:.3f} seconds ({elapsed_time/60:.2f} minutes)")
+        print(f"Final DataFrame shape: {final_df.shape}")
+        print(f"Path store size: {sum(store.nbytes for store in path_stores.values()) / (1024 * 1024):.2f} MB")
+        
+        return cls(data_type, data_version, df_report_clean, topology,
+                   model, final_df, path_stores, path_index, path_unique)
+    
+    @classmethod
+    def preprocess_data(cls, df_report, data_type):
+        """
+        Clean and preprocess the report data based on data type.
+        
+        Returns a clean copy; the raw input is never modified in place.
+        """
+        # Remove ID and ROWVERSION columns if they exist
+        df_report = df_report.drop(columns=['ID', 'ROWVERSION'], errors='ignore')
+        
+        if data_type == 'network':
+            # Filter out records with null BNG_HOSTNAME and non-ST status (WE specific)
+            filtered_mask = (df_report.BNG_HOSTNAME.isnull()) & (df_report.STATUS != 'ST')
+            
+            # Remove MSANCODEs from filtered records
+            df_report = df_report[
+                ~df_report.MSANCODE.isin(df_report.loc[filtered_mask, 'MSANCODE'].unique())
+            ].copy()
+            port_col = 'edge_port'
+        else:
+            port_col = 'EDGE_PORT'
+        
+        # Strip the sub-interface from the edge port (edge_port / EDGE_PORT)
+        if port_col in df_report.columns:
+            df_report[port_col] = cls._strip_suffix(df_report[port_col], '.')
+        
+        df_report_clean = cls._to_categorical(df_report)
+        
+        print(f"Data preprocessed. Final shape: {df_report_clean.shape}")
+        return df_report_clean
+    
+    @classmethod
+    def preprocess_ospf(cls, df_res_ospf):
+        """Clean copy of the OSPF data (common for both types, see NetworkTopology)"""
+        df_res_ospf = df_res_ospf.copy()
+        for col in ['LOCAL_INTERFACE', 'NEIGHBOR_INTERFACE']:
+            if col in df_res_ospf.columns:
+                df_res_ospf[col] = cls._strip_suffix(df_res_ospf[col], ':')
+        
+        return cls._to_categorical(df_res_ospf)
+    
+    @staticmethod
+    def _strip_suffix(series, separator):
+        """Vectorized x.split(separator)[0] that leaves non-string values untouched"""
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            return series
+        
+        stripped = series.str.split(separator, n=1).str[0]
+        return stripped.where(stripped.notna(), series)
+    
+    @classmethod
+    def _to_categorical(cls, df):
+        """Convert low-cardinality hostname, exchange and status columns to categoricals"""
+        columns = [col for col in cls.CATEGORICAL_COLUMNS if col in df.columns]
+        return df.astype({col: 'category' for col in columns})
+    
+    @staticmethod
+    def column_mappings(data_type):
+        """Get column mappings based on data type"""
+        if data_type == 'network':
             return {
                 'target_hostname': 'distribution_hostname',
                 'target_exchange': 'distribution_Exchange',
@@ -54,62 +444,131 @@ class UnifiedNetworkImpactAnalyzer:
                 'bng_hostname': None  # Not applicable for bitstream
             }
     
-    def preprocess_data(self):
-        """Clean and preprocess the report data based on data type"""
-        # Remove ID and ROWVERSION columns if they exist
-        self.df_report.drop(columns=['ID', 'ROWVERSION'], inplace=True, errors='ignore')
+    def _get_column_mappings(self):
+        """Get column mappings of this network's data type"""
+        return self.column_mappings(self.data_type)
+    
+    def sweep_identifiers(self, identifier_type='all'):
+        """
+        Every node and/or exchange that can fail, as (identifier, identifier_type) pairs.
         
-        if self.data_type == 'network':
-            # Filter out records with null BNG_HOSTNAME and non-ST status (WE specific)
-            df_filtered = self.df_report[
-                (self.df_report.BNG_HOSTNAME.isnull()) & (self.df_report.STATUS != 'ST')
-            ]
-            
-            # Remove MSANCODEs from filtered records
-            self.df_report = self.df_report[
-                ~self.df_report.MSANCODE.isin(df_filtered.MSANCODE.unique())
-            ]
-            
-            # Process edge_port for network data
-            if 'edge_port' in self.df_report.columns:
-                self.df_report['edge_port'] = self.df_report['edge_port'].apply(lambda x: x.split('.')[0])
+        Nodes are the WAN hosts plus the EDGE/target/BNG hosts of the report;
+        exchanges are the edge and target exchanges of the report.
+        """
+        col_mappings = self._get_column_mappings()
+        identifiers = []
+        
+        if identifier_type in ('node', 'all'):
+            nodes = set(self.model.g.node_names.tolist()) - set(self.model.EXCLUDED_NODES)
+            for col in ['EDGE', col_mappings['target_hostname'], col_mappings['bng_hostname']]:
+                if col is not None and col in self.final_df.columns:
+                    nodes.update(self.final_df[col].dropna().unique().tolist())
+            identifiers += [(node, 'node') for node in sorted(nodes)]
+        
+        if identifier_type in ('exchange', 'all'):
+            exchanges = set()
+            for col in [col_mappings['edge_exchange'], col_mappings['target_exchange']]:
+                if col in self.final_df.columns:
+                    exchanges.update(self.final_df[col].dropna().unique().tolist())
+            identifiers += [(exchange, 'exchange') for exchange in sorted(exchanges)]
+        
+        return identifiers
+
+
+class ImpactQuery:
+    """
+    Per-query context: the impact analysis of one identifier against a PreparedNetwork.
+    
+    Only the query's own state lives here; the network is shared and read-only,
+    so queries can run in parallel threads against the same network.
+    """
+    
+    def __init__(self, network, identifier, identifier_type='auto'):
+        """Initialize with the network to query and the failed identifier"""
+        self.network = network
+        self.data_type = network.data_type
+        self.model = network.model
+        self.final_df = network.final_df
+        self.path_stores = network.path_stores
+        self.path_index = network.path_index
+        self.path_unique = network.path_unique
+        self.block_cut_tree = network.block_cut_tree
+        
+        # Auto-detect type if needed
+        if identifier_type == 'auto':
+            identifier_type = self.detect_identifier_type(identifier)
+        self.identifier = identifier
+        self.identifier_type = 'exchange' if identifier_type == 'exchange' else 'node'
+    
+    @staticmethod
+    def detect_identifier_type(identifier):
+        """Auto-detect if identifier is a node or exchange"""
+        # Simple heuristic: exchanges typically contain dots or are shorter
+        if '.' in identifier or len(identifier.split('-')) < 4:
+            return 'exchange'
         else:
-            # Process EDGE_PORT for bitstream data
-            if 'EDGE_PORT' in self.df_report.columns:
-                self.df_report['EDGE_PORT'] = self.df_report['EDGE_PORT'].apply(lambda x: x.split('.')[0])
+            return 'node'
+    
+    def _get_column_mappings(self):
+        """Get column mappings based on data type"""
+        return self.network._get_column_mappings()
+    
+    def analyze(self):
+        """Run the node or exchange analysis of this query"""
+        if self.identifier_type == 'exchange':
+            return self.analyze_exchange_impact(self.identifier)
+        return self.analyze_node_impact(self.identifier)
+    
+    def run(self):
+        """Run the analysis and log its outcome"""
+        results = self.analyze()
+        analysis_type = "Exchange" if self.identifier_type == 'exchange' else "Node"
         
-        # Process OSPF data (common for both types)
-        self.df_res_ospf['LOCAL_INTERFACE'] = self.df_res_ospf['LOCAL_INTERFACE'].apply(
-            lambda x: x.split(':')[0] if isinstance(x, str) and ':' in x else x
-        )
-        self.df_res_ospf['NEIGHBOR_INTERFACE'] = self.df_res_ospf['NEIGHBOR_INTERFACE'].apply(
-            lambda x: x.split(':')[0] if isinstance(x, str) and ':' in x else x
-        )
+        print(f"{analysis_type} impact analysis completed. Results shape: {results.shape}")
         
-        print(f"Data preprocessed. Final shape: {self.df_report.shape}")
+        return results
     
-    def generate_base_results(self, dwn_identifier):
-        """Generate base results with path calculations"""
-        start_time = time.time()
-        
-        # Create the unified CIR model
-        self.model = UnifiedCIRModel(
-            self.df_report, self.df_res_ospf, self.df_wan, self.df_agg, 
-            dwn_identifier, self.data_type
-        )
-        self.final_df = self.model.generate_results()
+    def failed_nodes(self):
+        """Nodes taken down by this query: the node itself, or every node of the exchange"""
+        if self.identifier_type == 'exchange':
+            return self._get_exchange_nodes(self.identifier, self._get_column_mappings())
+        return [self.identifier]
+    
+    def summarize(self):
+        """
+        Affected MSANs, records and customers of this query (errors are reported, not raised).
         
-        elapsed_time = time.time() - start_time
-        print(f"Base results generated in {elapsed_time:.3f} seconds ({elapsed_time/60:.2f} minutes)")
-        print(f"Final DataFrame shape: {self.final_df.shape}")
+        A dual-homed circuit has an UP and an ST row with the same customers, so
+        customers are counted once per circuit (MSAN, edge port and VLAN).
+        """
+        summary = {
+            'identifier': self.identifier,
+            'identifier_type': self.identifier_type,
+            'affected_msans': 0,
+            'records': 0,
+            'customers': 0,
+            'error': None
+        }
         
-        return self.final_df
+        try:
+            results = self.analyze()
+        except Exception as e:
+            summary['error'] = str(e)
+            return summary
+        
+        if not results.empty:
+            summary['affected_msans'] = int(results['MSANCODE'].nunique())
+            summary['records'] = len(results)
+            if 'CUST' in results.columns:
+                col_mappings = self._get_column_mappings()
+                circuit = [col for col in ('MSANCODE', col_mappings['port'], col_mappings['vlan']) if col in results.columns]
+                circuits = results.drop_duplicates(subset=circuit)
+                summary['customers'] = int(pd.to_numeric(circuits['CUST'], errors='coerce').fillna(0).sum())
+        
+        return summary
     
     def analyze_exchange_impact(self, dwn_exchange):
         """Analyze impact when an exchange fails"""
-        if self.final_df is None:
-            raise ValueError("Must call generate_base_results() first")
-        
         col_mappings = self._get_column_mappings()
         results = []
         
@@ -132,9 +591,6 @@ class UnifiedNetworkImpactAnalyzer:
     
     def analyze_node_impact(self, dwn_node):
         """Analyze impact when a node fails"""
-        if self.final_df is None:
-            raise ValueError("Must call generate_base_results() first")
-        
         col_mappings = self._get_column_mappings()
         results = []
         
@@ -185,13 +641,9 @@ class UnifiedNetworkImpactAnalyzer:
         
         # Calculate alternative paths only for network type (Others don't need this)
         if self.data_type == 'network':
-            # Create graph excluding affected nodes
-            graph = self.model._draw_graph2(self.df_wan, affected_nodes)
-            
-            # Calculate alternative paths
-            all_affected['Path2'] = all_affected.apply(
-                lambda row: self.model._calculate_path(graph, row['EDGE'], row[target_hostname_col]),
-                axis=1
+            # Calculate alternative paths avoiding the affected nodes
+            all_affected['Path2'] = self._calculate_alternative_paths(
+                all_affected, affected_nodes, target_hostname_col
             )
             
             all_affected['Impact'] = all_affected['Path2'].apply(
@@ -218,12 +670,9 @@ class UnifiedNetworkImpactAnalyzer:
             return pd.DataFrame()
         
         # Calculate alternative paths
-        graph = self.model._draw_graph2(self.df_wan, affected_nodes)
         target_hostname_col = col_mappings['target_hostname']
-        
-        affected_msans['Path2'] = affected_msans.apply(
-            lambda row: self.model._calculate_path(graph, row['EDGE'], row[target_hostname_col]),
-            axis=1
+        affected_msans['Path2'] = self._calculate_alternative_paths(
+            affected_msans, affected_nodes, target_hostname_col
         )
         
         affected_msans['Impact'] = affected_msans['Path2'].apply(
@@ -263,19 +712,24 @@ class UnifiedNetworkImpactAnalyzer:
         
         # Determine impact based on data type and circuit type
         if self.data_type == 'network':
-            # For network type, use circuit type information
-            msan_impacts = []
-            for msan in all_affected.MSANCODE.unique():
-                msan_df = all_affected[all_affected.MSANCODE == msan].copy()
-                
-                if 'cir_type' in msan_df.columns and 'Single' in msan_df['cir_type'].values:
-                    msan_df['Impact'] = 'Isolated'
-                else:
-                    msan_df['Impact'] = 'Partially Impacted'
-                    
-                msan_impacts.append(msan_df)
+            # For network type, use circuit type information: an MSAN with any
+            # 'Single' circuit is isolated. Rows are grouped per MSAN in order of
+            # first appearance (rows without an MSANCODE are dropped).
+            msan_codes = pd.factorize(all_affected['MSANCODE'])[0]
+            order = np.argsort(msan_codes, kind='stable')
+            order = order[msan_codes[order] >= 0]
+            all_affected = all_affected.iloc[order]
+            msan_codes = msan_codes[order]
+            
+            if 'cir_type' in all_affected.columns:
+                # Per-MSAN count of 'Single' rows, broadcast back to the rows
+                is_single = (all_affected['cir_type'] == 'Single').to_numpy(dtype=bool)
+                isolated = np.bincount(msan_codes, weights=is_single)[msan_codes] > 0
+            else:
+                isolated = np.zeros(len(all_affected), dtype=bool)
             
-            return pd.concat(msan_impacts, ignore_index=True)
+            all_affected['Impact'] = np.where(isolated, 'Isolated', 'Partially Impacted').astype(object)
+            return all_affected
         else:
             # For bitstream type, mark as isolated
             all_affected['Impact'] = 'Isolated'
@@ -292,12 +746,9 @@ class UnifiedNetworkImpactAnalyzer:
             return pd.DataFrame()
         
         # Calculate alternative paths
-        graph = self.model._draw_graph2(self.df_wan, [dwn_node])
         target_hostname_col = col_mappings['target_hostname']
-        
-        affected_msans['Path2'] = affected_msans.apply(
-            lambda row: self.model._calculate_path(graph, row['EDGE'], row[target_hostname_col]),
-            axis=1
+        affected_msans['Path2'] = self._calculate_alternative_paths(
+            affected_msans, [dwn_node], target_hostname_col
         )
         
         affected_msans['Impact'] = affected_msans['Path2'].apply(
@@ -306,6 +757,65 @@ class UnifiedNetworkImpactAnalyzer:
         
         return affected_msans
     
+    def _calculate_alternative_paths(self, df, failed_nodes, target_hostname_col):
+        """
+        Calculate Path2 (EDGE -> target avoiding the failed nodes) for each row.
+        
+        A row whose current Path does not touch the failed nodes and was the
+        only shortest path is still the only one once they are removed, so it
+        is kept as is. Only the other routes are searched again, grouped by
+        target: with equal-length alternatives, networkx may pick another path
+        on the smaller graph even when the current one survives.
+        
+        For a single failed node the block-cut tree tells which of those rows
+        can no longer reach their target at all; they get their error value
+        directly and are never searched.
+        
+        Rows of df are labelled with their position in the base results, which
+        is where their Path is read from the path store.
+        """
+        blocked_nodes = set(self.model.EXCLUDED_NODES) | set(failed_nodes)
+        rows = df.index.to_numpy()
+        keep_mask = pd.Series(
+            self.path_stores['Path'].avoids(rows, blocked_nodes) & self.path_unique[rows], index=df.index
+        )
+        
+        reroute = df[~keep_mask]
+        engine = PathEngine(self.model._draw_graph2(list(failed_nodes)))
+        
+        isolated_mask = self._isolated_by_single_failure(reroute, failed_nodes, target_hostname_col)
+        isolated = reroute[isolated_mask]
+        isolated_paths = pd.Series(
+            [engine.path_from_tree(None, source, target)
+             for source, target in zip(isolated['EDGE'], isolated[target_hostname_col])],
+            index=isolated.index, dtype=object
+        )
+        
+        reroute = reroute[~isolated_mask]
+        rerouted_paths = engine.calculate_paths(reroute['EDGE'], reroute[target_hostname_col])
+        
+        return pd.concat([df.loc[keep_mask, 'Path'], isolated_paths, rerouted_paths]).reindex(df.index)
+    
+    def _isolated_by_single_failure(self, df, failed_nodes, target_hostname_col):
+        """
+        Mask of rows whose EDGE is cut off from its target by the failure, read
+        from the block-cut tree. All False (search everything) for multi-node
+        failures or when the tree cannot answer for some row.
+        """
+        no_answer = np.zeros(len(df), dtype=bool)
+        if self.block_cut_tree is None or len(failed_nodes) != 1 or df.empty:
+            return no_answer
+        
+        failed_node = list(failed_nodes)[0]
+        connected = [
+            self.block_cut_tree.is_connected_without(source, target, failed_node)
+            for source, target in zip(df['EDGE'], df[target_hostname_col])
+        ]
+        if any(answer is None for answer in connected):
+            return no_answer
+        
+        return ~np.array(connected, dtype=bool)
+    
     def _get_exchange_nodes(self, dwn_exchange, col_mappings):
         """Get all nodes belonging to a specific exchange"""
         # Extract exchange code from exchange name
@@ -335,25 +845,14 @@ class UnifiedNetworkImpactAnalyzer:
     
     def _find_msans_with_nodes_in_path(self, affected_nodes, col_mappings):
         """Find MSANs that have any of the affected nodes in their paths"""
-        # Check Path column
-        path_mask = self.final_df['Path'].apply(
-            lambda path: (isinstance(path, list) and len(path) >= 3 and 
-                         any(node in path[1:-1] for node in affected_nodes))
-        )
-        
-        # Check Path2 column if it exists
-        path2_mask = pd.Series([False] * len(self.final_df))
-        if 'Path2' in self.final_df.columns:
-            path2_mask = self.final_df['Path2'].apply(
-                lambda path: (isinstance(path, list) and len(path) >= 3 and 
-                             any(node in path[1:-1] for node in affected_nodes))
-            )
+        # Rows whose Path or Path2 transit an affected node (inverted index lookup)
+        transit_mask = self.path_index.mask_for(affected_nodes)
         
         # Different logic based on data type
         if self.data_type == 'network':
             # For network type, get MSANs with UP status that have affected nodes in paths
             affected_up = self.final_df[
-                (path_mask | path2_mask) & (self.final_df['STATUS'] == 'UP')
+                transit_mask & (self.final_df['STATUS'] == 'UP').to_numpy()
             ]
             
             if affected_up.empty:
@@ -365,7 +864,7 @@ class UnifiedNetworkImpactAnalyzer:
             ].copy()
         else:
             # For bitstream type, just get records with affected nodes in paths
-            all_affected = self.final_df[path_mask | path2_mask].copy()
+            all_affected = self.final_df[transit_mask].copy()
         
         return all_affected
     
@@ -374,127 +873,103 @@ class UnifiedNetworkImpactAnalyzer:
         if not result_list:
             return pd.DataFrame()
         
-        # Remove duplicates between result sets
-        combined = result_list[0].copy()
-        
-        for result_df in result_list[1:]:
-            # Only add records not already in combined
-            new_records = result_df[
-                ~result_df.MSANCODE.isin(combined.MSANCODE.unique())
-            ]
-            if not new_records.empty:
-                combined = pd.concat([combined, new_records], ignore_index=True)
-        
-        # Final deduplication
-        combined_temp = combined.copy()
-        
-        # Convert lists to tuples for deduplication
-        for col in ['Path', 'Path2']:
+        # Remove duplicates between result sets: each MSAN's records come from
+        # the first result set that has it (one keyed anti-join over all sets)
+        sources = np.repeat(np.arange(len(result_list)), [len(result_df) for result_df in result_list])
+        msans = pd.concat([result_df['MSANCODE'].astype(object) for result_df in result_list], ignore_index=True)
+        msan_codes = pd.factorize(msans, use_na_sentinel=False)[0]
+        # Sources ascend, so an MSAN's first row is in its first result set
+        first_rows = np.unique(msan_codes, return_index=True)[1]
+        keep = sources == sources[first_rows][msan_codes]
+        
+        ends = np.cumsum([len(result_df) for result_df in result_list])
+        pieces = [
+            result_df[keep[end - len(result_df):end]]
+            for result_df, end in zip(result_list, ends)
+        ]
+        # The first set is kept whole; later sets only when they add records
+        combined = pd.concat([pieces[0]] + [piece for piece in pieces[1:] if not piece.empty])
+        
+        # Final deduplication, comparing paths by their codes in a path store
+        keys = combined.copy(deep=False)
+        graph = self.model.g
+        for col in PATH_COLUMNS:
+            if col in keys.columns:
+                store = PathStore.from_values(keys[col], graph.node_names, graph.node_ids)
+                # Non-paths keep their own value (errors compare as before)
+                is_path = store.status == PathStore.PATH
+                col_keys = keys[col].to_numpy(dtype=object, copy=True)
+                col_keys[is_path] = store.keys()[is_path]
+                keys[col] = col_keys
+        combined_temp = combined[~keys.duplicated().to_numpy()].copy()
+        
+        # Results carry paths as tuples
+        for col in PATH_COLUMNS:
             if col in combined_temp.columns:
                 combined_temp[col] = combined_temp[col].apply(
                     lambda x: tuple(x) if isinstance(x, list) else x
                 )
         
-        return combined_temp.drop_duplicates()
+        return combined_temp
     
-    def run_complete_analysis(self, identifier, identifier_type='auto'):
-        """
-        Run complete analysis for a given identifier
-        
-        Args:
-            identifier (str): Node or exchange identifier
-            identifier_type (str): 'node', 'exchange', or 'auto' to detect
-        
-        Returns:
-            pd.DataFrame: Analysis results
-        """
-        # Preprocess data
-        self.preprocess_data()
-        
-        # Generate base results
-        self.generate_base_results(identifier)
-        
-        # Auto-detect type if needed
-        if identifier_type == 'auto':
-            identifier_type = self._detect_identifier_type(identifier)
-        
-        # Run appropriate analysis
-        if identifier_type == 'exchange':
-            results = self.analyze_exchange_impact(identifier)
-            analysis_type = "Exchange"
-        else:
-            results = self.analyze_node_impact(identifier)
-            analysis_type = "Node"
-        
-        print(f"{analysis_type} impact analysis completed. Results shape: {results.shape}")
-        
-        return results
-    
-    def _detect_identifier_type(self, identifier):
-        """Auto-detect if identifier is a node or exchange"""
-        # Simple heuristic: exchanges typically contain dots or are shorter
-        if '.' in identifier or len(identifier.split('-')) < 4:
-            return 'exchange'
-        else:
-            return 'node'
-    
-    def export_results(self, results, filename):
-        """Export results to CSV"""
-        results.to_csv(filename, index=False)
-        print(f"Results exported to {filename}")
+
+
+# Network of the current sweep worker process (set by the pool initializer)
+_sweep_network = None
+
+def _init_sweep_worker(network):
+    """Process pool initializer: keep the prepared network for the worker's lifetime"""
+    global _sweep_network
+    _sweep_network = network
+
+def _sweep_identifier(item):
+    """Process pool task: impact summary for one (identifier, identifier_type) pair"""
+    identifier, identifier_type = item
+    return ImpactQuery(_sweep_network, identifier, identifier_type).summarize()
 
 
 class UnifiedCIRModel:
     """Unified CIR Model that handles both network and bitstream scenarios"""
     
-    def __init__(self, df_report, df_res_ospf, df_wan, df_agg, dwn_node, data_type):
+    # Nodes never used as transit in the WAN graph
+    EXCLUDED_NODES = ['INSOMNA-R02J-C-EG', 'INSOMNA-R01J-C-EG']
+    
+    def __init__(self, df_report, topology, dwn_node, data_type):
         self.df = df_report.copy()
-        self.resOspf = df_res_ospf.copy()
-        self.data = df_wan.copy()
-        self.agg = df_agg.copy()
+        # Shared with every other model on the topology - read only
+        self.resOspf = topology.df_res_ospf_clean
+        self.data = topology.df_wan
+        self.agg = topology.df_agg
         self.dwn_node = dwn_node
         self.data_type = data_type
         
-        self.g = self._draw_graph(self.data)
+        self.g = topology.graph
         
-    @staticmethod
-    def _draw_graph(df):
+    @classmethod
+    def _draw_graph(cls, df):
         """Create network graph from dataframe"""
-        lst = ['INSOMNA-R02J-C-EG', 'INSOMNA-R01J-C-EG']
-        df = df[~df['NODENAME'].isin(lst)]
-        df = df.drop_duplicates()
+        df = df[~df['NODENAME'].isin(cls.EXCLUDED_NODES)]
 
-        G = nx.Graph()
-        for idx, row in df.iterrows():
-            G.add_edge(row[0], row[1])
-        return G
+        return NetworkGraph.from_edges(df.iloc[:, 0], df.iloc[:, 1])
 
     def _calculate_path(self, graph, source, target):
         """Calculate path between two nodes"""
         try:
-            return nx.shortest_path(graph, source=source, target=target)
-        except nx.NetworkXNoPath:
-            return f"NetworkXNoPath: No path between {source} and {target}."
-        except nx.NodeNotFound as e:
-            return e
+            return PathEngine(graph).calculate_path(source, target)
         except Exception as f:
             return f"Error: {f}"
     
-    @staticmethod
-    def _draw_graph2(df, excluded_nodes):
-        """Create network graph excluding specific nodes"""
+    def _draw_graph2(self, excluded_nodes):
+        """
+        View of the base graph excluding specific nodes.
+        
+        Equivalent to rebuilding the graph from the WAN links that touch neither
+        EXCLUDED_NODES nor excluded_nodes, but shares the base graph's arrays.
+        """
         if not isinstance(excluded_nodes, list):
             excluded_nodes = [excluded_nodes]
             
-        lst = ['INSOMNA-R02J-C-EG', 'INSOMNA-R01J-C-EG'] + excluded_nodes
-        df = df[~df['NODENAME'].isin(lst)]
-        df = df[~df['NEIGHBOR_HOSTNAME'].isin(lst)]
-        df = df.drop_duplicates()
-
-        G = nx.Graph()
-        for idx, row in df.iterrows():
-            G.add_edge(row[0], row[1])
-        return G
+        return self.g.without(self.EXCLUDED_NODES + excluded_nodes)
     
     def generate_results(self):
         """Main method to generate the final results dataframe"""
@@ -505,11 +980,9 @@ class UnifiedCIRModel:
     
     def _generate_network_results(self):
         """Generate results for network model (WE data)"""
-        # Calculate initial paths
-        specific_columns = ['EDGE', 'distribution_hostname']
-        
-        self.df['Path'] = self.df[specific_columns].apply(
-            lambda row: self._calculate_path(self.g, row['EDGE'], row['distribution_hostname']), axis=1
+        # Calculate initial paths (one BFS per distribution host)
+        self.df['Path'] = PathEngine(self.g).calculate_paths(
+            self.df['EDGE'], self.df['distribution_hostname']
         )
 
         # Split data by status
@@ -536,11 +1009,9 @@ class UnifiedCIRModel:
     
     def _generate_bitstream_results(self):
         """Generate results for bitstream model (Others data)"""
-        # Calculate initial paths
-        specific_columns = ['EDGE', 'BITSTREAM_HOSTNAME']
-        
-        self.df['Path'] = self.df[specific_columns].apply(
-            lambda row: self._calculate_path(self.g, row['EDGE'], row['BITSTREAM_HOSTNAME']), axis=1
+        # Calculate initial paths (one BFS per bitstream host)
+        self.df['Path'] = PathEngine(self.g).calculate_paths(
+            self.df['EDGE'], self.df['BITSTREAM_HOSTNAME']
         )
         
         res_df = self.df.copy()
@@ -551,7 +1022,8 @@ class UnifiedCIRModel:
     def _process_paths(self, dfx, column):
         """Process paths and remove duplicates"""
         path_backup = dfx[column].copy()
-        dfx[column] = dfx[column].apply(lambda x: json.dumps(x) if isinstance(x, list) else str(x))
+        # Path codes stand in for the lists while deduplicating
+        dfx[column] = PathStore.from_values(dfx[column], self.g.node_names, self.g.node_ids).keys()
         dfx = dfx.drop_duplicates()
         dfx[column] = dfx.index.map(path_backup)
         return dfx
@@ -592,19 +1064,15 @@ class UnifiedCIRModel:
         """Calculate optimized paths using cached graphs"""
         start_time = time.perf_counter()
         
-        # Precompute all unique graphs
-        unique_hostnames = dfx['distribution_hostname_UP'].unique()
-        graph_cache = {}
+        # One graph per UP hostname, one BFS per distribution host within it
+        paths = {}
+        hostname_groups = dfx.groupby('distribution_hostname_UP', dropna=False, sort=False, observed=True)
         
-        for hostname in unique_hostnames:
-            graph_cache[hostname] = self._draw_graph2(self.data, [hostname])
-
-        # Apply path finding using cached graphs
-        def optimized_path_function(row):
-            graph = graph_cache[row['distribution_hostname_UP']]
-            return self._calculate_path(graph, row['EDGE'], row['distribution_hostname'])
+        for hostname, group in hostname_groups:
+            engine = PathEngine(self._draw_graph2([hostname]))
+            paths.update(engine.calculate_paths(group['EDGE'], group['distribution_hostname']).items())
 
-        dfx['Path2'] = dfx.apply(optimized_path_function, axis=1)
+        dfx['Path2'] = pd.Series(paths, index=dfx.index, dtype=object)
         
         end_time = time.perf_counter()
         execution_time = end_time - start_time
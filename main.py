@@ -3,12 +3,12 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import Response, StreamingResponse # Download Issue
-import requests
-import pandas as pd
+from starlette.background import BackgroundTask
+import httpx
 import json
+import os
+from typing import Optional
 from datetime import datetime
-import io
-import zipfile
 
 
 app = FastAPI(
@@ -24,7 +24,36 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 # Configuration - update with your API URL
-API_BASE_URL = "http://localhost:8000"
+API_BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:8000")
+
+# Shared HTTP client to the API (connection pool with keep-alive), created at startup
+API_TIMEOUT_SECONDS = float(os.environ.get("API_TIMEOUT_SECONDS", 120))
+API_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("API_CONNECT_TIMEOUT_SECONDS", 5))
+API_MAX_CONNECTIONS = int(os.environ.get("API_MAX_CONNECTIONS", 100))
+API_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("API_MAX_KEEPALIVE_CONNECTIONS", 20))
+api_client = None
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Open the pooled HTTP client to the API"""
+    global api_client
+    api_client = httpx.AsyncClient(
+        base_url=API_BASE_URL,
+        timeout=httpx.Timeout(API_TIMEOUT_SECONDS, connect=API_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=API_MAX_CONNECTIONS,
+            max_keepalive_connections=API_MAX_KEEPALIVE_CONNECTIONS
+        )
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the HTTP client and its pooled connections"""
+    if api_client is not None:
+        await api_client.aclose()
+
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -39,10 +68,9 @@ async def analyze_network_impact(
 ):
     """Analyze network impact and display results"""
     try:
-        # Call the analysis API
-        api_url = f"{API_BASE_URL}/analyze"
-        response = requests.post(
-            api_url,
+        # Summary only - the result tables fetch their rows page by page from /results
+        response = await api_client.post(
+            "/analyze",
             json={"identifier": identifier, "identifier_type": identifier_type}
         )
         
@@ -56,18 +84,12 @@ async def analyze_network_impact(
         # Parse the API response
         result = response.json()
         
-        # Get detailed data for both WE and Others
-        we_data = get_detailed_data(identifier, identifier_type, "we")
-        others_data = get_detailed_data(identifier, identifier_type, "others")
-        
         # Prepare data for the template
         template_data = {
             "request": request,
             "identifier": identifier,
             "identifier_type": identifier_type,
             "result": result,
-            "we_data": we_data,
-            "others_data": others_data,
             "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
@@ -85,9 +107,8 @@ async def api_analyze_network_impact(identifier: str, identifier_type: str = "au
     """API endpoint to get analysis results"""
     try:
         # Call the analysis API
-        api_url = f"{API_BASE_URL}/analyze"
-        response = requests.post(
-            api_url,
+        response = await api_client.post(
+            "/analyze",
             json={"identifier": identifier, "identifier_type": identifier_type}
         )
         
@@ -99,73 +120,108 @@ async def api_analyze_network_impact(identifier: str, identifier_type: str = "au
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.get("/results")
+async def results_page(
+    identifier: str,
+    identifier_type: str = "auto",
+    dataset: str = "we",
+    offset: int = 0,
+    limit: int = 50,
+    impact: Optional[str] = None,
+    status: Optional[str] = None,
+    cir_type: Optional[str] = None,
+    msancode: Optional[str] = None,
+    msancode_contains: Optional[str] = None,
+    edge: Optional[str] = None,
+    distribution: Optional[str] = None,
+    bng: Optional[str] = None,
+    bitstream: Optional[str] = None,
+    min_cust: Optional[int] = None,
+    max_cust: Optional[int] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False
+):
+    """One filtered, sorted page of results for the results page tables"""
+    query = {
+        "identifier": identifier, "identifier_type": identifier_type, "dataset": dataset,
+        "offset": offset, "limit": limit, "impact": impact, "status": status,
+        "cir_type": cir_type, "msancode": msancode, "msancode_contains": msancode_contains,
+        "edge": edge, "distribution": distribution,
+        "bng": bng, "bitstream": bitstream, "min_cust": min_cust,
+        "max_cust": max_cust, "sort_by": sort_by, "descending": descending
+    }
+    return await _relay_api_post("/analyze/results", query)
+
+@app.get("/results/values")
+async def results_values(identifier: str, column: str, identifier_type: str = "auto", dataset: str = "we"):
+    """Distinct values of a result column (e.g. the dashboard MSANCODE selector)"""
+    query = {"identifier": identifier, "identifier_type": identifier_type, "dataset": dataset, "column": column}
+    return await _relay_api_post("/analyze/results/values", query)
+
+@app.get("/topology")
+async def topology(
+    identifier: str,
+    identifier_type: str = "auto",
+    msancode: Optional[str] = None,
+    collapse: Optional[str] = None,
+    max_links: int = 500
+):
+    """Deduplicated subgraph of the affected paths for the topology and dashboard views"""
+    query = {
+        "identifier": identifier, "identifier_type": identifier_type,
+        "msancode": msancode, "collapse": collapse, "max_links": max_links
+    }
+    return await _relay_api_post("/analyze/topology", query)
+
+async def _relay_api_post(path, payload):
+    """POST to the API and return its JSON response, keeping its error status"""
+    try:
+        response = await api_client.post(path, json=payload)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"API request failed: {str(e)}")
+    
+    try:
+        content = response.json()
+    except ValueError:
+        # Error bodies from a proxy in front of the API may not be JSON
+        content = {"detail": response.text}
+    return JSONResponse(content=content, status_code=response.status_code)
+
 @app.get("/download")
 async def download_results(identifier: str, identifier_type: str = "auto"):
     """Download analysis results as CSV"""
     try:
-        # Call the CSV API
-        api_url = f"{API_BASE_URL}/analyze/csv"
-        response = requests.post(
-            api_url,
+        # Call the CSV API without reading the body - it is relayed chunk by chunk
+        api_request = api_client.build_request(
+            "POST",
+            "/analyze/csv",
             json={"identifier": identifier, "identifier_type": identifier_type}
         )
+        response = await api_client.send(api_request, stream=True)
         
         if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
             raise HTTPException(status_code=response.status_code, detail=response.text)
         
-        # Create a zip file with both WE and Others data
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, False) as zip_file:
-            # Get WE data
-            we_data = get_detailed_data(identifier, identifier_type, "we")
-            we_csv = we_data.to_csv(index=False)
-            zip_file.writestr(f"we_impact_{identifier}.csv", we_csv)
-            
-            # Get Others data
-            others_data = get_detailed_data(identifier, identifier_type, "others")
-            others_csv = others_data.to_csv(index=False)
-            zip_file.writestr(f"others_impact_{identifier}.csv", others_csv)
-        
-        zip_buffer.seek(0)
-        
-        # Generate filename
+        # The API already returns the zip with both WE and Others CSVs - pass it through
         safe_identifier = identifier.replace('/', '_').replace('\\', '_').replace('.', '_')
         filename = f"network_impact_{safe_identifier}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        content_disposition = response.headers.get(
+            "Content-Disposition", f"attachment; filename={filename}"
+        )
         
-        # Return as downloadable zip
-        return Response(
-            content=zip_buffer.getvalue(),
+        # Return as downloadable zip, closing the API response once it is relayed
+        return StreamingResponse(
+            response.aiter_raw(),
             media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
+            headers={"Content-Disposition": content_disposition},
+            background=BackgroundTask(response.aclose)
         )
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
 
-# Replaced
-def get_detailed_data(identifier, identifier_type, data_type):
-    """Get detailed data from the API"""
-    try:
-        api_url = f"{API_BASE_URL}/analyze/detailed"
-        response = requests.post(
-            api_url,
-            json={"identifier": identifier, "identifier_type": identifier_type}
-        )
-        
-        if response.status_code != 200:
-            return pd.DataFrame()
-            
-        result = response.json()
-        if data_type == "we":
-            return pd.DataFrame(result['we_results'])
-        else:
-            return pd.DataFrame(result['others_results'])
-            
-    except Exception as e:
-        print(f"Error getting detailed data: {e}")
-        return pd.DataFrame()
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -1,14 +1,16 @@
 // Improved Dashboard functionality for network path analysis
 class NetworkDashboard {
     constructor() {
-        this.weData = null;
+        this.source = null;
+        this.msanCodes = [];
         this.currentSimulation = null;
         this.observers = [];
         this.eventListeners = [];
     }
 
-    initialize(data) {
-        this.weData = data;
+    initialize(source) {
+        // Analysis whose WE rows are fetched from /results ({ identifier, identifierType })
+        this.source = source;
         
         // Check dependencies
         if (typeof d3 === 'undefined') {
@@ -43,10 +45,12 @@ class NetworkDashboard {
         this.observers.push(observer);
     }
 
-    renderDashboard() {
+    async renderDashboard() {
         console.log("Rendering dashboard...");
 
         try {
+            await this.loadMsanCodes();
+
             // Validate data
             if (!this.validateData()) {
                 this.showErrorMessage("No valid WE data available for dashboard visualization.");
@@ -68,7 +72,7 @@ class NetworkDashboard {
             this.createDashboardControls();
             
             // Initialize with first MSANCODE
-            const firstMsan = this.weData[0].MSANCODE;
+            const firstMsan = this.msanCodes[0];
             this.updateVisualization(firstMsan);
             
         } catch (error) {
@@ -77,11 +81,49 @@ class NetworkDashboard {
         }
     }
 
+    resultsUrl(path, params) {
+        const query = new URLSearchParams({
+            identifier: this.source.identifier,
+            identifier_type: this.source.identifierType,
+            dataset: 'we',
+            ...params
+        });
+        return `${path}?${query.toString()}`;
+    }
+
+    async loadMsanCodes() {
+        if (this.msanCodes.length > 0 || !this.source) return;
+
+        const response = await fetch(this.resultsUrl('/results/values', { column: 'MSANCODE' }));
+        if (!response.ok) {
+            throw new Error(`MSANCODE request failed: ${response.status}`);
+        }
+        this.msanCodes = (await response.json()).values;
+    }
+
+    async fetchMsanTopology(msanCode) {
+        const query = new URLSearchParams({
+            identifier: this.source.identifier,
+            identifier_type: this.source.identifierType,
+            msancode: msanCode
+        });
+        const response = await fetch(`/topology?${query.toString()}`);
+        if (!response.ok) {
+            throw new Error(`Topology request failed: ${response.status}`);
+        }
+        return response.json();
+    }
+
+    async fetchMsanRecords(msanCode) {
+        const response = await fetch(this.resultsUrl('/results', { msancode: msanCode, limit: 1000 }));
+        if (!response.ok) {
+            throw new Error(`Results request failed: ${response.status}`);
+        }
+        return (await response.json()).rows;
+    }
+
     validateData() {
-        return this.weData && 
-               Array.isArray(this.weData) && 
-               this.weData.length > 0 &&
-               this.weData.some(item => item.MSANCODE);
+        return Array.isArray(this.msanCodes) && this.msanCodes.length > 0;
     }
 
     createDashboardControls() {
@@ -116,12 +158,8 @@ class NetworkDashboard {
         const msanSelector = document.createElement('select');
         msanSelector.id = 'msan-selector';
 
-        // Get unique MSANCODEs with validation
-        const msanCodes = [...new Set(
-            this.weData
-                .filter(item => item.MSANCODE)
-                .map(item => item.MSANCODE)
-        )].sort();
+        // Unique MSANCODEs of the WE results (sorted by the server)
+        const msanCodes = this.msanCodes;
 
         if (msanCodes.length === 0) {
             const option = document.createElement('option');
@@ -148,7 +186,7 @@ class NetworkDashboard {
         return msanSelectorDiv;
     }
 
-    updateVisualization(msanCode) {
+    async updateVisualization(msanCode) {
         const vizContainer = document.getElementById('dashboard-viz');
         if (!vizContainer) return;
 
@@ -157,10 +195,21 @@ class NetworkDashboard {
             this.currentSimulation.stop();
         }
 
-        // Filter and validate data
-        const filteredData = this.weData.filter(item => 
-            item.MSANCODE === msanCode && (item.Path || item.Path2)
-        );
+        // Fetch and validate the records and path subgraph of this MSAN
+        let filteredData;
+        let graph;
+        try {
+            const [records, topology] = await Promise.all([
+                this.fetchMsanRecords(msanCode),
+                this.fetchMsanTopology(msanCode)
+            ]);
+            filteredData = records.filter(item => item.Path || item.Path2);
+            graph = topology;
+        } catch (error) {
+            console.error('Error loading MSAN records:', error);
+            vizContainer.innerHTML = '<div class="no-data-message"><p>Failed to load path data for selected MSANCODE.</p></div>';
+            return;
+        }
 
         if (filteredData.length === 0) {
             vizContainer.innerHTML = '<div class="no-data-message"><p>No path data available for selected MSANCODE.</p></div>';
@@ -170,7 +219,7 @@ class NetworkDashboard {
         vizContainer.innerHTML = '';
 
         try {
-            this.createNetworkVisualization(vizContainer, filteredData, msanCode);
+            this.createNetworkVisualization(vizContainer, graph, msanCode);
             this.createPathDetails(vizContainer, filteredData, msanCode);
         } catch (error) {
             console.error('Error creating visualization:', error);
@@ -178,7 +227,7 @@ class NetworkDashboard {
         }
     }
 
-    createNetworkVisualization(container, data, msanCode) {
+    createNetworkVisualization(container, graph, msanCode) {
         // Create header
         const header = document.createElement('h3');
         header.textContent = `Network Path Visualization for ${msanCode}`;
@@ -191,8 +240,8 @@ class NetworkDashboard {
         svgContainer.style.minHeight = '400px';
         container.appendChild(svgContainer);
 
-        // Process data
-        const { nodes, links } = this.processNetworkData(data);
+        // Nodes and links deduplicated by the server
+        const { nodes, links } = this.processNetworkData(graph);
         
         if (nodes.length === 0) {
             svgContainer.innerHTML = '<div class="no-data-message"><p>No valid path data for visualization.</p></div>';
@@ -202,46 +251,24 @@ class NetworkDashboard {
         this.renderD3Visualization(svgContainer, nodes, links);
     }
 
-    processNetworkData(data) {
-        const allNodes = new Set();
+    processNetworkData(graph) {
+        // One link per path kind, as primary and backup paths are drawn separately
         const links = [];
-        const linkMap = new Map(); // Prevent duplicate links
-
-        data.forEach(record => {
-            const path1 = this.parsePath(record.Path);
-            const path2 = this.parsePath(record.Path2);
-            
-            // Process primary path
-            this.processPath(path1, 'primary', allNodes, links, linkMap);
-            
-            // Process backup path
-            if (path2.length > 0) {
-                this.processPath(path2, 'backup', allNodes, links, linkMap);
+        graph.links.forEach(link => {
+            if (link.primary_msans > 0) {
+                links.push({ source: link.source, target: link.target, type: 'primary' });
+            }
+            if (link.alternative_msans > 0) {
+                links.push({ source: link.source, target: link.target, type: 'backup' });
             }
         });
 
         return {
-            nodes: Array.from(allNodes).map(id => ({ id })),
+            nodes: graph.nodes.map(node => ({ id: node.id })),
             links: links
         };
     }
 
-    processPath(path, type, allNodes, links, linkMap) {
-        path.forEach(node => allNodes.add(node));
-        
-        for (let i = 0; i < path.length - 1; i++) {
-            const linkKey = `${path[i]}-${path[i+1]}-${type}`;
-            if (!linkMap.has(linkKey)) {
-                links.push({
-                    source: path[i],
-                    target: path[i+1],
-                    type: type
-                });
-                linkMap.set(linkKey, true);
-            }
-        }
-    }
-
     renderD3Visualization(container, nodes, links) {
         const width = Math.max(container.clientWidth || 800, 600);
         const height = 400;
@@ -509,10 +536,11 @@ class NetworkDashboard {
         this.observers.forEach(observer => observer.disconnect());
         this.observers = [];
         
-        this.weData = null;
+        this.source = null;
+        this.msanCodes = [];
     }
 }
 
 // Usage example:
 // const dashboard = new NetworkDashboard();
-// dashboard.initialize(weData);
\ No newline at end of file
+// dashboard.initialize({ identifier, identifierType });
\ No newline at end of file
@@ -4,12 +4,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Set up tab functionality
     setupTabs();
     
-    // Initialize table filtering
-    initializeFiltering();
-    
-    // Initialize pagination for each table
-    initializePagination('we-table', 50);
-    initializePagination('others-table', 50);
+    // Result tables: pages are filtered, sorted and fetched from the server
+    initializeResultsTable('we-table', 50);
+    initializeResultsTable('others-table', 50);
 
     // Network Topology
     initializeNetworkVisualization();
@@ -33,7 +30,7 @@ document.addEventListener('DOMContentLoaded', function() {
             // Special handling for dashboard tab
             if (targetTab === 'dashboard-tab') {
                 // Trigger dashboard rendering if data is available
-                if (window.networkDashboard && weData) {
+                if (window.networkDashboard) {
                     // Small delay to ensure DOM is ready
                     setTimeout(() => {
                         window.networkDashboard.renderDashboard();
@@ -62,81 +59,128 @@ function setupTabs() {
     });
 }
 
-function initializeFiltering() {
-    const filterInputs = document.querySelectorAll('.filter-input');
-    
-    filterInputs.forEach(input => {
-        input.addEventListener('input', function() {
-            const columnIndex = parseInt(this.getAttribute('data-column'));
-            const filterValue = this.value.toLowerCase();
-            const table = this.closest('.section').querySelector('.data-table');
-            
-            if (!table) return;
-            
-            const rows = table.querySelectorAll('tbody tr');
-            
-            rows.forEach(row => {
-                const cell = row.cells[columnIndex];
-                if (cell) {
-                    const cellValue = cell.textContent.toLowerCase();
-                    const matches = cellValue.includes(filterValue);
-                    row.style.display = matches ? '' : 'none';
-                }
-            });
-        });
+function resultsUrl(path, params) {
+    const query = new URLSearchParams({ identifier: identifier, identifier_type: identifierType });
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined && value !== '') query.set(key, value);
     });
+    return `${path}?${query.toString()}`;
+}
+
+async function fetchResultsPage(params) {
+    const response = await fetch(resultsUrl('/results', params));
+    if (!response.ok) {
+        throw new Error(`Results request failed: ${response.status}`);
+    }
+    return response.json();
+}
+
+function formatCellValue(value) {
+    if (value === null || value === undefined) return '';
+    if (Array.isArray(value)) return value.join(' → ');
+    return String(value);
 }
 
-function initializePagination(tableId, pageSize = 50) {
+function initializeResultsTable(tableId, pageSize = 50) {
     const table = document.getElementById(tableId);
     if (!table) return;
     
-    const rows = table.querySelectorAll('tbody tr');
-    const pageCount = Math.ceil(rows.length / pageSize);
-    let currentPage = 1;
-    
-    // Create pagination controls if they don't exist
-    let paginationControls = table.closest('.section').querySelector('.pagination-controls');
-    if (!paginationControls) {
-        paginationControls = document.createElement('div');
-        paginationControls.className = 'pagination-controls';
-        paginationControls.innerHTML = `
-            <button class="prev-page">Previous</button>
-            <span class="page-info">Page 1 of ${pageCount}</span>
-            <button class="next-page">Next</button>
-        `;
-        table.parentNode.insertBefore(paginationControls, table.nextSibling);
-    }
-    
+    const section = table.closest('.section');
+    const dataset = table.getAttribute('data-dataset');
+    const headers = table.querySelectorAll('thead th[data-column]');
+    const columns = Array.from(headers).map(th => th.getAttribute('data-column'));
+    const tbody = table.querySelector('tbody');
+    const paginationControls = section.querySelector('.pagination-controls');
     const prevButton = paginationControls.querySelector('.prev-page');
     const nextButton = paginationControls.querySelector('.next-page');
     const pageInfo = paginationControls.querySelector('.page-info');
     
-    function showPage(page) {
-        currentPage = page;
-        const start = (page - 1) * pageSize;
-        const end = start + pageSize;
-        
-        rows.forEach((row, index) => {
-            row.style.display = (index >= start && index < end) ? '' : 'none';
+    const state = { offset: 0, total: 0, sortBy: null, descending: false, filters: {} };
+    let requestId = 0;
+    
+    async function loadPage(offset) {
+        const currentRequest = ++requestId;
+        pageInfo.textContent = 'Loading...';
+        
+        try {
+            const page = await fetchResultsPage({
+                dataset: dataset,
+                offset: offset,
+                limit: pageSize,
+                sort_by: state.sortBy,
+                descending: state.descending,
+                ...state.filters
+            });
+            
+            // A newer request (filter typed, page clicked) superseded this one
+            if (currentRequest !== requestId) return;
+            
+            state.offset = offset;
+            state.total = page.total;
+            renderRows(page.rows);
+            
+            const pageCount = Math.max(1, Math.ceil(page.total / pageSize));
+            const currentPage = Math.floor(offset / pageSize) + 1;
+            pageInfo.textContent = `Page ${currentPage} of ${pageCount} (${page.total} records)`;
+            prevButton.disabled = offset === 0;
+            nextButton.disabled = offset + pageSize >= page.total;
+        } catch (error) {
+            console.error(`Error loading ${dataset} results:`, error);
+            pageInfo.textContent = 'Failed to load results';
+        }
+    }
+    
+    function renderRows(rows) {
+        tbody.innerHTML = '';
+        rows.forEach(record => {
+            const row = document.createElement('tr');
+            const impact = record.Impact ? record.Impact.toLowerCase().replace(/\s+/g, '-') : 'unknown';
+            row.className = `impact-${impact}`;
+            
+            columns.forEach(column => {
+                const cell = document.createElement('td');
+                cell.textContent = formatCellValue(record[column]);
+                row.appendChild(cell);
+            });
+            tbody.appendChild(row);
         });
-        
-        pageInfo.textContent = `Page ${page} of ${pageCount}`;
-        
-        // Enable/disable buttons
-        prevButton.disabled = currentPage === 1;
-        nextButton.disabled = currentPage === pageCount;
     }
     
+    // Filters - reload from the first page, debounced while typing
+    let filterTimer = null;
+    section.querySelectorAll('.filter-input[data-filter]').forEach(input => {
+        const eventName = input.tagName === 'SELECT' ? 'change' : 'input';
+        input.addEventListener(eventName, function() {
+            state.filters[this.getAttribute('data-filter')] = this.value.trim();
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(() => loadPage(0), 300);
+        });
+    });
+    
+    // Sorting - click a header to sort, click again to reverse
+    headers.forEach(th => {
+        const column = th.getAttribute('data-column');
+        if (column === 'Path' || column === 'Path2') return;
+        
+        th.style.cursor = 'pointer';
+        th.addEventListener('click', () => {
+            state.descending = state.sortBy === column ? !state.descending : false;
+            state.sortBy = column;
+            headers.forEach(header => header.removeAttribute('data-sort'));
+            th.setAttribute('data-sort', state.descending ? 'desc' : 'asc');
+            loadPage(0);
+        });
+    });
+    
     prevButton.addEventListener('click', () => {
-        if (currentPage > 1) showPage(currentPage - 1);
+        if (state.offset > 0) loadPage(Math.max(0, state.offset - pageSize));
     });
     
     nextButton.addEventListener('click', () => {
-        if (currentPage < pageCount) showPage(currentPage + 1);
+        if (state.offset + pageSize < state.total) loadPage(state.offset + pageSize);
     });
     
-    showPage(1);
+    loadPage(0);
 }
 
 function initializeNetworkVisualization() {
@@ -154,31 +198,49 @@ function initializeNetworkVisualization() {
     });
     
     observer.observe(topologyTab, { attributes: true });
+    
+    // Toggle between hostnames and one node per exchange (for very large impacts)
+    const collapseBtn = document.getElementById('collapse-exchanges');
+    if (collapseBtn) {
+        collapseBtn.addEventListener('click', function() {
+            topologyCollapse = topologyCollapse ? null : 'exchange';
+            this.textContent = topologyCollapse ? 'Show Hostnames' : 'Group by Exchange';
+            renderNetworkTopology();
+        });
+    }
+}
+
+let topologyCollapse = null;
+
+async function fetchTopology(params) {
+    const response = await fetch(resultsUrl('/topology', params));
+    if (!response.ok) {
+        throw new Error(`Topology request failed: ${response.status}`);
+    }
+    return response.json();
 }
 
-function renderNetworkTopology() {
+function nodeColor(node) {
+    if (node.failed) return '#ff0000';
+    switch(node.type) {
+        case 'edge': return '#4CAF50';
+        case 'distribution': return '#2196F3';
+        case 'bng': return '#FF9800';
+        case 'bitstream': return '#9C27B0';
+        default: return '#795548';
+    }
+}
+
+async function renderNetworkTopology() {
     console.log("Rendering network topology...");
     
     try {
         // Clear previous visualization
-        d3.select('#network-topology').selectAll('*').remove();
-        
-        // Check if required variables exist
-        const hasWeData = typeof weData !== 'undefined' && weData && weData.length > 0;
-        const hasOthersData = typeof othersData !== 'undefined' && othersData && othersData.length > 0;
-        const hasIdentifier = typeof identifier !== 'undefined' && identifier;
-        const hasIdentifierType = typeof identifierType !== 'undefined' && identifierType;
-        
-        console.log("Data availability:", { hasWeData, hasOthersData, hasIdentifier, hasIdentifierType });
+        d3.select('#network-topology').selectAll('svg').remove();
         
-        if (!hasWeData && !hasOthersData) {
-            showErrorMessage("No network data available. Please ensure data is loaded properly.");
-            return;
-        }
-        
-        // Extract node and link data from the results
-        const graphData = extractGraphData();
-        console.log("Graph data:", graphData);
+        // Deduplicated nodes/links computed by the server (capped to the busiest links)
+        const graphData = await fetchTopology({ collapse: topologyCollapse, max_links: 500 });
+        console.log("Graph data:", graphData.nodes.length, "nodes,", graphData.links.length, "links");
         
         if (graphData.nodes.length === 0) {
             showErrorMessage("No network nodes found in the data.");
@@ -187,6 +249,9 @@ function renderNetworkTopology() {
         
         // Hide loading message, show visualization container
         hideMessages();
+        if (graphData.truncated) {
+            showInfoMessage(`Showing the ${graphData.links.length} links carrying the most MSANs out of ${graphData.total_links}.`);
+        }
         
         // Create SVG container
         const container = document.getElementById('network-topology');
@@ -236,7 +301,7 @@ function renderNetworkTopology() {
                     default: return '#999';
                 }
             })
-            .attr('stroke-width', d => d.type === 'normal' ? 1 : 2)
+            .attr('stroke-width', d => 1 + Math.log2(1 + d.msans))
             .attr('stroke-opacity', 0.6);
         
         // Draw nodes
@@ -248,7 +313,7 @@ function renderNetworkTopology() {
             .append('circle')
             .attr('class', d => `node ${d.type}`)
             .attr('r', 8)
-            .attr('fill', d => d.color)
+            .attr('fill', d => nodeColor(d))
             .attr('stroke', d => d.failed ? '#ff0000' : '#fff')
             .attr('stroke-width', d => d.failed ? 3 : 2)
             .style('cursor', 'pointer')
@@ -264,7 +329,7 @@ function renderNetworkTopology() {
                     <div><strong>${d.id}</strong></div>
                     <div>Type: ${d.type}</div>
                     <div>Status: ${d.failed ? 'Failed' : 'Operational'}</div>
-                    ${d.impact ? `<div>Impact: ${d.impact}</div>` : ''}
+                    <div>Affected MSANs: ${d.msans}</div>
                 `)
                     .style('left', (event.pageX + 10) + 'px')
                     .style('top', (event.pageY - 28) + 'px');
@@ -368,136 +433,6 @@ function renderNetworkTopology() {
     }
 }
 
-function extractGraphData() {
-    console.log("Extracting graph data...");
-    
-    const nodes = [];
-    const links = [];
-    const nodeMap = new Map();
-    
-    // Function to add a node if it doesn't exist
-    function addNode(id, type, failed = false) {
-        if (!id || typeof id !== 'string' || nodeMap.has(id)) return;
-        
-        let color;
-        switch(type) {
-            case 'edge': color = '#4CAF50'; break;
-            case 'distribution': color = '#2196F3'; break;
-            case 'bng': color = '#FF9800'; break;
-            case 'bitstream': color = '#9C27B0'; break;
-            case 'failed': color = '#ff0000'; break;
-            default: color = '#795548';
-        }
-        
-        nodes.push({
-            id: id,
-            type: type,
-            color: color,
-            failed: failed
-        });
-        
-        nodeMap.set(id, true);
-    }
-    
-    // Function to add a link if it doesn't exist
-    function addLink(source, target, type = 'normal') {
-        if (!source || !target || typeof source !== 'string' || typeof target !== 'string') return;
-        if (source === target) return; // No self-links
-        
-        // Check if link already exists
-        const linkExists = links.some(link => 
-            (link.source === source && link.target === target) ||
-            (link.source === target && link.target === source)
-        );
-        
-        if (!linkExists) {
-            links.push({
-                source: source,
-                target: target,
-                type: type
-            });
-        }
-    }
-    
-    try {
-        // Add some sample data if no real data is available
-        if (typeof weData === 'undefined' && typeof othersData === 'undefined') {
-            console.log("No data available, creating sample network");
-            addNode('Sample-EDGE-01', 'edge');
-            addNode('Sample-DIST-01', 'distribution');
-            addNode('Sample-BNG-01', 'bng');
-            addNode('Failed-Node', 'failed', true);
-            
-            addLink('Sample-EDGE-01', 'Sample-DIST-01');
-            addLink('Sample-DIST-01', 'Sample-BNG-01');
-            addLink('Failed-Node', 'Sample-EDGE-01', 'affected');
-            
-            return { nodes, links };
-        }
-        
-        // Process WE data if available
-        if (typeof weData !== 'undefined' && weData && weData.length > 0) {
-            console.log("Processing WE data:", weData.length, "records");
-            
-            weData.forEach(record => {
-                if (!record) return;
-                
-                // Add nodes
-                if (record.EDGE) addNode(record.EDGE, 'edge');
-                if (record.distribution_hostname) addNode(record.distribution_hostname, 'distribution');
-                if (record.BNG_HOSTNAME) addNode(record.BNG_HOSTNAME, 'bng');
-                
-                // Add links
-                if (record.EDGE && record.distribution_hostname) {
-                    addLink(record.EDGE, record.distribution_hostname, 
-                           record.Impact === 'Isolated' ? 'affected' : 'normal');
-                }
-                
-                if (record.distribution_hostname && record.BNG_HOSTNAME) {
-                    addLink(record.distribution_hostname, record.BNG_HOSTNAME, 'normal');
-                }
-            });
-        }
-        
-        // Process Others data if available
-        if (typeof othersData !== 'undefined' && othersData && othersData.length > 0) {
-            console.log("Processing Others data:", othersData.length, "records");
-            
-            othersData.forEach(record => {
-                if (!record) return;
-                
-                // Add nodes
-                if (record.EDGE) addNode(record.EDGE, 'edge');
-                if (record.BITSTREAM_HOSTNAME) addNode(record.BITSTREAM_HOSTNAME, 'bitstream');
-                
-                // Add links
-                if (record.EDGE && record.BITSTREAM_HOSTNAME) {
-                    addLink(record.EDGE, record.BITSTREAM_HOSTNAME,
-                           record.Impact === 'Isolated' ? 'affected' : 'normal');
-                }
-            });
-        }
-        
-        // Add the failed node/exchange if identifier is available
-        if (typeof identifier !== 'undefined' && identifier && typeof identifierType !== 'undefined') {
-            if (identifierType === 'node') {
-                addNode(identifier, 'failed', true);
-            }
-        }
-        
-        console.log("Extracted", nodes.length, "nodes and", links.length, "links");
-        return { nodes, links };
-        
-    } catch (error) {
-        console.error("Error in extractGraphData:", error);
-        // Return sample data on error
-        addNode('Error-Node', 'failed', true);
-        addNode('Sample-Node', 'edge');
-        addLink('Error-Node', 'Sample-Node', 'affected');
-        return { nodes, links };
-    }
-}
-
 function showErrorMessage(message) {
     const loadingMsg = document.getElementById('loading-message');
     const errorMsg = document.getElementById('error-message');
@@ -509,10 +444,21 @@ function showErrorMessage(message) {
     }
 }
 
+function showInfoMessage(message) {
+    const infoMsg = document.getElementById('info-message');
+    if (infoMsg) {
+        infoMsg.style.display = 'block';
+        infoMsg.textContent = message;
+    }
+}
+
 function hideMessages() {
     const loadingMsg = document.getElementById('loading-message');
     const errorMsg = document.getElementById('error-message');
     
+    const infoMsg = document.getElementById('info-message');
+    
     if (loadingMsg) loadingMsg.style.display = 'none';
     if (errorMsg) errorMsg.style.display = 'none';
+    if (infoMsg) infoMsg.style.display = 'none';
 }
\ No newline at end of file
@@ -0,0 +1,45 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+
+# The API modules import each other as top-level modules from endpoint/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'endpoint'))
+
+from network_data import make_network
+from unified_network_analyzer import UnifiedNetworkImpactAnalyzer
+
+
+@pytest.fixture(scope='session')
+def data():
+    """Small synthetic dataset (see network_data.make_network)"""
+    return make_network(seed=3, n_blocks=20, n_msans=20)
+
+
+@pytest.fixture(scope='session')
+def analyzers(data):
+    """Prepared 'we' and 'others' analyzers over the small dataset"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzers = {
+            name: UnifiedNetworkImpactAnalyzer(data[name], data['ospf'], data['wan'], data['agg'])
+            for name in ('we', 'others')
+        }
+        for analyzer in analyzers.values():
+            analyzer.prepare()
+    return analyzers
+
+
+@pytest.fixture
+def api(analyzers, monkeypatch):
+    """Test client of the API serving the prepared analyzers (no startup, empty result cache)"""
+    from fastapi.testclient import TestClient
+    import main_API
+
+    monkeypatch.setattr(main_API, 'we_analyzer', analyzers['we'])
+    monkeypatch.setattr(main_API, 'others_analyzer', analyzers['others'])
+    monkeypatch.setattr(main_API, 'impact_store', None)
+    main_API.result_cache.clear()
+    return TestClient(main_API.app)
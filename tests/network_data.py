@@ -0,0 +1,166 @@
+"""
+Synthetic datasets for the tests, and a comparable form of analysis results.
+
+The WAN topology is a cactus graph whose cycles are all odd, so every pair of
+hosts has exactly one shortest path. Random chords can be added on top, which
+creates many pairs with several equal-length shortest paths (ties).
+"""
+import math
+import random
+import numpy as np
+import pandas as pd
+
+
+EXCHANGES = ['CAI.ABA', 'CAI.NSR', 'GIZ.DOK', 'ALX.SMH', 'ALX.MNS', 'GIZ.HRM']
+
+
+def _exchange_of(hostname):
+    return [exchange for exchange in EXCHANGES if exchange.endswith(hostname.split('-')[2])][0]
+
+
+def make_network(seed=7, n_blocks=40, n_msans=50, chords=0):
+    """
+    Build a random dataset, with chords extra random links between hosts.
+
+    Returns:
+        dict: DataFrames 'we' (Report(11)), 'others' (Report(12)), 'ospf', 'wan' and 'agg'
+    """
+    rnd = random.Random(seed)
+    codes = [exchange.split('.')[1] for exchange in EXCHANGES]
+    counter = [0]
+
+    def hostname(kind, code=None):
+        counter[0] += 1
+        return f"{kind}-R{counter[0]:03d}-{code or rnd.choice(codes)}-EG"
+
+    nodes = ['CORE-R000-ABA-EG']
+    links = set()
+
+    # Core: pendant links, triangles and pentagons hung off existing nodes
+    for _ in range(n_blocks):
+        base = rnd.choice(nodes)
+        draw = rnd.random()
+        if draw < 0.35:
+            new = [hostname(rnd.choice(['AGG', 'DIST', 'CORE']))]
+            chain = [base] + new
+        else:
+            new = [hostname(rnd.choice(['AGG', 'DIST', 'CORE'])) for _ in range(2 if draw < 0.75 else 4)]
+            chain = [base] + new + [base]
+        links.update(zip(chain, chain[1:]))
+        nodes += new
+
+    insomna = ['INSOMNA-R01J-C-EG', 'INSOMNA-R02J-C-EG']
+    base = rnd.choice(nodes)
+    links |= {(base, insomna[0]), (insomna[0], insomna[1]), (insomna[1], base)}
+
+    dists = [node for node in nodes if node.startswith(('DIST', 'AGG'))]
+    bngs = [node for node in nodes if node.startswith('CORE')]
+
+    report_we, report_others = [], []
+    edges = []
+    row_id = 0
+    for m in range(n_msans):
+        msan = f"MSAN{m:04d}"
+        code = rnd.choice(codes)
+        exchange = [e for e in EXCHANGES if e.endswith(code)][0]
+        edge = hostname('EDGE', code)
+        edges.append(edge)
+        dist_up = rnd.choice(dists)
+        links.add((edge, dist_up))
+
+        if rnd.random() < 0.6:
+            # Dual homed: new odd cycle edge - dist_up - [agg, agg] - dist_standby - edge
+            dist_standby = hostname('DIST', code)
+            middle = [hostname('AGG', code) for _ in range(rnd.choice([0, 2]))]
+            cycle = [edge, dist_up] + middle + [dist_standby, edge]
+            links.update(zip(cycle, cycle[1:]))
+        else:
+            dist_standby = rnd.choice(dists)
+
+        bng = rnd.choice(bngs)
+        for vlan in range(rnd.randint(1, 3)):
+            port = f"Gi0/{rnd.randint(0, 3)}.{100 + vlan}"
+            customers = rnd.randint(0, 500)
+            for status, dist in (('UP', dist_up), ('ST', dist_standby)):
+                if status == 'ST' and rnd.random() < 0.2:
+                    continue
+                row_id += 1
+                report_we.append(dict(
+                    ID=row_id, ROWVERSION='x', MSANCODE=msan, EDGE=edge, edge_exchange=exchange,
+                    edge_port=port, VLAN=100 + vlan, distribution_hostname=dist,
+                    distribution_Exchange=_exchange_of(dist),
+                    BNG_HOSTNAME=bng if rnd.random() > 0.03 else None, STATUS=status, CUST=customers
+                ))
+
+        if rnd.random() < 0.7:
+            bitstream = rnd.choice(dists + bngs)
+            for v in range(rnd.randint(1, 2)):
+                report_others.append(dict(
+                    ID=row_id + v, ROWVERSION='y', MSANCODE=msan, EDGE=edge, EDGE_exchange=exchange,
+                    EDGE_PORT=f"Te0/{v}.{200 + v}", EDGE_VLAN=200 + v, BITSTREAM_HOSTNAME=bitstream,
+                    Bitstream_exchange=_exchange_of(bitstream),
+                    SERVICE=rnd.choice(['DATA', 'VOICE']), ISP=rnd.choice(['ISP1', 'ISP2']), CUST=rnd.randint(0, 50)
+                ))
+
+    # A report row whose EDGE is missing from the topology
+    report_others.append(dict(
+        ID=9999, ROWVERSION='y', MSANCODE='MSANX', EDGE='EDGE-R999-ABA-EG', EDGE_exchange='CAI.ABA',
+        EDGE_PORT='Te0/9.9', EDGE_VLAN=9, BITSTREAM_HOSTNAME=dists[0], Bitstream_exchange='CAI.ABA',
+        SERVICE='DATA', ISP='ISP1', CUST=3
+    ))
+
+    # Own generator, so the chord-free network does not depend on chords
+    chord_rnd = random.Random(seed + 1)
+    hosts = nodes + edges
+    for _ in range(chords):
+        links.add(tuple(chord_rnd.sample(hosts, 2)))
+
+    wan = []
+    for a, b in sorted(links):
+        wan.append(dict(NODENAME=a, NEIGHBOR_HOSTNAME=b, LOCAL_INTERFACE='Gi0/0/1', NEIGHBOR_INTERFACE='Gi0/0/2'))
+        wan.append(dict(NODENAME=b, NEIGHBOR_HOSTNAME=a, LOCAL_INTERFACE='Gi0/0/2', NEIGHBOR_INTERFACE='Gi0/0/1'))
+    wan.append(wan[0])  # Duplicate row
+
+    ospf = [
+        dict(NODENAME=a, LOCAL_INTERFACE=f"Gi0/0/{i % 4}:{i}", NEIGHBOR_HOSTNAME=b,
+             NEIGHBOR_INTERFACE=f"Gi0/1/{i % 3}:0" if i % 5 else np.nan)
+        for i, (a, b) in enumerate(sorted(links))
+    ]
+    agg = [dict(AGG_HOSTNAME=dist, EXCHANGE=dist.split('-')[2]) for dist in dists]
+
+    return {
+        'we': pd.DataFrame(report_we),
+        'others': pd.DataFrame(report_others),
+        'ospf': pd.DataFrame(ospf),
+        'wan': pd.DataFrame(wan),
+        'agg': pd.DataFrame(agg)
+    }
+
+
+def identifiers(data):
+    """Every node and exchange of a dataset plus a few unknown or mistyped identifiers"""
+    nodes = set(data['wan'].NODENAME) | set(data['we'].EDGE) | set(data['others'].EDGE) | set(data['we'].BNG_HOSTNAME.dropna())
+    items = [(node, 'auto') for node in sorted(nodes)]
+    exchanges = sorted(set(data['we'].edge_exchange) | set(data['we'].distribution_Exchange) | set(data['others'].Bitstream_exchange))
+    items += [(exchange, 'exchange') for exchange in exchanges] + [(exchange, 'auto') for exchange in exchanges[:2]]
+    items += [('NOPE-R1-XXX-EG', 'node'), ('ZZZ.QQQ', 'exchange'), (items[3][0], 'exchange')]
+    return items
+
+
+def _normalize_value(value):
+    """Comparable form of a result cell: paths as tuples of strings, errors by type and message, NaN as None"""
+    if isinstance(value, (list, tuple)):
+        return ('PATH',) + tuple(str(node) for node in value)
+    if isinstance(value, BaseException):
+        return ('EXC', type(value).__name__, str(value))
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+        return float(value)
+    return str(value)
+
+
+def normalize(results):
+    """Comparable form of an analysis result: its columns and normalized rows, in order"""
+    rows = [tuple(_normalize_value(value) for value in row) for row in results.astype(object).itertuples(index=False)]
+    return list(results.columns), rows
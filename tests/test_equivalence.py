@@ -0,0 +1,101 @@
+"""
+Equivalence of the optimized analyzer with the original pure-networkx analyzer
+(tests/reference_analyzer.py) on every node and exchange of two synthetic
+networks: one with a single shortest path between any two hosts and one with
+chords, where many hosts have several equal-length shortest paths.
+"""
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+import reference_analyzer
+from network_data import identifiers, make_network, normalize
+from unified_network_analyzer import UnifiedNetworkImpactAnalyzer
+
+
+# The reference uses pandas behaviour that is now deprecated
+pytestmark = pytest.mark.filterwarnings('ignore::FutureWarning')
+
+DATASETS = {
+    'unique': make_network(),
+    'ties': make_network(seed=11, chords=40)
+}
+CASES = [
+    (dataset, name, identifier, identifier_type)
+    for dataset, data in DATASETS.items()
+    for name in ('we', 'others')
+    for identifier, identifier_type in identifiers(data)
+]
+
+
+def _reference(data, name):
+    """Reference analyzer that computes its base results once and replays a copy per query"""
+    analyzer = reference_analyzer.UnifiedNetworkImpactAnalyzer(data[name], data['ospf'], data['wan'], data['agg'])
+    analyzer.preprocess_data()
+    base_results = analyzer.generate_base_results(None)
+    model = analyzer.model
+
+    def replay(dwn_identifier):
+        analyzer.final_df, analyzer.model = base_results.copy(), model
+        return analyzer.final_df
+
+    # Base results do not depend on the identifier
+    analyzer.preprocess_data = lambda: None
+    analyzer.generate_base_results = replay
+    return analyzer
+
+
+@pytest.fixture(scope='module')
+def analyzer_pairs():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            (dataset, name): (
+                _reference(data, name),
+                UnifiedNetworkImpactAnalyzer(data[name], data['ospf'], data['wan'], data['agg'])
+            )
+            for dataset, data in DATASETS.items()
+            for name in ('we', 'others')
+        }
+
+
+@pytest.mark.parametrize('dataset, name, identifier, identifier_type', CASES)
+def test_matches_reference(analyzer_pairs, dataset, name, identifier, identifier_type):
+    reference, analyzer = analyzer_pairs[(dataset, name)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = reference.run_complete_analysis(identifier, identifier_type)
+        results = analyzer.run_complete_analysis(identifier, identifier_type)
+
+    assert normalize(results) == normalize(expected)
+
+
+def test_kept_paths_with_ties_are_searched_again():
+    # H4 -> H6 has two shortest paths; networkx picks H4-H1-H2-H6, which avoids
+    # H0, but picks H4-H7-H2-H6 once H0 is removed. The row is affected through
+    # its MSAN (VLAN 101 transits H0), so its Path2 must be searched again.
+    links = [
+        ('H2', 'H7'), ('H7', 'H5'), ('H1', 'H4'), ('H0', 'H6'), ('H7', 'H2'), ('H3', 'H1'),
+        ('H7', 'H4'), ('H7', 'H3'), ('H2', 'H1'), ('H2', 'H6'), ('H0', 'H8')
+    ]
+    wan = pd.DataFrame([
+        dict(NODENAME=a, NEIGHBOR_HOSTNAME=b, LOCAL_INTERFACE='Gi0/0/1', NEIGHBOR_INTERFACE='Gi0/0/2') for a, b in links
+    ])
+    ospf = wan[['NODENAME', 'LOCAL_INTERFACE', 'NEIGHBOR_HOSTNAME', 'NEIGHBOR_INTERFACE']]
+    agg = pd.DataFrame({'AGG_HOSTNAME': ['H6', 'H8'], 'EXCHANGE': ['X', 'X']})
+    row = dict(
+        ROWVERSION='x', MSANCODE='M1', EDGE='H4', edge_exchange='A.B', edge_port='Gi0/1',
+        BNG_HOSTNAME='H5', CUST=10, distribution_Exchange='C.D'
+    )
+    report = pd.DataFrame([
+        dict(row, ID=1, VLAN=100, distribution_hostname='H6', STATUS='UP'),
+        dict(row, ID=2, VLAN=101, distribution_hostname='H8', STATUS='UP'),
+        dict(row, ID=3, VLAN=100, distribution_hostname='H3', STATUS='ST')
+    ])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = reference_analyzer.UnifiedNetworkImpactAnalyzer(report, ospf, wan, agg).run_complete_analysis('H0', 'node')
+        results = UnifiedNetworkImpactAnalyzer(report, ospf, wan, agg).run_complete_analysis('H0', 'node')
+
+    assert expected['Path2'].tolist()[0] == ('H4', 'H7', 'H2', 'H6')
+    assert normalize(results) == normalize(expected)
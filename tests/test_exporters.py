@@ -0,0 +1,181 @@
+import contextlib
+import io
+import json
+import zipfile
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from exporters import ARROW_AVAILABLE, _ChunkedOutput, iter_arrow_stream, iter_csv_chunks, iter_ndjson, stream_csv_zip
+
+
+def _results(n_rows=23):
+    return pd.DataFrame({
+        'MSANCODE': [f"MSAN{i % 7}" for i in range(n_rows)],
+        'STATUS': pd.Categorical(['UP', 'ST'] * (n_rows // 2) + ['UP'] * (n_rows % 2)),
+        'CUST': np.arange(n_rows) * 3,
+        'cir_type': [np.nan if i % 3 else 'Dual' for i in range(n_rows)],
+        'Path': [
+            ['EDGE-R1-ABA-EG', f"DIST-R{i % 4}-ABA-EG"] if i % 5 else
+            nx.NodeNotFound('Source EDGE-R9-ABA-EG is not in G') if i % 10 else np.nan
+            for i in range(n_rows)
+        ]
+    })
+
+
+def _read_zip(parts):
+    with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as zip_file:
+        assert zip_file.testzip() is None
+        return {name: zip_file.read(name).decode('utf-8') for name in zip_file.namelist()}
+
+
+def test_chunked_output_hands_out_written_bytes_once():
+    output = _ChunkedOutput()
+    output.write(b"ab")
+    output.write(memoryview(b"cd"))
+
+    assert output.drain() == b"abcd"
+    assert output.drain() == b""
+    output.close()
+    assert output.closed
+
+
+def test_csv_chunks_match_to_csv():
+    results = _results()
+
+    assert "".join(iter_csv_chunks(results, chunk_rows=4)) == results.to_csv(index=False)
+    assert "".join(iter_csv_chunks(results.iloc[:0], chunk_rows=4)) == results.iloc[:0].to_csv(index=False)
+
+
+def test_zip_members_match_the_dataframes():
+    we, others = _results(), _results(9).drop(columns=['Path'])
+    parts = list(stream_csv_zip([('we.csv', we), ('others.csv', others)], chunk_rows=4))
+
+    # Sent as it is produced, not as one body
+    assert len(parts) > 2
+    members = _read_zip(parts)
+    assert list(members) == ['we.csv', 'others.csv']
+    assert members['we.csv'] == we.to_csv(index=False)
+    assert members['others.csv'] == others.to_csv(index=False)
+
+    read_back = pd.read_csv(io.StringIO(members['others.csv']))
+    pd.testing.assert_frame_equal(read_back, others.astype({'STATUS': object}))
+
+
+def test_zip_of_empty_results():
+    empty = _results().iloc[:0]
+    members = _read_zip(stream_csv_zip([('we.csv', empty), ('others.csv', pd.DataFrame())]))
+
+    assert members['we.csv'] == 'MSANCODE,STATUS,CUST,cir_type,Path\n'
+    assert members['others.csv'] == pd.DataFrame().to_csv(index=False)
+    assert _read_zip(stream_csv_zip([])) == {}
+
+
+def test_csv_endpoint(api, analyzers, data):
+    edge = data['we']['EDGE'].iloc[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = analyzers['we'].run_complete_analysis(edge, 'node')
+    response = api.post('/analyze/csv', json={'identifier': edge, 'identifier_type': 'node'})
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/zip'
+    members = _read_zip([response.content])
+    assert sorted(members) == [f"others_impact_{edge}.csv", f"we_impact_{edge}.csv"]
+    assert len(expected) > 0
+    assert members[f"we_impact_{edge}.csv"] == expected.to_csv(index=False)
+
+
+def _decode_paths(values, nodes):
+    """NDJSON path values back to hostname lists (errors and missing values as sent)"""
+    return [[nodes[i] for i in value] if isinstance(value, list) else value for value in values]
+
+
+def test_ndjson_rows_match_the_dataframes():
+    we, others = _results(), _results(5).drop(columns=['Path'])
+    others['Path2'] = [['EDGE-R7-NSR-EG', 'DIST-R1-ABA-EG']] * 4 + ['NetworkXNoPath: No path between X and Y.']
+    lines = [json.loads(line) for line in "".join(iter_ndjson([('we', we), ('others', others)], chunk_rows=4)).splitlines()]
+
+    nodes = lines[0]['nodes']
+    assert sorted(nodes) == sorted({node for path in list(we['Path']) + list(others['Path2']) if isinstance(path, list) for node in path})
+    assert lines[1] == {'dataset': 'we', 'rows': len(we), 'columns': list(we.columns)}
+    assert lines[2 + len(we)] == {'dataset': 'others', 'rows': len(others), 'columns': list(others.columns)}
+
+    we_rows = lines[2:2 + len(we)]
+    for column_index, column in enumerate(we.columns):
+        values = [row[column_index] for row in we_rows]
+        if column == 'Path':
+            expected = [
+                value if isinstance(value, list) else None if value is np.nan else str(value)
+                for value in we['Path']
+            ]
+            assert _decode_paths(values, nodes) == expected
+        else:
+            assert values == we[column].astype(object).where(we[column].notna(), None).tolist()
+
+    others_rows = lines[3 + len(we):]
+    assert _decode_paths([row[-1] for row in others_rows], nodes) == others['Path2'].tolist()
+
+
+def test_ndjson_of_empty_results():
+    lines = [json.loads(line) for line in iter_ndjson([('we', _results().iloc[:0]), ('others', pd.DataFrame())])]
+
+    assert lines == [
+        {'nodes': []},
+        {'dataset': 'we', 'rows': 0, 'columns': list(_results().columns)},
+        {'dataset': 'others', 'rows': 0, 'columns': []}
+    ]
+
+
+def test_arrow_stream_matches_the_dataframes():
+    pa = pytest.importorskip('pyarrow')
+    we, others = _results(), _results(6).drop(columns=['Path'])
+    others['ISP'] = ['ISP1', None] * 3
+    parts = list(iter_arrow_stream([('we', we), ('others', others)], chunk_rows=4))
+
+    # One part per record batch (the first also carries the schema), plus the end of stream
+    assert len(parts) == 6 + 2 + 1
+    table = pa.ipc.open_stream(b"".join(parts)).read_all()
+    assert table.column_names == ['dataset', 'MSANCODE', 'STATUS', 'CUST', 'cir_type', 'Path', 'Path_error', 'ISP']
+    columns = table.to_pydict()
+
+    assert columns['dataset'] == ['we'] * len(we) + ['others'] * len(others)
+    assert columns['MSANCODE'] == we['MSANCODE'].tolist() + others['MSANCODE'].tolist()
+    assert columns['STATUS'] == we['STATUS'].tolist() + others['STATUS'].tolist()
+    assert columns['CUST'] == we['CUST'].tolist() + others['CUST'].tolist()
+    assert columns['cir_type'] == [None if value is np.nan else value for value in list(we['cir_type']) + list(others['cir_type'])]
+    assert columns['Path'] == [value if isinstance(value, list) else None for value in we['Path']] + [None] * len(others)
+    assert columns['Path_error'] == [
+        str(value) if isinstance(value, Exception) else None for value in we['Path']
+    ] + [None] * len(others)
+    assert columns['ISP'] == [None] * len(we) + others['ISP'].tolist()
+
+
+def test_arrow_stream_of_empty_results():
+    pa = pytest.importorskip('pyarrow')
+    table = pa.ipc.open_stream(b"".join(iter_arrow_stream([('we', _results().iloc[:0]), ('others', pd.DataFrame())]))).read_all()
+
+    assert table.num_rows == 0
+    assert table.column_names == ['dataset', 'MSANCODE', 'STATUS', 'CUST', 'cir_type', 'Path', 'Path_error']
+
+
+def test_detailed_formats(api, data):
+    edge = data['we']['EDGE'].iloc[0]
+    request = {'identifier': edge, 'identifier_type': 'node'}
+    records = api.post('/analyze/detailed', json=request).json()
+
+    response = api.post('/analyze/detailed', json=request, headers={'Accept': 'application/x-ndjson'})
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[1]['dataset'] == 'we_results'
+    assert lines[1]['rows'] == len(records['we_results']) > 0
+    assert lines[2][lines[1]['columns'].index('MSANCODE')] == records['we_results'][0]['MSANCODE']
+
+    response = api.post('/analyze/detailed?format=arrow', json=request)
+    if ARROW_AVAILABLE:
+        pa = pytest.importorskip('pyarrow')
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.num_rows == len(records['we_results']) + len(records['others_results'])
+    else:
+        assert response.status_code == 501
@@ -0,0 +1,88 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+import reference_analyzer
+from network_data import normalize
+from unified_network_analyzer import ImpactQuery, UnifiedNetworkImpactAnalyzer
+
+
+def _frame(msans, paths, cir_types=None):
+    frame = pd.DataFrame({
+        'MSANCODE': msans,
+        'EDGE': ['E1'] * len(msans),
+        'Path': paths
+    })
+    if cir_types is not None:
+        frame['cir_type'] = cir_types
+    return frame
+
+
+def test_combine_results_matches_reference(analyzers):
+    query = ImpactQuery(analyzers['we'].prepare(), 'NOPE-R1-XXX-EG', 'node')
+    result_list = [
+        _frame(['M1', 'M2', 'M1'], [['E1', 'D1'], ['E1', 'D2'], ['E1', 'D1']]),
+        _frame(['M2', 'M3', np.nan], [['E1', 'D2'], 'NetworkXNoPath: No path between E1 and D3.', np.nan]),
+        _frame(['M3', 'M4', np.nan, 'M4'], [('E1', 'D3'), ['E1', 'D4'], np.nan, ('E1', 'D4')]),
+        _frame([], [])
+    ]
+
+    expected = reference_analyzer.UnifiedNetworkImpactAnalyzer._combine_results(None, result_list)
+    combined = query._combine_results(result_list)
+
+    assert normalize(combined) == normalize(expected)
+    assert combined['MSANCODE'].tolist()[:2] == ['M1', 'M2']
+
+
+def test_target_node_classification_matches_reference(analyzers):
+    network = analyzers['we'].prepare()
+    mappings = network._get_column_mappings()
+    final_df = pd.DataFrame({
+        'MSANCODE': ['M1', 'M2', 'M1', 'M3', np.nan, 'M2', 'M3'],
+        'EDGE': ['E1', 'E2', 'E1', 'E3', 'E4', 'E2', 'E3'],
+        'distribution_hostname': ['D1', 'D1', 'D2', 'D1', 'D1', 'D3', 'D9'],
+        'BNG_HOSTNAME': ['B1', 'B1', 'B1', 'B2', 'B1', 'B1', 'D1'],
+        'cir_type': ['Dual', 'Single', 'Dual', 'Dual', 'Single', 'Dual', 'Dual']
+    })
+    reference = reference_analyzer.UnifiedNetworkImpactAnalyzer._analyze_target_node_impact
+    query = ImpactQuery(network, 'D1', 'node')
+    query.final_df = final_df
+
+    for node in ('D1', 'B1', 'B2', 'D9', 'X'):
+        owner = type('Reference', (), {'final_df': final_df, 'data_type': 'network'})()
+        expected = reference(owner, node, mappings)
+        results = query._analyze_target_node_impact(node, mappings)
+        assert normalize(results) == normalize(expected), node
+
+    impacts = query._analyze_target_node_impact('D1', mappings).groupby('MSANCODE')['Impact'].first()
+    assert impacts.to_dict() == {'M1': 'Partially Impacted', 'M2': 'Isolated', 'M3': 'Partially Impacted'}
+
+
+def test_summary_counts_dual_homed_customers_once():
+    # M1 is dual homed (UP to D1, ST to D2), M2 single homed to D1
+    row = dict(
+        ROWVERSION='x', EDGE='E1', edge_exchange='A.B', BNG_HOSTNAME='B1',
+        distribution_Exchange='C.D', VLAN=100
+    )
+    report = pd.DataFrame([
+        dict(row, ID=1, MSANCODE='M1', edge_port='Gi0/1.100', distribution_hostname='D1', STATUS='UP', CUST=40),
+        dict(row, ID=2, MSANCODE='M1', edge_port='Gi0/1.100', distribution_hostname='D2', STATUS='ST', CUST=40),
+        dict(row, ID=3, MSANCODE='M1', edge_port='Gi0/2.100', distribution_hostname='D1', STATUS='UP', CUST=5),
+        dict(row, ID=4, MSANCODE='M1', edge_port='Gi0/2.100', distribution_hostname='D2', STATUS='ST', CUST=5),
+        dict(row, ID=5, MSANCODE='M2', edge_port='Gi0/1.100', distribution_hostname='D1', STATUS='UP', CUST=7)
+    ])
+    wan = pd.DataFrame([
+        dict(NODENAME=a, NEIGHBOR_HOSTNAME=b, LOCAL_INTERFACE='Gi0/0/1', NEIGHBOR_INTERFACE='Gi0/0/2')
+        for a, b in (('E1', 'D1'), ('E1', 'D2'), ('D1', 'B1'), ('D2', 'B1'))
+    ])
+    ospf = wan[['NODENAME', 'LOCAL_INTERFACE', 'NEIGHBOR_HOSTNAME', 'NEIGHBOR_INTERFACE']]
+    agg = pd.DataFrame({'AGG_HOSTNAME': ['D1', 'D2'], 'EXCHANGE': ['C', 'C']})
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = UnifiedNetworkImpactAnalyzer(report, ospf, wan, agg).summarize_impact('E1', 'node')
+
+    assert summary['affected_msans'] == 2
+    assert summary['records'] == 5
+    assert summary['customers'] == 52
@@ -0,0 +1,43 @@
+import contextlib
+import io
+
+import pytest
+
+from impact_store import ImpactStore
+from network_data import normalize
+from unified_network_analyzer import ImpactQuery
+
+
+@pytest.fixture(scope='module')
+def store(analyzers, tmp_path_factory):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ImpactStore.build(str(tmp_path_factory.mktemp('impact_store')), analyzers, max_workers=1)
+
+
+def test_lookup_matches_live_analysis(store, analyzers):
+    for name, analyzer in analyzers.items():
+        network = analyzer.prepare()
+        for identifier, identifier_type in analyzer.sweep_identifiers():
+            stored = store.lookup(name, network, identifier, identifier_type)
+            assert stored is not None
+            with contextlib.redirect_stdout(io.StringIO()):
+                live = ImpactQuery(network, identifier, identifier_type).analyze()
+            assert normalize(stored) == normalize(live), (name, identifier)
+
+
+def test_unknown_identifier_or_data_version_is_analyzed_live(store, analyzers):
+    network = analyzers['we'].prepare()
+    identifier, identifier_type = analyzers['we'].sweep_identifiers()[0]
+
+    assert store.lookup('we', network, 'NOPE-R1-XXX-EG', 'node') is None
+    assert store.lookup('missing', network, identifier, identifier_type) is None
+
+    store.meta['we']['data_version'], version = 'other', store.meta['we']['data_version']
+    try:
+        assert store.lookup('we', network, identifier, identifier_type) is None
+    finally:
+        store.meta['we']['data_version'] = version
+
+
+def test_open_without_store(tmp_path):
+    assert ImpactStore.open(str(tmp_path)) is None
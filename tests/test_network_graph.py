@@ -0,0 +1,84 @@
+import random
+
+import networkx as nx
+
+from network_graph import BlockCutTree, NetworkGraph
+
+
+def test_from_edges_interns_and_deduplicates():
+    graph = NetworkGraph.from_edges(['A', 'B', 'A', None], ['B', 'A', 'C', 'D'])
+
+    assert graph.node_names.tolist() == ['A', 'B', 'C']
+    assert graph.number_of_edges == 2
+    assert 'D' not in graph
+    assert sorted(graph.node_names[graph.neighbors(graph.node_ids['A'])].tolist()) == ['B', 'C']
+    assert graph.node_names[graph.neighbors(graph.node_ids['C'])].tolist() == ['A']
+
+    rows, cols = graph.edges()
+    assert sorted(zip(graph.node_names[rows].tolist(), graph.node_names[cols].tolist())) == [('A', 'B'), ('A', 'C')]
+
+
+def test_bfs_levels_match_networkx():
+    links = [('A', 'B'), ('B', 'C'), ('C', 'D'), ('A', 'E'), ('E', 'D'), ('F', 'G')]
+    graph = NetworkGraph.from_edges([a for a, _ in links], [b for _, b in links])
+    reference = nx.Graph(links)
+
+    predecessors, _ = graph.bfs(graph.node_ids['A'])
+    for node in reference:
+        path = graph.path_to_root(predecessors, graph.node_ids[node])
+        if nx.has_path(reference, node, 'A'):
+            assert len(path) == nx.shortest_path_length(reference, node, 'A') + 1
+            assert path[0] == node and path[-1] == 'A'
+        else:
+            assert path is None
+
+
+def test_view_drops_nodes_left_without_links():
+    graph = NetworkGraph.from_edges(['A', 'B'], ['B', 'C'])
+    view = graph.without(['B'])
+
+    assert 'B' not in view
+    assert 'A' not in view and 'C' not in view
+    assert 'A' in graph.without(['C'])
+
+
+def test_view_matches_the_rebuilt_graph():
+    links = [('A', 'B'), ('B', 'C'), ('C', 'D'), ('A', 'E'), ('E', 'D'), ('D', 'F')]
+    graph = NetworkGraph.from_edges([a for a, _ in links], [b for _, b in links])
+    view = graph.without(['E']).without(['X'])
+    rebuilt = nx.Graph([(a, b) for a, b in links if 'E' not in (a, b)])
+
+    rows, cols = view.edges()
+    assert sorted(zip(graph.node_names[rows].tolist(), graph.node_names[cols].tolist())) == sorted(rebuilt.edges())
+
+    predecessors, _ = view.bfs(graph.node_ids['A'])
+    assert view.path_to_root(predecessors, graph.node_ids['F']) == ['F', 'D', 'C', 'B', 'A']
+    assert view.path_to_root(predecessors, graph.node_ids['E']) is None
+
+
+def _random_graph(rnd):
+    hosts = [f"H{i}" for i in range(9)]
+    links = {tuple(rnd.sample(hosts, 2)) for _ in range(rnd.randint(6, 14))}
+    return sorted(links)
+
+
+def test_block_cut_tree_matches_networkx():
+    rnd = random.Random(11)
+    for _ in range(60):
+        links = _random_graph(rnd)
+        graph = NetworkGraph.from_edges([a for a, _ in links], [b for _, b in links])
+        tree = BlockCutTree.build(graph)
+        reference = nx.Graph(links)
+        hosts = list(reference) + ['MISSING']
+
+        for failed in hosts:
+            remaining = reference.copy()
+            if failed in remaining:
+                remaining.remove_node(failed)
+            for source in hosts:
+                for target in hosts:
+                    expected = source in remaining and target in remaining and nx.has_path(remaining, source, target)
+                    if source == target and source in remaining:
+                        # A host left without any link is not part of the rebuilt graph
+                        expected = remaining.degree(source) > 0
+                    assert tree.is_connected_without(source, target, failed) == expected, (links, source, target, failed)
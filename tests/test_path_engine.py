@@ -0,0 +1,79 @@
+import random
+
+import networkx as nx
+import pandas as pd
+
+from network_graph import NetworkGraph
+from path_engine import PathEngine
+
+
+def _graphs(links):
+    sources = [source for source, _ in links]
+    targets = [target for _, target in links]
+    reference = nx.Graph()
+    reference.add_edges_from(links)
+    return NetworkGraph.from_edges(sources, targets), reference
+
+
+def test_unique_shortest_paths_match_networkx():
+    links = [('S', 'A'), ('A', 'B'), ('B', 'T'), ('A', 'C'), ('C', 'D')]
+    graph, reference = _graphs(links)
+    engine = PathEngine(graph)
+
+    for source in reference:
+        for target in reference:
+            assert engine.calculate_path(source, target) == nx.shortest_path(reference, source, target)
+
+
+def test_equal_length_tie_matches_networkx():
+    # Two paths S-A-T and S-B-T. A gets the lower node ID (first in the link
+    # table) while T lists B first: networkx picks S-B-T, and so must the engine.
+    links = [('A', 'S'), ('B', 'T'), ('S', 'B'), ('A', 'T')]
+    graph, reference = _graphs(links)
+    engine = PathEngine(graph)
+
+    assert graph.node_ids['A'] < graph.node_ids['B']
+    assert nx.shortest_path(reference, 'S', 'T') == ['S', 'B', 'T']
+    assert engine.calculate_path('S', 'T') == ['S', 'B', 'T']
+
+    # Same pick through the per-target batch
+    paths = engine.calculate_paths(pd.Series(['S', 'S']), pd.Series(['T', 'T']))
+    assert paths.tolist() == [['S', 'B', 'T'], ['S', 'B', 'T']]
+    assert engine.unique_paths(pd.Series(['S', 'A']), pd.Series(['T', 'T'])).tolist() == [False, True]
+
+
+def test_ties_match_networkx_on_random_graphs():
+    rnd = random.Random(5)
+    for _ in range(80):
+        hosts = [f"H{i}" for i in range(10)]
+        links = [tuple(rnd.sample(hosts, 2)) for _ in range(rnd.randint(10, 20))]
+        links.append(links[0][::-1])  # Same link listed in both directions
+        graph, reference = _graphs(links)
+        failed = rnd.choice(hosts)
+        view = graph.without([failed])
+        reduced = nx.Graph([(a, b) for a, b in links if failed not in (a, b)])
+
+        for engine, expected in ((PathEngine(graph), reference), (PathEngine(view), reduced)):
+            for source in expected:
+                for target in expected:
+                    if nx.has_path(expected, source, target):
+                        assert engine.calculate_path(source, target) == nx.shortest_path(expected, source, target)
+
+
+def test_errors_match_calculate_path():
+    graph, _ = _graphs([('A', 'B'), ('C', 'D')])
+    engine = PathEngine(graph)
+
+    assert engine.calculate_path('A', 'C') == 'NetworkXNoPath: No path between A and C.'
+    missing = engine.calculate_path('X', 'A')
+    assert isinstance(missing, nx.NodeNotFound)
+    assert str(missing) == 'Source X is not in G'
+    assert str(engine.calculate_path('A', 'X')) == 'Target X is not in G'
+
+
+def test_view_routes_around_removed_nodes():
+    graph, _ = _graphs([('S', 'A'), ('A', 'T'), ('S', 'B'), ('B', 'C'), ('C', 'T')])
+    engine = PathEngine(graph.without(['A']))
+
+    assert engine.calculate_path('S', 'T') == ['S', 'B', 'C', 'T']
+    assert isinstance(engine.calculate_path('A', 'T'), nx.NodeNotFound)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from network_graph import NetworkGraph
+from path_index import PathIndex
+from path_store import PathStore
+
+
+def _transited(value, nodes):
+    return isinstance(value, (list, tuple)) and bool(set(value[1:-1]) & set(nodes))
+
+
+def test_rows_for_matches_a_scan():
+    graph = NetworkGraph.from_edges(['E1', 'D1', 'E2', 'D2'], ['D1', 'B1', 'D2', 'B1'])
+    path = PathStore.from_values(
+        [['E1', 'D1', 'B1'], np.nan, ['E2', 'D2', 'B1'], ['E3', 'D1', 'B1']],
+        graph.node_names, graph.node_ids
+    )
+    path2 = PathStore.from_values(
+        [['E1', 'D2', 'D1', 'B1'], np.nan, ['E2', 'D2'], 'NetworkXNoPath: No path between E3 and B1.'],
+        graph.node_names, graph.node_ids
+    )
+    index = PathIndex.build([path, path2], graph)
+
+    for nodes in (['D1'], ['D2'], ['D1', 'D2'], ['E1', 'B1'], ['E3'], ['UNKNOWN'], []):
+        expected = [
+            row for row in range(len(path))
+            if _transited(path.value(row), nodes) or _transited(path2.value(row), nodes)
+        ]
+        assert index.rows_for(nodes).tolist() == expected
+        assert np.flatnonzero(index.mask_for(nodes)).tolist() == expected
+
+
+def test_network_index_matches_base_results(analyzers):
+    for analyzer in analyzers.values():
+        network = analyzer.prepare()
+        final_df = network.final_df
+        path2 = final_df['Path2'] if 'Path2' in final_df.columns else [np.nan] * len(final_df)
+
+        for node in network.topology.graph.node_names.tolist():
+            expected = [
+                row for row, (value, value2) in enumerate(zip(final_df['Path'], path2))
+                if _transited(value, [node]) or _transited(value2, [node])
+            ]
+            assert network.path_index.rows_for([node]).tolist() == expected
@@ -0,0 +1,71 @@
+import numpy as np
+import networkx as nx
+import pandas as pd
+
+from network_graph import NetworkGraph
+from path_store import PathStore
+
+
+GRAPH = NetworkGraph.from_edges(['E1', 'D1', 'E2', 'D2'], ['D1', 'B1', 'D2', 'B1'])
+NOT_FOUND = nx.NodeNotFound("Source X is not in G")
+VALUES = [
+    ['E1', 'D1', 'B1'],
+    np.nan,
+    'NetworkXNoPath: No path between E1 and D9.',
+    NOT_FOUND,
+    ('E2', 'D2', 'B1'),
+    ['E1', 'D1', 'B1'],
+    ['E1'],
+    ['E3', 'D1', 'B1'],
+]
+
+
+def _store():
+    return PathStore.from_values(VALUES, GRAPH.node_names, GRAPH.node_ids)
+
+
+def test_round_trip():
+    store = _store()
+    series = store.to_series(pd.RangeIndex(len(VALUES)))
+
+    assert store.status.tolist() == [
+        PathStore.PATH, PathStore.MISSING, PathStore.NO_PATH, PathStore.NOT_FOUND,
+        PathStore.PATH, PathStore.PATH, PathStore.PATH, PathStore.PATH
+    ]
+    assert series[0] == ['E1', 'D1', 'B1']
+    assert np.isnan(series[1])
+    assert series[2] == VALUES[2]
+    assert series[3] is NOT_FOUND
+    assert series[4] == ['E2', 'D2', 'B1']
+    assert series[7] == ['E3', 'D1', 'B1']
+    # Identical paths share one list
+    assert series[0] is series[5]
+
+
+def test_unknown_hostnames_do_not_touch_the_shared_mapping():
+    store = _store()
+
+    assert 'E3' not in GRAPH.node_ids
+    assert store.node_ids['E3'] >= len(GRAPH)
+    assert store.value(7) == ['E3', 'D1', 'B1']
+
+
+def test_keys_group_equal_values():
+    keys = _store().keys()
+
+    assert keys[0] == keys[5]
+    assert len(set(keys[[0, 1, 2, 3, 4, 6, 7]].tolist())) == 7
+
+
+def test_avoids_and_interior():
+    store = _store()
+    rows = np.arange(len(store))
+
+    # Single-hostname paths and non-paths never count as avoiding
+    assert store.avoids(rows, ['D2']).tolist() == [True, False, False, False, False, True, False, True]
+    assert store.avoids(rows, ['E1']).tolist() == [False, False, False, False, True, False, False, True]
+
+    nodes, interior_rows = store.interior()
+    pairs = sorted(zip(store.node_names[nodes].tolist(), interior_rows.tolist()))
+    assert pairs == [('D1', 0), ('D1', 5), ('D1', 7), ('D2', 4)]
+
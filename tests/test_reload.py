@@ -0,0 +1,114 @@
+import asyncio
+import contextlib
+import io
+
+import pytest
+
+import main_API
+from network_data import make_network
+from unified_network_analyzer import UnifiedNetworkImpactAnalyzer
+
+
+@pytest.fixture(scope='module')
+def new_analyzers():
+    """Prepared analyzers of another dataset, as a reload would build them"""
+    data = make_network(seed=5, n_blocks=10, n_msans=8)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return tuple(
+            UnifiedNetworkImpactAnalyzer(data[name], data['ospf'], data['wan'], data['agg'])
+            for name in ('we', 'others')
+        )
+
+
+@pytest.fixture
+def reload_env(api, new_analyzers, monkeypatch):
+    """API state with the reload reading new_analyzers and fingerprint 'new'; records snapshot writes"""
+    snapshots = []
+    monkeypatch.setattr(main_API, 'load_analyzers', lambda data_dir: new_analyzers)
+    monkeypatch.setattr(main_API, 'source_fingerprint', lambda data_dir: 'new')
+    monkeypatch.setattr(main_API, 'write_snapshot', lambda *args: snapshots.append(args))
+    monkeypatch.setattr(main_API, 'data_fingerprint', 'old')
+    monkeypatch.setattr(main_API, 'reload_task', None)
+    monkeypatch.setattr(main_API, 'reload_state', dict(main_API.reload_state))
+    return snapshots
+
+
+def _reload():
+    async def run():
+        assert main_API._start_reload('test')
+        assert not main_API._start_reload('test')  # Already running
+        await main_API.reload_task
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(run())
+
+
+def test_reload_swaps_analyzers_and_clears_the_cache(api, analyzers, new_analyzers, reload_env, data):
+    edge = data['we']['EDGE'].iloc[0]
+    assert api.post('/analyze', json={'identifier': edge, 'identifier_type': 'node'}).status_code == 200
+    assert main_API.result_cache.stats()['entries'] == 2
+
+    _reload()
+
+    assert (main_API.we_analyzer, main_API.others_analyzer) == new_analyzers
+    assert main_API.data_fingerprint == 'new'
+    assert main_API.result_cache.stats()['entries'] == 0
+    assert main_API.reload_state['status'] == 'completed'
+    assert main_API.reload_state['reason'] == 'test'
+    assert main_API.reload_state['data_versions'] == {
+        'we': new_analyzers[0].data_version, 'others': new_analyzers[1].data_version
+    }
+    assert reload_env == [(*new_analyzers, 'new', main_API.SNAPSHOT_PATH)]
+
+
+def test_analysis_on_the_old_analyzers_is_not_cached(analyzers, reload_env, data):
+    # Picked before the reload, finished after it
+    generation = main_API.result_cache.generation
+    _reload()
+    results = main_API._run_analysis(analyzers['we'], 'we', data['we']['EDGE'].iloc[0], 'node', generation)
+
+    assert len(results) > 0
+    assert main_API.result_cache.stats()['entries'] == 0
+    assert main_API.result_cache.stats()['stale'] >= 1
+
+
+def test_failed_reload_keeps_the_analyzers(analyzers, reload_env, monkeypatch):
+    def fail(data_dir):
+        raise FileNotFoundError('Report(11).csv')
+
+    monkeypatch.setattr(main_API, 'load_analyzers', fail)
+    _reload()
+
+    assert main_API.we_analyzer is analyzers['we']
+    assert main_API.data_fingerprint == 'old'
+    assert main_API.reload_state['status'] == 'failed'
+    assert 'Report(11).csv' in main_API.reload_state['error']
+    assert reload_env == []
+
+
+class _StopWatching(Exception):
+    pass
+
+
+def test_watcher_reloads_once_the_files_settle(monkeypatch):
+    # Polls: unchanged, changing, changing again, settled, reverted, unreadable, settled twice
+    polls = iter(['old', 'a', 'b', 'b', 'old', OSError('busy'), 'c', 'c'])
+    reloads = []
+
+    def fingerprint(data_dir):
+        poll = next(polls, None)
+        if poll is None:
+            raise _StopWatching()
+        if isinstance(poll, Exception):
+            raise poll
+        return poll
+
+    monkeypatch.setattr(main_API, 'DATA_WATCH_SECONDS', 0)
+    monkeypatch.setattr(main_API, 'data_fingerprint', 'old')
+    monkeypatch.setattr(main_API, 'source_fingerprint', fingerprint)
+    monkeypatch.setattr(main_API, '_start_reload', lambda reason: reloads.append(reason) or True)
+
+    with pytest.raises(_StopWatching):
+        asyncio.run(main_API._watch_data_files())
+
+    assert reloads == ['watcher', 'watcher']
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from result_cache import ResultCache
+
+
+def _frame(rows):
+    return pd.DataFrame({'MSANCODE': [f"MSAN{i}" for i in range(rows)]})
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', _frame(1))
+    cache.put('b', _frame(1))
+    assert cache.get('a') is not None
+
+    cache.put('c', _frame(1))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    stats = cache.stats()
+    assert (stats['entries'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 3, 1)
+
+
+def test_memory_bound():
+    size = ResultCache._size_of(_frame(100))
+    cache = ResultCache(max_entries=10, max_bytes=2 * size)
+    for key in 'abc':
+        cache.put(key, _frame(100))
+
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 2 * size
+
+    # Results larger than the whole cache are not stored
+    cache.put('big', _frame(1000))
+    assert cache.get('big') is None
+
+
+def test_replacing_a_key_and_clear():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', _frame(1))
+    cache.put('a', _frame(50))
+
+    assert len(cache.get('a')) == 50
+    assert cache.stats()['bytes'] == ResultCache._size_of(_frame(50))
+
+    cache.clear()
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 0
+
+
+def test_results_from_before_a_clear_are_dropped():
+    cache = ResultCache(max_entries=4)
+    generation = cache.generation
+    cache.put('a', _frame(1), generation)
+
+    cache.clear()
+    cache.put('b', _frame(1), generation)
+    cache.put('c', _frame(1), cache.generation)
+
+    assert cache.get('b') is None
+    assert cache.get('c') is not None
+    assert (cache.stats()['entries'], cache.stats()['stale']) == (1, 1)
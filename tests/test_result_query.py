@@ -0,0 +1,112 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from result_query import column_values, filter_results, query_results, sort_results
+
+
+def _results():
+    return pd.DataFrame({
+        'MSANCODE': ['MSAN1', 'MSAN12', 'MSAN123', 'msan2', 'MSAN1'],
+        'EDGE': ['EDGE-R1-ABA-EG', 'EDGE-R2-ABA-EG', 'EDGE-R3-NSR-EG', 'EDGE-R4-NSR-EG', 'EDGE-R1-ABA-EG'],
+        'distribution_hostname': pd.Categorical(['DIST-R1-ABA-EG', 'DIST-R2-ABA-EG', None, 'DIST-R1-ABA-EG', 'DIST-R3-NSR-EG']),
+        'BNG_HOSTNAME': ['CORE-R1-ABA-EG'] * 5,
+        'STATUS': pd.Categorical(['UP', 'UP', 'UP', 'UP', 'ST']),
+        'cir_type': [np.nan, np.nan, np.nan, np.nan, 'Dual'],
+        'Impact': ['Isolated', 'Partially Impacted', 'Isolated', 'Isolated', 'Partially Impacted'],
+        'CUST': [10, 200, 30, 5, 10],
+        'Path': [
+            ('EDGE-R1-ABA-EG', 'DIST-R1-ABA-EG'), ('EDGE-R2-ABA-EG', 'DIST-R2-ABA-EG'), np.nan,
+            nx.NodeNotFound('Source EDGE-R4-NSR-EG is not in G'), ('EDGE-R1-ABA-EG', 'DIST-R3-NSR-EG')
+        ]
+    })
+
+
+def test_msancode_selects_one_msan_exactly():
+    assert filter_results(_results(), msancode='MSAN1')['MSANCODE'].tolist() == ['MSAN1', 'MSAN1']
+    assert filter_results(_results(), msancode='msan1').empty
+
+
+def test_text_filters_match_substrings_ignoring_case():
+    results = _results()
+
+    assert filter_results(results, msancode_contains='msan1')['MSANCODE'].tolist() == ['MSAN1', 'MSAN12', 'MSAN123', 'MSAN1']
+    assert filter_results(results, edge='nsr').index.tolist() == [2, 3]
+    assert filter_results(results, distribution='r1-aba').index.tolist() == [0, 3]
+    assert filter_results(results, bng='core').index.tolist() == [0, 1, 2, 3, 4]
+    # Regex characters are taken literally; empty text means no filter
+    assert filter_results(results, edge='.*').empty
+    assert len(filter_results(results, edge='')) == 5
+    # A filter on a column the results do not have matches nothing
+    assert filter_results(results, bitstream='x').empty
+
+
+def test_exact_and_customer_filters_combine():
+    results = _results()
+
+    assert filter_results(results, impact='Isolated').index.tolist() == [0, 2, 3]
+    assert filter_results(results, status='ST').index.tolist() == [4]
+    assert filter_results(results, cir_type='Dual').index.tolist() == [4]
+    assert filter_results(results, min_cust=10, max_cust=100).index.tolist() == [0, 2, 4]
+    assert filter_results(results, impact='Isolated', min_cust=10, msancode_contains='msan').index.tolist() == [0, 2]
+
+
+def test_sorting_is_stable_with_missing_values_last():
+    results = _results()
+
+    assert sort_results(results, 'CUST').index.tolist() == [3, 0, 4, 2, 1]
+    assert sort_results(results, 'CUST', descending=True).index.tolist() == [1, 2, 0, 4, 3]
+    # Categoricals sort lexically, missing values last
+    assert sort_results(results, 'distribution_hostname').index.tolist() == [0, 3, 1, 4, 2]
+    assert sort_results(results, 'UNKNOWN').index.tolist() == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        sort_results(results, 'Path')
+
+
+def test_paging():
+    total, page = query_results(_results(), offset=1, limit=2, sort_by='CUST')
+
+    assert total == 5
+    assert page.index.tolist() == [0, 4]
+
+    total, page = query_results(_results(), offset=10, limit=2)
+    assert total == 5 and page.empty
+
+
+def test_path_errors_are_sent_as_text():
+    _, page = query_results(_results(), limit=5)
+
+    assert page['Path'].tolist()[3] == 'Source EDGE-R4-NSR-EG is not in G'
+    assert page['Path'].tolist()[0] == ('EDGE-R1-ABA-EG', 'DIST-R1-ABA-EG')
+    # The cached frame is not modified
+    assert isinstance(_results()['Path'][3], nx.NodeNotFound)
+
+
+def test_column_values():
+    results = _results()
+
+    assert column_values(results, 'MSANCODE') == ['MSAN1', 'MSAN12', 'MSAN123', 'msan2']
+    assert column_values(results, 'distribution_hostname') == ['DIST-R1-ABA-EG', 'DIST-R2-ABA-EG', 'DIST-R3-NSR-EG']
+    assert column_values(results, 'Path') == []
+    assert column_values(results, 'UNKNOWN') == []
+
+
+def test_results_endpoints(api, analyzers):
+    identifier = analyzers['we'].prepare().final_df['distribution_hostname'].value_counts().index[0]
+    request = {'identifier': identifier, 'identifier_type': 'node', 'dataset': 'we'}
+
+    values = api.post('/analyze/results/values', json={**request, 'column': 'MSANCODE'})
+    assert values.status_code == 200
+    msancodes = values.json()['values']
+    assert msancodes == sorted(msancodes) and msancodes
+
+    page = api.post('/analyze/results', json={**request, 'msancode': msancodes[0], 'limit': 1000}).json()
+    assert page['total'] > 0
+    assert {row['MSANCODE'] for row in page['rows']} == {msancodes[0]}
+
+    page = api.post('/analyze/results', json={**request, 'offset': 1, 'limit': 2, 'sort_by': 'CUST'}).json()
+    assert page['offset'] == 1 and len(page['rows']) <= 2
+
+    assert api.post('/analyze/results', json={**request, 'sort_by': 'Path'}).status_code == 400
+    assert api.post('/analyze/results', json={**request, 'limit': 0}).status_code == 422
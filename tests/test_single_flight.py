@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        release.wait(5)
+        return value * 2
+
+    async def scenario():
+        tasks = [asyncio.create_task(flight.run('key', compute, 21)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert _run(scenario()) == [42, 42, 42]
+    assert calls == [21]
+    assert flight.stats() == {"started": 1, "coalesced": 2, "in_flight": 0}
+
+
+def test_exception_is_shared_and_key_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(flight.run('key', fail), flight.run('key', fail), return_exceptions=True)
+        # The key is free again once the computation has ended
+        again = await flight.run('key', lambda: 'ok')
+        return results, again
+
+    results, again = _run(scenario())
+    assert [str(error) for error in results] == ['boom', 'boom']
+    assert again == 'ok'
+    assert flight.stats()["started"] == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        return 'done'
+
+    async def scenario():
+        first = asyncio.create_task(flight.run('key', compute))
+        second = asyncio.create_task(flight.run('key', compute))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert _run(scenario()) == 'done'
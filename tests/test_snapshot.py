@@ -0,0 +1,109 @@
+import asyncio
+import contextlib
+import io
+import os
+
+import pytest
+
+import main_API
+import snapshot
+from network_data import normalize
+from snapshot import build_snapshot, load_snapshot, snapshot_format, write_snapshot
+
+
+# Input CSV per dataset frame
+CSV_FILES = {'we': 'Report(11).csv', 'others': 'Report(12).csv', 'ospf': 'res_ospf.csv', 'wan': 'wan.csv', 'agg': 'agg.csv'}
+
+
+@pytest.fixture
+def data_dir(data, tmp_path):
+    """Data directory with the CSV files of the small dataset"""
+    path = tmp_path / 'data'
+    path.mkdir()
+    for name, file_name in CSV_FILES.items():
+        data[name].to_csv(path / file_name, index=False)
+    return str(path)
+
+
+def _quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def test_round_trip(data_dir, data, tmp_path):
+    snapshot_path = str(tmp_path / 'snapshot.pkl')
+    we, others = _quiet(build_snapshot, data_dir, snapshot_path)
+
+    loaded = _quiet(load_snapshot, snapshot_path, data_dir)
+
+    assert loaded is not None
+    loaded_we, loaded_others = loaded
+    assert (loaded_we.data_version, loaded_others.data_version) == (we.data_version, others.data_version)
+    # The topology is stored once and shared again
+    assert loaded_we.topology is loaded_others.topology
+    assert not os.path.exists(f"{snapshot_path}.tmp")
+
+    edge = data['we']['EDGE'].iloc[0]
+    for analyzer, loaded_analyzer in ((we, loaded_we), (others, loaded_others)):
+        expected = _quiet(analyzer.run_complete_analysis, edge, 'node')
+        assert normalize(_quiet(loaded_analyzer.run_complete_analysis, edge, 'node')) == normalize(expected)
+
+
+def test_code_change_makes_a_snapshot_stale(analyzers, tmp_path, monkeypatch):
+    snapshot_path = str(tmp_path / 'snapshot.pkl')
+    write_snapshot(analyzers['we'], analyzers['others'], {}, snapshot_path)
+    assert _quiet(load_snapshot, snapshot_path) is not None
+
+    # Same format number, different source of the pickled modules
+    written_format = snapshot_format()
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_MODULES', snapshot.SNAPSHOT_MODULES + ['topology'])
+
+    assert snapshot_format() != written_format
+    assert snapshot_format().split('-')[0] == written_format.split('-')[0]
+    assert _quiet(load_snapshot, snapshot_path) is None
+
+
+def test_changed_csv_makes_a_snapshot_stale(data_dir, tmp_path):
+    snapshot_path = str(tmp_path / 'snapshot.pkl')
+    _quiet(build_snapshot, data_dir, snapshot_path)
+
+    with open(os.path.join(data_dir, 'agg.csv'), 'a') as f:
+        f.write('AGG-R999-ABA-EG,ABA\n')
+
+    assert _quiet(load_snapshot, snapshot_path, data_dir) is None
+    # Without the data directory the snapshot is not checked against the CSVs
+    assert _quiet(load_snapshot, snapshot_path) is not None
+
+
+@pytest.mark.parametrize('content', [b'', b'not a pickle', b'\x80\x05\x95\xff\x00\x00'])
+def test_unreadable_snapshot_is_ignored(tmp_path, content):
+    snapshot_path = tmp_path / 'snapshot.pkl'
+    snapshot_path.write_bytes(content)
+
+    assert _quiet(load_snapshot, str(snapshot_path)) is None
+    assert _quiet(load_snapshot, str(tmp_path / 'missing.pkl')) is None
+
+
+def test_startup_falls_back_to_the_csv_files(api, data_dir, data, tmp_path, monkeypatch):
+    # Truncated snapshot: startup rebuilds the analyzers from the CSV files
+    valid_path = str(tmp_path / 'valid.pkl')
+    _quiet(build_snapshot, data_dir, valid_path)
+    with open(valid_path, 'rb') as f:
+        truncated = f.read()[:1000]
+    snapshot_path = tmp_path / 'snapshot.pkl'
+    snapshot_path.write_bytes(truncated)
+    assert _quiet(load_snapshot, str(snapshot_path), data_dir) is None
+
+    monkeypatch.setattr(main_API, 'DATA_DIR', data_dir)
+    monkeypatch.setattr(main_API, 'SNAPSHOT_PATH', str(snapshot_path))
+    monkeypatch.setattr(main_API, 'IMPACT_STORE_DIR', str(tmp_path / 'impact_store'))
+    monkeypatch.setattr(main_API, 'DATA_WATCH_SECONDS', 0)
+    monkeypatch.setattr(main_API, 'data_fingerprint', None)
+    _quiet(asyncio.run, main_API.startup_event())
+
+    expected_we, _ = _quiet(load_snapshot, valid_path)
+    assert main_API.we_analyzer.data_version == expected_we.data_version
+    assert main_API.we_analyzer.network is not None
+    assert main_API.data_fingerprint == snapshot.source_fingerprint(data_dir)
+    response = api.post('/analyze', json={'identifier': data['we']['EDGE'].iloc[0], 'identifier_type': 'node'})
+    assert response.status_code == 200
@@ -0,0 +1,114 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from topology import build_topology, exchange_of
+
+
+def _results():
+    # M1 and M2 reach DIST-R2 through CORE-R1, M3 is dual homed on another edge.
+    # Paths are tuples, as in combined analysis results.
+    return pd.DataFrame({
+        'MSANCODE': ['M1', 'M1', 'M2', 'M3', 'M3'],
+        'EDGE': ['EDGE-R1-ABA-EG', 'EDGE-R1-ABA-EG', 'EDGE-R1-ABA-EG', 'EDGE-R3-NSR-EG', 'EDGE-R3-NSR-EG'],
+        'distribution_hostname': ['DIST-R2-ABA-EG', 'DIST-R2-ABA-EG', 'DIST-R2-ABA-EG', 'DIST-R4-NSR-EG', 'DIST-R2-ABA-EG'],
+        'BNG_HOSTNAME': ['CORE-R1-ABA-EG'] * 5,
+        'Path': [
+            ('EDGE-R1-ABA-EG', 'CORE-R1-ABA-EG', 'DIST-R2-ABA-EG'),
+            ('EDGE-R1-ABA-EG', 'CORE-R1-ABA-EG', 'DIST-R2-ABA-EG'),
+            ('EDGE-R1-ABA-EG', 'CORE-R1-ABA-EG', 'DIST-R2-ABA-EG'),
+            ('EDGE-R3-NSR-EG', 'DIST-R4-NSR-EG'),
+            nx.NodeNotFound('Source EDGE-R3-NSR-EG is not in G')
+        ],
+        'Path2': [
+            np.nan,
+            ('EDGE-R1-ABA-EG', 'AGG-R5-ABA-EG', 'DIST-R2-ABA-EG'),
+            'NetworkXNoPath: No path between EDGE-R1-ABA-EG and DIST-R2-ABA-EG.',
+            ('EDGE-R3-NSR-EG', 'CORE-R1-ABA-EG', 'DIST-R2-ABA-EG'),
+            np.nan
+        ]
+    })
+
+
+def _links(topology):
+    return {(link['source'], link['target']): link for link in topology['links']}
+
+
+def test_links_count_distinct_msans():
+    topology = build_topology([_results()], ['CORE-R1-ABA-EG'])
+    links = _links(topology)
+
+    assert links[('CORE-R1-ABA-EG', 'EDGE-R1-ABA-EG')] == {
+        'source': 'CORE-R1-ABA-EG', 'target': 'EDGE-R1-ABA-EG', 'type': 'affected',
+        'primary_msans': 2, 'alternative_msans': 0, 'msans': 2
+    }
+    assert links[('CORE-R1-ABA-EG', 'DIST-R2-ABA-EG')]['type'] == 'alternative'
+    assert links[('CORE-R1-ABA-EG', 'DIST-R2-ABA-EG')]['msans'] == 3
+    assert links[('AGG-R5-ABA-EG', 'EDGE-R1-ABA-EG')]['alternative_msans'] == 1
+    assert topology['total_links'] == len(links) == 6
+    assert not topology['truncated']
+
+    nodes = {node['id']: node for node in topology['nodes']}
+    assert nodes['CORE-R1-ABA-EG'] == {'id': 'CORE-R1-ABA-EG', 'type': 'bng', 'failed': True, 'msans': 3}
+    assert nodes['EDGE-R1-ABA-EG']['type'] == 'edge'
+    assert nodes['DIST-R4-NSR-EG']['type'] == 'distribution'
+    assert nodes['AGG-R5-ABA-EG']['type'] == 'other'
+    assert topology['failed_nodes'] == ['CORE-R1-ABA-EG']
+
+
+def test_max_links_keeps_the_busiest_links():
+    full = build_topology([_results()], [])
+    topology = build_topology([_results()], ['DIST-R9-ABA-EG'], max_links=2)
+
+    assert topology['links'] == full['links'][:2]
+    assert [link['msans'] for link in full['links']] == sorted((link['msans'] for link in full['links']), reverse=True)
+    assert topology['total_links'] == 6
+    assert topology['truncated']
+    # Only the nodes of the kept links; failed nodes off every path are only listed
+    kept = {link['source'] for link in topology['links']} | {link['target'] for link in topology['links']}
+    assert {node['id'] for node in topology['nodes']} == kept
+    assert topology['failed_nodes'] == ['DIST-R9-ABA-EG']
+    assert topology['total_nodes'] == full['total_nodes'] == 6
+
+
+def test_collapse_merges_hostnames_per_exchange():
+    topology = build_topology([_results()], ['CORE-R1-ABA-EG', 'AGG-R5-ABA-EG'], collapse='exchange')
+
+    # Links inside an exchange disappear
+    assert _links(topology) == {
+        ('ABA', 'NSR'): {
+            'source': 'ABA', 'target': 'NSR', 'type': 'alternative',
+            'primary_msans': 0, 'alternative_msans': 1, 'msans': 1
+        }
+    }
+    assert topology['nodes'] == [
+        {'id': 'ABA', 'type': 'exchange', 'failed': True, 'msans': 3},
+        {'id': 'NSR', 'type': 'exchange', 'failed': False, 'msans': 1}
+    ]
+    assert topology['failed_nodes'] == ['ABA']
+    assert topology['collapse'] == 'exchange'
+    assert exchange_of('EDGE-R209-NSR-EG') == 'NSR'
+    assert exchange_of('INSOMNA') == 'INSOMNA'
+
+
+def test_msancode_and_empty_datasets():
+    topology = build_topology([_results(), pd.DataFrame(), _results().iloc[:0]], [], msancode='M3')
+
+    assert sorted(_links(topology)) == [
+        ('CORE-R1-ABA-EG', 'DIST-R2-ABA-EG'), ('CORE-R1-ABA-EG', 'EDGE-R3-NSR-EG'), ('DIST-R4-NSR-EG', 'EDGE-R3-NSR-EG')
+    ]
+    assert all(link['msans'] == 1 for link in topology['links'])
+
+    empty = build_topology([pd.DataFrame()], [])
+    assert (empty['nodes'], empty['links'], empty['total_links'], empty['truncated']) == ([], [], 0, False)
+
+
+def test_topology_endpoint(api, data):
+    exchange = data['we']['edge_exchange'].iloc[0]
+    response = api.post('/analyze/topology', json={'identifier': exchange, 'identifier_type': 'exchange', 'max_links': 3})
+
+    assert response.status_code == 200
+    topology = response.json()
+    assert len(topology['links']) <= 3
+    assert topology['failed_nodes']
+    assert all(exchange_of(node) == exchange.split('.')[1] for node in topology['failed_nodes'])